@@ -0,0 +1,143 @@
+import calendar
+import numpy as np
+import pandas as pd
+from rfm import compute_rfm, segment_table
+from cube import build_cube, rollup, DAY_ORDER
+from parallel import parallel_segmented_rfm, parallel_order_cube, worker_pool
+from churn import ChurnScorer, customer_features, risk_levels
+
+# Inti analitik tanpa Streamlit: setiap fungsi menerima dan mengembalikan
+# DataFrame/Series sehingga bisa dipakai dashboard maupun batch job (precompute.py)
+
+
+def segmented_rfm(df, rules=None, max_date=None):
+    """Tabel RFM per pelanggan beserta skor kuintil dan kolom segmen."""
+    return segment_table(compute_rfm(df, max_date), rules)
+
+
+def filter_rfm(rfm, recency_range, frequency_range, monetary_range, segment=None):
+    """Pelanggan dalam rentang slider RFM (inklusif) dan, bila diberikan, satu segmen."""
+    mask = (rfm['recency'].between(*recency_range) &
+            rfm['frequency'].between(*frequency_range) &
+            rfm['monetary'].between(*monetary_range))
+    if segment is not None:
+        mask &= rfm['segment'] == segment
+    return rfm[mask]
+
+
+def churn_risk(rfm):
+    """Risiko churn sederhana berdasarkan recency: High (> 180), Medium (> 90), Low."""
+    return pd.Series(np.where(rfm['recency'] > 180, 'High',
+                              np.where(rfm['recency'] > 90, 'Medium', 'Low')),
+                     index=rfm.index, name='churn_risk')
+
+
+def segment_characteristics(rfm):
+    """Rata-rata recency, frequency, dan monetary per segmen."""
+    return rfm.groupby('segment', observed=True).agg({
+        'recency': 'mean',
+        'frequency': 'mean',
+        'monetary': 'mean'
+    }).reset_index().round(2)
+
+
+def order_cube(df, segments):
+    """Cube OLAP dari order dengan timestamp valid."""
+    return build_cube(df[df['order_purchase_timestamp'].notna()], segments)
+
+
+def monthly_sales(cube, months=None):
+    """Jumlah pesanan dan pendapatan per bulan ('YYYY-MM')."""
+    monthly = rollup(cube, 'month', months=months)[['count', 'revenue']].reset_index()
+    return monthly.rename(columns={'month': 'order_purchase_month'})
+
+
+def hourly_sales(cube, months=None):
+    """Jumlah pesanan per hari (0 = Senin) dan jam, dalam bentuk panjang."""
+    return rollup(cube, ['day_of_week', 'hour_of_day'], months=months)[['count']].reset_index()
+
+
+def hourly_heatmap(hourly):
+    """Pivot hari × jam dari hourly_sales(), baris diurutkan Senin–Minggu."""
+    pivot = hourly.set_index(['day_of_week', 'hour_of_day'])['count'].unstack('hour_of_day', fill_value=0)
+    pivot.index = [DAY_ORDER[int(day)] for day in pivot.index]
+    return pivot.reindex(DAY_ORDER)
+
+
+def payment_breakdown(cube, **filters):
+    """Tuple (jumlah pesanan per metode, pendapatan per metode)."""
+    totals = rollup(cube, 'payment_type', **filters)
+    counts = totals['count'].sort_values(ascending=False)
+    revenue = totals['revenue'].rename('payment_value').reset_index()
+    return counts, revenue
+
+
+def category_summary(cube, **filters):
+    """Jumlah pesanan dan rating rata-rata per kategori produk."""
+    totals = rollup(cube, 'product_category_name', **filters)
+    return pd.DataFrame({
+        'count': totals['count'],
+        'review_score': totals['review_sum'] / totals['review_count'].replace(0, np.nan),
+    })
+
+
+def peak_periods(df):
+    """Nama bulan dan hari dengan pesanan terbanyak, atau 'N/A' bila tidak ada data."""
+    timestamps = df['order_purchase_timestamp'].dropna()
+    if timestamps.empty:
+        return "N/A", "N/A"
+    peak_month = timestamps.dt.month.value_counts().index[0]
+    if 'day_of_week' in df.columns:
+        # Kolom turunan OrderStore: hari sudah dihitung sekali, -1 untuk NaT
+        days = df['day_of_week']
+        peak_day = days[days >= 0].value_counts().index[0]
+    else:
+        peak_day = timestamps.dt.dayofweek.value_counts().index[0]
+    return calendar.month_name[int(peak_month)], calendar.day_name[int(peak_day)]
+
+
+# Kolom yang dibaca order_summary() (cukup kolom ini yang diambil dari baris terfilter)
+SUMMARY_COLUMNS = ['order_id', 'order_purchase_timestamp', 'payment_value', 'product_category_name',
+                   'product_id', 'review_score', 'day_of_week']
+
+
+def order_summary(df):
+    """Ringkasan order terfilter: metrik, kategori terlaris, periode puncak, dan jumlah per rating."""
+    categories = df['product_category_name'].value_counts()
+    peak_month, peak_day = peak_periods(df)
+    return {
+        'rows': len(df),
+        'total_orders': df['order_id'].nunique(),
+        'total_revenue': float(df['payment_value'].sum()),
+        'total_products': df['product_id'].nunique(),
+        'top_category': categories.index[0] if len(categories) and categories.iloc[0] > 0 else "N/A",
+        'peak_month': peak_month,
+        'peak_day': peak_day,
+        'review_counts': df['review_score'].value_counts().sort_index(),
+    }
+
+
+def churn_scores(df, bundle):
+    """Probabilitas dan level risiko churn dari model terlatih (bundle churn.load_model())."""
+    churn = ChurnScorer(bundle).score(customer_features(df)).to_frame()
+    churn['churn_risk'] = risk_levels(churn['churn_probability'])
+    return churn
+
+
+def run_pipeline(df, rules=None, workers=1, executor=None, churn_model=None):
+    """Jalankan seluruh pipeline batch dan kembalikan artefak sebagai dict DataFrame.
+
+    Hanya hasil yang dibaca dashboard yang ditulis: RFM + segmen, cube, dan
+    (dengan churn_model) skor churn model. Ringkasan segmen, penjualan bulanan
+    dan per jam, serta churn berbasis recency murah diturunkan dari keduanya.
+    workers > 1 menghitung RFM dan cube per partisi di process pool (lihat parallel.py).
+    """
+    if workers > 1 and executor is None:
+        with worker_pool(workers) as pool:
+            return run_pipeline(df, rules, workers, pool, churn_model)
+    rfm = parallel_segmented_rfm(df, workers, rules, executor=executor)
+    cube = parallel_order_cube(df, rfm['segment'], workers, executor=executor)
+    artifacts = {'rfm': rfm, 'cube': cube}
+    if churn_model is not None:
+        artifacts['churn'] = churn_scores(df, churn_model)
+    return artifacts
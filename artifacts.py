@@ -0,0 +1,59 @@
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+
+# Artefak hasil precompute disimpan per versi: artifacts/<versi>/<nama>.parquet
+ARTIFACTS_DIR = "artifacts"
+MANIFEST = "manifest.json"
+# Naikkan bila isi artefak berubah (misalnya cara menghitung skor) agar versi lama tidak dibaca
+ARTIFACTS_FORMAT = 3
+
+
+def artifact_version(data_version, rules_version):
+    """Nama direktori versi dari sidik jari data sumber dan aturan segmen."""
+    return hashlib.sha1(f"{ARTIFACTS_FORMAT}|{data_version}|{rules_version}".encode()).hexdigest()[:16]
+
+
+def write_artifacts(artifacts, data_version, rules_version, root=ARTIFACTS_DIR, extra=None):
+    """Tulis dict nama -> DataFrame sebagai satu versi artefak (atomik per direktori)."""
+    version = artifact_version(data_version, rules_version)
+    target = os.path.join(root, version)
+    tmp_dir = os.path.join(root, f".{version}.{os.getpid()}.tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    for name, frame in artifacts.items():
+        frame.to_parquet(os.path.join(tmp_dir, f"{name}.parquet"))
+    manifest = {
+        'version': version,
+        'data_version': data_version,
+        'rules_version': rules_version,
+        'created_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'artifacts': {name: len(frame) for name, frame in artifacts.items()},
+        **(extra or {}),
+    }
+    with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    # Ganti versi lama (bila ada) dengan versi baru yang sudah lengkap
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.replace(tmp_dir, target)
+    return target
+
+
+def load_manifest(data_version, rules_version, root=ARTIFACTS_DIR):
+    """Manifest versi artefak untuk versi data ini, atau None bila belum di-precompute."""
+    path = os.path.join(root, artifact_version(data_version, rules_version), MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_artifact(name, data_version, rules_version, root=ARTIFACTS_DIR):
+    """Baca satu artefak untuk versi data ini, atau None bila belum di-precompute."""
+    version_dir = os.path.join(root, artifact_version(data_version, rules_version))
+    path = os.path.join(version_dir, f"{name}.parquet")
+    if not os.path.exists(os.path.join(version_dir, MANIFEST)) or not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
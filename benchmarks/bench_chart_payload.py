@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from chart_data import histogram, histogram_figure, payload_bytes
+
+
+def synthetic_rfm(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'recency': rng.integers(1, 730, n),
+        'frequency': rng.geometric(0.55, n),
+        'monetary': np.round(rng.lognormal(5.5, 1.2, n), 2),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukuran payload histogram: px.histogram (data mentah) vs binning di server.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'customers':>10} {'column':>10} {'raw (KB)':>10} {'binned (KB)':>12} {'bin (ms)':>9}")
+    for n in args.sizes:
+        rfm = synthetic_rfm(n)
+        for column in ['recency', 'frequency', 'monetary']:
+            raw = payload_bytes(px.histogram(rfm, x=column, nbins=50))
+            start = time.perf_counter()
+            binned = payload_bytes(histogram_figure(*histogram(rfm[column], nbins=50), title=column, color='blue'))
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{n:>10} {column:>10} {raw / 1024:>10.1f} {binned / 1024:>12.1f} {elapsed:>9.1f}")
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from data_loader import load_dataset, DASHBOARD_COLUMNS
+from churn import ChurnScorer, train_model, customer_features, risk_levels
+from generate_data import ensure_dataset
+from bench_pipeline import git_commit, HERE
+
+# Throughput scoring model churn (pelanggan per detik): scoring batch seluruh
+# pelanggan, rescoring inkremental setelah order susulan (timestamp di dalam
+# rentang data, hanya pelanggan yang tersentuh berubah), dan refresh data yang
+# memajukan tanggal terakhir (semua pelanggan diskor ulang). Skor inkremental
+# dibandingkan persis dengan scoring ulang penuh. Hasil dicatat ke file JSONL.
+
+DEFAULT_RESULTS = os.path.join(HERE, "results", "churn.jsonl")
+
+
+def late_orders(df, fraction, rng):
+    """Order susulan untuk pelanggan lama dengan timestamp di dalam rentang data."""
+    late = df.sample(frac=fraction, random_state=rng.integers(2 ** 31)).copy()
+    late['order_id'] = [f"late_{i}" for i in range(len(late))]
+    late['payment_value'] = late['payment_value'] * rng.uniform(0.5, 1.5, len(late))
+    return late
+
+
+def timed_score(scorer, features):
+    start = time.perf_counter()
+    scores = scorer.score(features)
+    seconds = time.perf_counter() - start
+    return scores, {'customers': len(features), 'rescored': scorer.last_rescored, 'seconds': round(seconds, 4),
+                    'customers_per_second': round(len(features) / seconds)}
+
+
+def check_full(bundle, features, scores):
+    expected = ChurnScorer(bundle).score(features)
+    pd.testing.assert_series_equal(scores, expected, check_exact=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scoring batch dan inkremental model churn.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--late-fraction", type=float, default=0.01,
+                        help="fraksi baris yang ditambahkan sebagai order susulan")
+    parser.add_argument("--data-dir", default=os.path.join(HERE, "data"))
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run = {
+        'run_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    for n in args.rows:
+        csv_path = ensure_dataset(n, args.data_dir, args.seed)
+        df, _ = load_dataset(DASHBOARD_COLUMNS, csv_path, csv_path[:-len(".csv")] + ".parquet")
+        start = time.perf_counter()
+        bundle = train_model(df, seed=args.seed)
+        train_seconds = time.perf_counter() - start
+        print(f"{n} baris: training {train_seconds:.2f} s, AUC {bundle['metrics']['auc']:.3f}")
+
+        records = {}
+        scorer = ChurnScorer(bundle)
+        features = customer_features(df)
+        scores, records['batch'] = timed_score(scorer, features)
+        risk_levels(scores)
+
+        # Data yang sama lagi: tidak ada baris yang berubah
+        _, records['unchanged'] = timed_score(scorer, features)
+        assert scorer.last_rescored == 0
+
+        # Order susulan: tanggal terakhir tetap, hanya pelanggan yang tersentuh diskor ulang
+        late = late_orders(df, args.late_fraction, rng)
+        updated = pd.concat([df, late], ignore_index=True)
+        features = customer_features(updated)
+        scores, records['late_orders'] = timed_score(scorer, features)
+        touched = late['customer_id'].nunique()
+        assert scorer.last_rescored <= touched, (scorer.last_rescored, touched)
+        check_full(bundle, features, scores)
+
+        # Refresh yang memajukan tanggal terakhir: recency semua pelanggan berubah
+        next_day = late.assign(order_purchase_timestamp=df['order_purchase_timestamp'].max() + pd.Timedelta(days=1))
+        features = customer_features(pd.concat([updated, next_day], ignore_index=True))
+        scores, records['refresh'] = timed_score(scorer, features)
+        check_full(bundle, features, scores)
+
+        for name, record in records.items():
+            print(f"  {name:<12} {record['customers']:>8} pelanggan  diskor ulang {record['rescored']:>8}  "
+                  f"{record['seconds']:>8.4f} s  {record['customers_per_second']:>12,} pelanggan/s")
+        with open(args.results, "a") as f:
+            for name, record in records.items():
+                f.write(json.dumps({**run, 'rows': n, 'train_seconds': round(train_seconds, 2),
+                                    'auc': round(bundle['metrics']['auc'], 4), 'scenario': name, **record}) + "\n")
+    print(f"OK: skor inkremental identik dengan scoring ulang penuh; hasil ditambahkan ke {args.results}")
@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from data_loader import load_dataset, DASHBOARD_COLUMNS, ID_COLUMNS
+from rfm import compute_rfm, segment_rfm
+from order_store import OrderStore, TIME_FIELDS
+from filter_index import FilterIndex
+from spatial import SpatialGrid
+from generate_data import ensure_dataset
+from bench_pipeline import git_commit
+
+# Laporan memori dashboard sebelum dan sesudah representasi ringkas:
+# - data order: kolom ID sebagai string object (lama) vs dictionary-encoded
+#   (kode integer + kamus string unik, bila kamusnya cukup kecil), termasuk
+#   kolom waktu turunan;
+# - hasil filter di cache LRU: salinan baris order (lama) vs row id
+#   (irisan tanpa salinan untuk jendela waktu, array int32 untuk filter lain).
+# Ukuran dihitung dengan memory_usage(deep=True) dan nbytes array. Ukuran
+# index row id (FilterIndex + SpatialGrid, int32) dicatat sebagai informasi.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(HERE, "results", "memory.jsonl")
+MB = 1024 ** 2
+
+
+def column_bytes(df):
+    return df.memory_usage(deep=True, index=False)
+
+
+def legacy_frame(store):
+    """Frame OrderStore seperti sebelum dictionary encoding (ID string object, tanpa kolom turunan)."""
+    return store.frame[store.source_columns].astype({col: object for col in ID_COLUMNS})
+
+
+def dashboard_filters(store, index, rfm):
+    """Kombinasi filter khas dashboard: (nama, row id) dengan row id berupa slice atau array."""
+    lo, hi = store.bounds()
+    recent_lo, recent_hi = store.bounds((store.max_timestamp - pd.DateOffset(months=6)).date(),
+                                        store.max_timestamp.date())
+    categories = index.columns['product_category_name']
+    top_categories = categories.labels[np.argsort(np.diff(categories.offsets))[::-1][:3]]
+    segments = index.segment_index('bench', rfm['segment'])
+    top_segments = rfm['segment'].value_counts().index[:2]
+    filters = [('all', slice(lo, hi)), ('last_6_months', slice(recent_lo, recent_hi))]
+    for category in top_categories:
+        filters.append((f"category={category}", index.query(lo, hi, category=categories.rows(category))))
+    for segment in top_segments:
+        filters.append((f"segment={segment}", index.query(lo, hi, segment=segments.rows(segment))))
+    filters.append((f"category={top_categories[0]},segment={top_segments[0]}",
+                    index.query(recent_lo, recent_hi, category=categories.rows(top_categories[0]),
+                                segment=segments.rows(top_segments[0]))))
+    return filters
+
+
+def index_bytes(index, grid):
+    """Byte array NumPy di FilterIndex (semua kolom + pelanggan) dan SpatialGrid."""
+    groups = list(index.columns.values()) + [index.customers]
+    total = sum(group.codes.nbytes + group.order.nbytes + group.offsets.nbytes for group in groups)
+    total += grid.order_codes.nbytes + sum(level[0].nbytes for level in grid.levels.values())
+    return total
+
+
+def filter_entry_bytes(legacy, rows):
+    """(lama, baru): byte yang ditahan satu entri cache hasil filter."""
+    if isinstance(rows, slice):
+        # Jendela waktu: iloc[lo:hi] adalah view, baik dulu maupun sekarang
+        return 0, 0
+    return int(column_bytes(legacy.iloc[rows]).sum()), int(rows.nbytes)
+
+
+def measure(csv_path, parquet_path):
+    df, _ = load_dataset(DASHBOARD_COLUMNS, csv_path, parquet_path)
+    store = OrderStore(df)
+    del df
+    index = FilterIndex(store.frame)
+    rfm = compute_rfm(store.frame)
+    rfm['segment'] = segment_rfm(rfm)
+    legacy = legacy_frame(store)
+
+    before, after = column_bytes(legacy), column_bytes(store.frame)
+    columns = [{'column': col, 'before_mb': round(before.get(col, 0) / MB, 2),
+                'after_mb': round(after[col] / MB, 2), 'dtype': str(store.frame[col].dtype)}
+               for col in store.frame.columns]
+
+    filters = []
+    for name, rows in dashboard_filters(store, index, rfm):
+        old_bytes, new_bytes = filter_entry_bytes(legacy, rows)
+        n_rows = len(range(*rows.indices(len(store)))) if isinstance(rows, slice) else len(rows)
+        filters.append({'filter': name, 'rows': n_rows,
+                        'before_mb': round(old_bytes / MB, 2), 'after_mb': round(new_bytes / MB, 2)})
+
+    data_before, data_after = before.sum() / MB, after.sum() / MB
+    cache_before = sum(f['before_mb'] for f in filters)
+    cache_after = sum(f['after_mb'] for f in filters)
+    totals = {
+        'data_before_mb': round(data_before, 2),
+        'data_after_mb': round(data_after, 2),
+        'filter_cache_before_mb': round(cache_before, 2),
+        'filter_cache_after_mb': round(cache_after, 2),
+        'total_before_mb': round(data_before + cache_before, 2),
+        'total_after_mb': round(data_after + cache_after, 2),
+        'time_fields_mb': round(sum(after[col] for col in TIME_FIELDS) / MB, 2),
+        'index_mb': round(index_bytes(index, SpatialGrid(store.frame)) / MB, 2),
+    }
+    return columns, filters, totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan memori data order dan cache filter sebelum/sesudah representasi ringkas.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--data-dir", default=os.path.join(HERE, "data"))
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run = {'run_at': pd.Timestamp.now().isoformat(timespec='seconds'), 'commit': git_commit()}
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    for n in args.rows:
+        csv_path = ensure_dataset(n, args.data_dir, args.seed)
+        columns, filters, totals = measure(csv_path, csv_path[:-len(".csv")] + ".parquet")
+        print(f"{n} baris")
+        print(f"  {'kolom':<28} {'sebelum':>10} {'sesudah':>10}  dtype")
+        for record in columns:
+            print(f"  {record['column']:<28} {record['before_mb']:>7.1f} MB {record['after_mb']:>7.1f} MB  {record['dtype']}")
+        print(f"  {'entri cache filter':<44} {'baris':>9} {'sebelum':>10} {'sesudah':>10}")
+        for record in filters:
+            print(f"  {record['filter'][:44]:<44} {record['rows']:>9} {record['before_mb']:>7.1f} MB {record['after_mb']:>7.1f} MB")
+        print(f"  data order   {totals['data_before_mb']:>8.1f} MB -> {totals['data_after_mb']:>8.1f} MB"
+              f" (kolom waktu turunan {totals['time_fields_mb']:.1f} MB)")
+        print(f"  cache filter {totals['filter_cache_before_mb']:>8.1f} MB -> {totals['filter_cache_after_mb']:>8.1f} MB")
+        print(f"  total        {totals['total_before_mb']:>8.1f} MB -> {totals['total_after_mb']:>8.1f} MB")
+        print(f"  index row id (FilterIndex + SpatialGrid): {totals['index_mb']:.1f} MB")
+        with open(args.results, "a") as f:
+            f.write(json.dumps({**run, 'rows': n, **totals, 'columns': columns, 'filters': filters}) + "\n")
+        assert totals['total_after_mb'] < totals['total_before_mb'], "representasi ringkas harus lebih kecil"
+    print(f"OK: hasil ditambahkan ke {args.results}")
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import time
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from data_loader import load_dataset, DASHBOARD_COLUMNS
+from rfm import load_segment_rules
+from analytics import monthly_sales, hourly_sales
+from parallel import parallel_segmented_rfm, parallel_order_cube, worker_pool
+from generate_data import ensure_dataset
+from bench_pipeline import git_commit, HERE
+
+# Skalabilitas jalur terpartisi: RFM + segmen (partisi hash pelanggan) dan cube
+# penjualan (partisi rentang bulan) dengan 1..N worker. Tabel RFM (termasuk
+# skor kuintil dan segmen) dan cube harus identik persis dengan run serial.
+# Waktu dan speedup dicatat ke file JSONL
+
+DEFAULT_RESULTS = os.path.join(HERE, "results", "parallel.jsonl")
+
+
+def best_of(repeat, fn, *args, **kwargs):
+    """(hasil, detik tercepat) dari beberapa run."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def run_workers(df, rules, workers, repeat, expected):
+    pool = worker_pool(workers) if workers > 1 else None
+    try:
+        if pool is not None:
+            # Start proses worker tidak ikut diukur (pool dashboard hidup selama server berjalan)
+            list(pool.map(abs, range(workers)))
+        rfm, rfm_seconds = best_of(repeat, parallel_segmented_rfm, df, workers, rules, executor=pool)
+        cube, cube_seconds = best_of(repeat, parallel_order_cube, df, rfm['segment'], workers, executor=pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if expected is not None:
+        pd.testing.assert_frame_equal(rfm, expected[0], check_exact=True)
+        pd.testing.assert_frame_equal(cube, expected[1], check_exact=True)
+    # Agregat bulanan/jam tinggal roll-up dari cube
+    monthly_sales(cube), hourly_sales(cube)
+    return (rfm, cube), {'rfm_seconds': round(rfm_seconds, 4), 'cube_seconds': round(cube_seconds, 4)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark RFM dan cube terpartisi dengan 1..N worker.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=os.path.join(HERE, "data"))
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run = {
+        'run_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'cpu_count': os.cpu_count(),
+    }
+    if max(args.workers) > (os.cpu_count() or 1):
+        print(f"Catatan: hanya {os.cpu_count()} CPU; worker di atas jumlah itu tidak akan lebih cepat")
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    rules = load_segment_rules()
+    for n in args.rows:
+        csv_path = ensure_dataset(n, args.data_dir, args.seed)
+        df, _ = load_dataset(DASHBOARD_COLUMNS, csv_path, csv_path[:-len(".csv")] + ".parquet")
+        print(f"{n} baris")
+        expected, base = None, None
+        records = []
+        for workers in sorted(args.workers):
+            result, record = run_workers(df, rules, workers, args.repeat, expected)
+            if expected is None:
+                expected, base = result, record
+            total = record['rfm_seconds'] + record['cube_seconds']
+            speedup = (base['rfm_seconds'] + base['cube_seconds']) / total
+            # Efisiensi relatif terhadap jumlah worker terkecil (biasanya 1 = serial)
+            record.update(workers=workers, speedup=round(speedup, 2),
+                          efficiency=round(speedup * min(args.workers) / workers, 2))
+            records.append(record)
+            print(f"  {workers:>3} worker  rfm {record['rfm_seconds']:>8.3f} s  cube {record['cube_seconds']:>8.3f} s  "
+                  f"speedup {speedup:>5.2f}x")
+        with open(args.results, "a") as f:
+            for record in records:
+                f.write(json.dumps({**run, 'rows': n, **record}) + "\n")
+    print(f"OK: RFM (skor dan segmen) dan cube terpartisi identik dengan serial; hasil ditambahkan ke {args.results}")
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from data_loader import load_dataset, convert_to_parquet, DASHBOARD_COLUMNS
+from rfm import compute_rfm, segment_rfm
+from order_store import OrderStore
+from filter_index import FilterIndex
+from analytics import order_cube, monthly_sales, hourly_sales
+from export import write_export, EXPORT_FORMATS
+from generate_data import ensure_dataset
+
+# Benchmark dashboard per tahap (load, RFM, segmentasi, filter, agregasi, export)
+# di atas data sintetis; setiap tahap dicatat waktu dan puncak memorinya ke file
+# JSONL sehingga hasil antar commit bisa dibandingkan
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(HERE, "results", "pipeline.jsonl")
+
+
+def measure(stage, fn, *args):
+    """Jalankan fn dan kembalikan (hasil, record) dengan detik dan puncak memori (MB).
+
+    Waktu diukur tanpa tracing; puncak memori diukur pada run kedua dengan
+    tracemalloc (mencatat juga buffer NumPy/pandas) karena tracing memperlambat fn.
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows = len(result) if hasattr(result, '__len__') else None
+    return result, {'stage': stage, 'seconds': round(seconds, 4), 'peak_mb': round(peak / 1024 ** 2, 2), 'result_rows': rows}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def filter_like_dashboard(store, index, rfm):
+    """Filter khas dashboard: 6 bulan terakhir, kategori terbesar, satu segmen, slider monetary."""
+    end = store.max_timestamp.date()
+    lo, hi = store.bounds((store.max_timestamp - pd.DateOffset(months=6)).date(), end)
+    categories = index.columns['product_category_name']
+    top_category = categories.labels[np.argmax(np.diff(categories.offsets))]
+    segments = index.segment_index('bench', rfm['segment'])
+    rows = index.query(lo, hi,
+                       product_category_name=categories.rows(top_category),
+                       segment=segments.rows('Hibernating'))
+    filtered_rfm = rfm[rfm['monetary'] <= rfm['monetary'].quantile(0.9)]
+    filtered_data = store.take(rows, store.source_columns)
+    return filtered_data[filtered_data['customer_id'].isin(filtered_rfm.index)]
+
+
+def run_stages(csv_path, parquet_path):
+    records = []
+
+    def stage(name, fn, *args):
+        result, record = measure(name, fn, *args)
+        records.append(record)
+        print(f"  {name:<16} {record['seconds']:>9.3f} s {record['peak_mb']:>10.1f} MB")
+        return result
+
+    df = stage('load_csv', lambda: load_dataset(DASHBOARD_COLUMNS, csv_path, parquet_path, source='csv')[0])
+    if not os.path.exists(parquet_path):
+        convert_to_parquet(csv_path, parquet_path)
+    df = stage('load_parquet', lambda: load_dataset(DASHBOARD_COLUMNS, csv_path, parquet_path, source='parquet')[0])
+    rfm = stage('rfm', compute_rfm, df)
+    rfm['segment'] = stage('segmentation', segment_rfm, rfm)
+    store = stage('order_store', OrderStore, df)
+    index = stage('filter_index', FilterIndex, store.frame)
+    filtered_data = stage('filter', filter_like_dashboard, store, index, rfm)
+    cube = stage('cube', order_cube, store.frame.iloc[:store.n_valid], rfm['segment'])
+    stage('monthly_sales', monthly_sales, cube)
+    stage('hourly_sales', hourly_sales, cube)
+    # Ekspor ditulis per potongan ke file, seperti tombol "Siapkan" di dashboard
+    with tempfile.TemporaryDirectory() as export_dir:
+        for fmt, (_, suffix, _) in EXPORT_FORMATS.items():
+            stage(f"export_{fmt.replace('.', '_')}", write_export, filtered_data, os.path.join(export_dir, "sales" + suffix), fmt)
+        stage('export_rfm_csv', write_export, rfm.reset_index(), os.path.join(export_dir, "rfm.csv"), 'csv')
+    return records
+
+
+def previous_run(path, rows):
+    """Record terakhir per tahap untuk ukuran data yang sama dari file hasil."""
+    latest = {}
+    if not os.path.exists(path):
+        return latest
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record['rows'] == rows:
+                latest[record['stage']] = record
+    return latest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per tahap pipeline dashboard pada data sintetis.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="ukuran data; tambahkan 10000000 untuk skala penuh")
+    parser.add_argument("--data-dir", default=os.path.join(HERE, "data"))
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-slowdown", type=float, default=None,
+                        help="gagal (exit 1) bila tahap mana pun lebih lambat dari faktor ini dibanding run sebelumnya")
+    args = parser.parse_args()
+
+    run = {
+        'run_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    regressions = []
+    for n in args.rows:
+        csv_path = ensure_dataset(n, args.data_dir, args.seed)
+        parquet_path = csv_path[:-len(".csv")] + ".parquet"
+        print(f"{n} baris ({csv_path})")
+        baseline = previous_run(args.results, n)
+        records = run_stages(csv_path, parquet_path)
+        with open(args.results, "a") as f:
+            for record in records:
+                f.write(json.dumps({**run, 'rows': n, **record}) + "\n")
+        for record in records:
+            before = baseline.get(record['stage'])
+            if before is None or before['seconds'] <= 0:
+                continue
+            ratio = record['seconds'] / before['seconds']
+            if args.max_slowdown is not None and ratio > args.max_slowdown:
+                regressions.append(f"{n} baris / {record['stage']}: {before['seconds']:.3f} s -> {record['seconds']:.3f} s ({ratio:.2f}x)")
+    print(f"Hasil ditambahkan ke {args.results}")
+    if regressions:
+        print("Regresi:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
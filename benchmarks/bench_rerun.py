@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD = os.path.join(HERE, "..", "dashboard.py")
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+# Latensi rerun dashboard untuk interaksi umum, diukur dengan AppTest
+# Streamlit di atas data sintetis. AppTest selalu menjalankan seluruh skrip,
+# jadi untuk widget di dalam fragment yang dicatat adalah dua angka: waktu
+# rerun penuh dan waktu unit fragment yang terdampak (dari record profiler),
+# yaitu latensi yang dialami pengguna di server sungguhan. Sebagai pembanding,
+# 'eager' adalah perkiraan rerun bila semua bagian dihitung setiap kali
+# (seperti st.tabs): bagian utama skrip + jumlah waktu kelima bagian.
+
+DEFAULT_RESULTS = os.path.join(HERE, "results", "rerun.jsonl")
+
+
+def last_record(log_path):
+    with open(log_path) as f:
+        return json.loads(f.readlines()[-1])
+
+
+def unit_ms(record, unit):
+    """Waktu (ms) unit bernama unit di record profiler; total rerun bila unit None."""
+    if unit is None:
+        return record['total_ms']
+    return sum(section['ms'] for section in record['sections'] if section['path'].split("/")[-1] == unit)
+
+
+def timed_run(at, log_path, unit):
+    start = time.perf_counter()
+    at.run()
+    wall_ms = (time.perf_counter() - start) * 1000
+    assert not at.exception, [e.value for e in at.exception]
+    record = last_record(log_path)
+    return {'wall_ms': wall_ms, 'rerun_ms': record['total_ms'], 'unit_ms': unit_ms(record, unit),
+            'sections_ms': unit_ms(record, 'sections')}
+
+
+def section_radio(at):
+    return at.radio(key='active_section')
+
+
+def labelled(elements, label):
+    return [element for element in elements if element.label == label][0]
+
+
+def medians(samples):
+    return {key: round(float(np.median([sample[key] for sample in samples])), 1) for key in samples[0]}
+
+
+def run_interactions(at, log_path, repeat):
+    results = {}
+    results['first_load'] = timed_run(at, log_path, None)
+    results['rerun'] = medians([timed_run(at, log_path, None) for _ in range(repeat)])
+
+    # Pindah bagian: yang dijalankan ulang hanya fragment navigasi
+    sections = section_radio(at).options
+    switches = {section: [] for section in sections}
+    for _ in range(repeat):
+        for section in sections[1:] + sections[:1]:
+            section_radio(at).set_value(section)
+            switches[section].append(timed_run(at, log_path, 'sections'))
+    for i, section in enumerate(sections):
+        results[f'section_{i}'] = {**medians(switches[section]), 'section': section}
+
+    # Widget di dalam fragment: hanya grafik tren / peta yang digambar ulang
+    section_radio(at).set_value(sections[2])
+    at.run()
+    samples = []
+    for i in range(repeat):
+        labelled(at.radio, "Pilih Metrik Penjualan").set_value(["Pendapatan", "Jumlah Pesanan"][i % 2])
+        samples.append(timed_run(at, log_path, 'trend_chart'))
+    results['sales_metric'] = medians(samples)
+
+    section_radio(at).set_value(sections[3])
+    at.run()
+    samples = []
+    for i in range(repeat):
+        labelled(at.select_slider, "Level Zoom Peta").set_value([4, 3][i % 2])
+        samples.append(timed_run(at, log_path, 'map_chart'))
+    results['map_zoom'] = medians(samples)
+
+    # Filter sidebar: seluruh skrip dijalankan ulang, hanya bagian aktif yang dihitung
+    section_radio(at).set_value(sections[0])
+    at.run()
+    categories = at.sidebar.selectbox[0].options
+    samples = []
+    for i in range(repeat):
+        at.sidebar.selectbox[0].set_value(categories[1] if i % 2 == 0 else 'All')
+        samples.append(timed_run(at, log_path, None))
+    results['category'] = medians(samples)
+
+    # Perkiraan rerun bila kelima bagian selalu dihitung
+    main_ms = results['rerun']['rerun_ms'] - results['rerun']['sections_ms']
+    results['eager_estimate'] = {'rerun_ms': round(main_ms + sum(results[f'section_{i}']['unit_ms']
+                                                                for i in range(len(sections))), 1)}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur latensi rerun dashboard untuk interaksi umum.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data-dir", default=os.path.join(HERE, "data"))
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from generate_data import ensure_dataset
+    from bench_pipeline import git_commit
+    csv_path = ensure_dataset(args.rows, args.data_dir, args.seed)
+    results_path = os.path.abspath(args.results)
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Dashboard membaca all_data.* dari direktori kerja; feedback.db ikut dibuat di sini
+        os.symlink(os.path.abspath(csv_path), os.path.join(workdir, "all_data.csv"))
+        parquet_path = csv_path[:-len(".csv")] + ".parquet"
+        if os.path.exists(parquet_path):
+            os.symlink(os.path.abspath(parquet_path), os.path.join(workdir, "all_data.parquet"))
+        log_path = os.path.join(workdir, "profile_log.jsonl")
+        # Dibaca profiler.py saat dashboard pertama kali diimpor oleh AppTest
+        os.environ["DASHBOARD_PROFILE_LOG"] = log_path
+        os.chdir(workdir)
+
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_file(DASHBOARD, default_timeout=600)
+        results = run_interactions(at, log_path, args.repeat)
+
+    run = {
+        'run_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'rows': args.rows,
+        'engine': os.environ.get("DASHBOARD_ENGINE", "pandas"),
+    }
+    print(f"{args.rows} baris ({run['engine']})")
+    print(f"  {'interaksi':<28} {'rerun penuh':>12} {'unit fragment':>14}")
+    for name, result in results.items():
+        label = result.get('section', name)
+        unit = f"{result['unit_ms']:>11.0f} ms" if 'unit_ms' in result else ""
+        print(f"  {label:<28} {result['rerun_ms']:>9.0f} ms {unit:>14}")
+    with open(results_path, "a") as f:
+        for name, result in results.items():
+            f.write(json.dumps({**run, 'interaction': name, **result}) + "\n")
+    print(f"OK: hasil ditambahkan ke {results_path}")
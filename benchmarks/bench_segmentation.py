@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rfm import segment_rfm, load_segment_rules, THRESHOLD_RULES_FILE
+
+
+# Implementasi lama (row-wise) sebagai pembanding label dan waktu
+def rfm_segment(row):
+    if row['recency'] <= 30 and row['frequency'] >= 3 and row['monetary'] >= 1000:
+        return 'Champions'
+    elif row['recency'] <= 30 and row['frequency'] >= 2 and row['monetary'] >= 750:
+        return 'Loyal Customers'
+    elif row['recency'] <= 90 and row['frequency'] >= 2 and row['monetary'] >= 500:
+        return 'Potential Loyalists'
+    elif row['recency'] <= 30 and row['frequency'] <= 2 and row['monetary'] <= 250:
+        return 'New Customers'
+    elif row['recency'] <= 180 and row['frequency'] >= 3 and row['monetary'] >= 500:
+        return 'Need Attention'
+    elif row['recency'] > 180 and row['frequency'] >= 2 and row['monetary'] >= 250:
+        return 'At Risk'
+    elif row['recency'] > 365 and row['frequency'] <= 2 and row['monetary'] <= 250:
+        return 'Lost'
+    else:
+        return 'Others'
+
+
+def synthetic_rfm(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'recency': rng.integers(1, 730, n),
+        'frequency': rng.geometric(0.55, n),
+        'monetary': np.round(rng.lognormal(5.5, 1.2, n), 2),
+    }, index=pd.Index([f"c{i}" for i in range(n)], name='customer_id'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark segmentasi RFM: apply(axis=1) vs tervektorisasi.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--rules", default=THRESHOLD_RULES_FILE)
+    args = parser.parse_args()
+
+    rules = load_segment_rules(args.rules)
+    print(f"{'customers':>10} {'apply (s)':>10} {'vector (s)':>11} {'speedup':>8}")
+    for n in args.sizes:
+        rfm = synthetic_rfm(n)
+
+        start = time.perf_counter()
+        expected = rfm.apply(rfm_segment, axis=1)
+        apply_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = segment_rfm(rfm, rules)
+        vector_seconds = time.perf_counter() - start
+
+        # Label harus identik dengan implementasi lama
+        assert (actual.astype(str) == expected).all(), "Label segmentasi berbeda dari rfm_segment"
+        print(f"{n:>10} {apply_seconds:>10.3f} {vector_seconds:>11.4f} {apply_seconds / vector_seconds:>7.0f}x")
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+from data_loader import DATA_CSV
+from engine import ENGINE
+from startup_profile import profile_startup, over_budget, IMPORT_BUDGET_MS, FIRST_RENDER_BUDGET_MS
+from generate_data import OrderGenerator
+from bench_pipeline import git_commit
+
+# Waktu startup dashboard di proses baru (impor modul skrip dan render
+# pertama), dengan batas waktu sebagai uji regresi:
+# - cold: tanpa cache bersama, semua hasil startup dihitung;
+# - warm: worker baru setelah warm-up cache bersama (python shared_cache.py).
+# Pustaka visualisasi berat hanya boleh dimuat oleh chart yang memakainya:
+# word cloud (tab produk) tidak ikut dimuat saat render pertama, dan worker
+# setelah warm-up tidak memuat seaborn/matplotlib karena PNG heatmap sudah ada
+# di cache. Skrip gagal bila batas terlampaui atau pustaka dimuat terlalu awal.
+
+DEFAULT_RESULTS = os.path.join(HERE, "results", "startup.jsonl")
+# Pustaka yang boleh dimuat render pertama tanpa cache: heatmap korelasi di tab Summary
+HEATMAP_MODULES = {'seaborn', 'matplotlib', 'scipy'}
+
+
+def median_profile(workdir, env, repeat):
+    profiles = [profile_startup(cwd=workdir, env=env) for _ in range(repeat)]
+    profile = dict(profiles[len(profiles) // 2])
+    for key in ['import_ms', 'first_render_ms', 'wall_ms']:
+        profile[key] = round(statistics.median(p[key] for p in profiles), 2)
+    return profile
+
+
+def check_on_demand(workdir):
+    """Word cloud dimuat saat tab produk pertama kali dibuka, bukan saat startup."""
+    from streamlit.testing.v1 import AppTest
+    os.environ["DASHBOARD_PROFILE_LOG"] = ""
+    os.chdir(workdir)
+    at = AppTest.from_file(os.path.join(ROOT, "dashboard.py"), default_timeout=600).run()
+    assert not at.exception, [e.value for e in at.exception]
+    assert 'wordcloud' not in sys.modules, "wordcloud dimuat sebelum tab produk dibuka"
+    sections = at.radio(key='active_section').options
+    at.radio(key='active_section').set_value(next(s for s in sections if 'Product' in s)).run()
+    assert not at.exception, [e.value for e in at.exception]
+    assert 'wordcloud' in sys.modules
+    print("  wordcloud dimuat saat tab produk dibuka")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur waktu startup dashboard dan periksa batasnya.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="jumlah proses baru per skenario (median dipakai)")
+    parser.add_argument("--max-import-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--max-first-render-ms", type=float, default=FIRST_RENDER_BUDGET_MS)
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    args = parser.parse_args()
+
+    run = {'run_at': pd.Timestamp.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+           'rows': args.rows, 'engine': ENGINE}
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    # duckdb memang dimuat saat startup bila engine-nya dipilih
+    allowed = {'duckdb'} if ENGINE == 'duckdb' else set()
+    problems = []
+    with tempfile.TemporaryDirectory() as workdir:
+        OrderGenerator(args.rows, args.seed).chunk(args.rows).to_csv(os.path.join(workdir, DATA_CSV), index=False)
+        scenarios = [('cold', {'DASHBOARD_SHARED_CACHE': ''}, allowed | HEATMAP_MODULES), ('warm', {}, allowed)]
+        for scenario, env, expected in scenarios:
+            if scenario == 'warm':
+                subprocess.run([sys.executable, os.path.join(ROOT, "shared_cache.py"), "--workers", "1"],
+                               cwd=workdir, check=True, capture_output=True)
+            profile = median_profile(workdir, env, args.repeat)
+            print(f"{scenario}: impor {profile['import_ms']:.0f} ms, render pertama {profile['first_render_ms']:.0f} ms"
+                  f" (AppTest {profile['wall_ms']:.0f} ms); pustaka berat: {', '.join(profile['heavy_modules']) or '-'}")
+            for package, ms in profile['import_costs'][:5]:
+                print(f"  {package:<24} {ms:>8.1f} ms")
+            with open(args.results, "a") as f:
+                f.write(json.dumps({**run, 'scenario': scenario, **profile}) + "\n")
+            problems += [f"{scenario}: {problem}" for problem in
+                         over_budget(profile, args.max_import_ms, args.max_first_render_ms)]
+            early = sorted(set(profile['heavy_modules']) - expected)
+            if early:
+                problems.append(f"{scenario}: dimuat saat startup: {', '.join(early)}")
+        check_on_demand(workdir)
+    assert not problems, "; ".join(problems)
+    print(f"OK: startup dalam batas (impor <= {args.max_import_ms:.0f} ms, render pertama <= "
+          f"{args.max_first_render_ms:.0f} ms); hasil ditambahkan ke {args.results}")
@@ -0,0 +1,196 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Data sintetis dengan skema all_data.csv (dataset Olist) untuk benchmark skala
+# 100k, 1M, dan 10M baris. Distribusinya meniru data asli: sebagian besar
+# pelanggan hanya belanja sekali, popularitas produk dan kategori miring
+# (Zipf), penjualan tumbuh dari 2016 ke 2018, dan satu order bisa terdiri
+# dari beberapa baris (item/pembayaran).
+
+START = pd.Timestamp("2016-09-04")
+DAYS = 725
+BLACK_FRIDAY = pd.Timestamp("2017-11-24")
+
+CATEGORIES = [
+    'cama_mesa_banho', 'beleza_saude', 'esporte_lazer', 'moveis_decoracao',
+    'informatica_acessorios', 'utilidades_domesticas', 'relogios_presentes',
+    'telefonia', 'ferramentas_jardim', 'automotivo', 'brinquedos', 'cool_stuff',
+    'perfumaria', 'bebes', 'eletronicos', 'papelaria', 'fashion_bolsas_e_acessorios',
+    'pet_shop', 'moveis_escritorio', 'consoles_games', 'malas_acessorios',
+    'construcao_ferramentas_construcao', 'eletrodomesticos', 'instrumentos_musicais',
+    'eletroportateis', 'casa_construcao', 'livros_interesse_geral', 'alimentos',
+    'moveis_sala', 'casa_conforto',
+]
+PAYMENT_TYPES = ['credit_card', 'boleto', 'voucher', 'debit_card']
+PAYMENT_WEIGHTS = [0.74, 0.19, 0.055, 0.015]
+REVIEW_WEIGHTS = [0.115, 0.032, 0.083, 0.193, 0.577]
+
+# Kota asal pelanggan (lat, lng, bobot); São Paulo dan Rio mendominasi
+CITIES = np.array([
+    (-23.55, -46.63, 0.16), (-22.91, -43.17, 0.07), (-19.92, -43.94, 0.03),
+    (-25.43, -49.27, 0.02), (-30.03, -51.23, 0.02), (-15.79, -47.88, 0.02),
+    (-12.97, -38.50, 0.015), (-8.05, -34.88, 0.01), (-3.73, -38.53, 0.01),
+    (-22.90, -47.06, 0.02), (-23.18, -46.88, 0.01), (-27.59, -48.55, 0.01),
+    (-16.68, -49.25, 0.01), (-1.46, -48.50, 0.005), (-20.32, -40.34, 0.01),
+    (-21.18, -47.81, 0.01), (-3.12, -60.02, 0.003),
+])
+STATE_SPREAD = 1.5  # derajat; pelanggan di luar kota besar tersebar di sekitarnya
+
+# Profil jam pemesanan (puncak siang dan malam, sepi dini hari)
+HOUR_WEIGHTS = np.array([
+    2.3, 1.1, 0.5, 0.3, 0.2, 0.2, 0.5, 1.2, 3.0, 4.8, 6.0, 6.4,
+    5.9, 6.4, 6.6, 6.4, 6.4, 6.2, 5.9, 5.9, 6.3, 6.3, 6.0, 4.4,
+])
+
+
+def _hex_ids(codes, multiplier):
+    # ID heksadesimal 32 karakter seperti di Olist; perkalian ganjil modulo 16^32 bijektif
+    return pd.Series(codes).map(lambda i: f"{(int(i) + 1) * multiplier % 16 ** 32:032x}")
+
+
+def _normalize(weights):
+    weights = np.asarray(weights, dtype='float64')
+    return weights / weights.sum()
+
+
+def zipf_weights(n, exponent):
+    """Bobot popularitas peringkat 1..n yang turun mengikuti Zipf."""
+    return _normalize(1.0 / np.arange(1, n + 1) ** exponent)
+
+
+def day_weights():
+    """Bobot per hari: tumbuh linear, dengan lonjakan Black Friday dan akhir pekan lebih sepi."""
+    days = START + pd.to_timedelta(np.arange(DAYS), unit='D')
+    weights = np.linspace(0.1, 1.0, DAYS) ** 1.5
+    weights[days.dayofweek >= 5] *= 0.8
+    weights[(days >= BLACK_FRIDAY) & (days < BLACK_FRIDAY + pd.Timedelta(days=3))] *= 4.0
+    return _normalize(weights)
+
+
+class OrderGenerator:
+    """Pembuat potongan data order yang konsisten untuk seluruh ukuran dataset.
+
+    Atribut per pelanggan (lokasi) dan per produk (kategori, harga dasar)
+    ditetapkan sekali, sehingga baris di potongan berbeda tetap saling
+    konsisten saat ditulis bertahap.
+    """
+
+    def __init__(self, n_rows, seed=0):
+        self.rng = np.random.default_rng(seed)
+        # ~1.15 baris per order, ~0.97 order per pelanggan unik seperti data Olist;
+        # pelanggan dipilih dengan kecenderungan Zipf sehingga ada pelanggan setia
+        n_orders = max(int(n_rows / 1.15), 1)
+        self.n_customers = max(int(n_orders * 0.85), 1)
+        self.n_products = max(min(n_rows // 3, 2_000_000), 1)
+        self.customer_weights = zipf_weights(self.n_customers, 0.6)
+
+        city = self.rng.choice(len(CITIES) + 1, self.n_customers, p=_normalize(np.append(CITIES[:, 2], 0.45)))
+        spread = np.where(city == len(CITIES), STATE_SPREAD * 3, 0.15)
+        center = np.vstack([CITIES[:, :2], [[-20.0, -47.0]]])[city]
+        self.customer_lat = (center[:, 0] + self.rng.normal(0, 1, self.n_customers) * spread).astype('float32')
+        self.customer_lng = (center[:, 1] + self.rng.normal(0, 1, self.n_customers) * spread).astype('float32')
+
+        self.product_weights = zipf_weights(self.n_products, 0.9)
+        self.product_category = self.rng.choice(len(CATEGORIES), self.n_products, p=zipf_weights(len(CATEGORIES), 0.8))
+        # ~1.4% produk tanpa kategori, seperti di data asli
+        self.product_category[self.rng.random(self.n_products) < 0.014] = -1
+        self.product_price = np.round(self.rng.lognormal(4.4, 0.9, self.n_products), 2)
+
+        self.day_weights = day_weights()
+        self.hour_weights = _normalize(HOUR_WEIGHTS)
+        self.next_order = 0
+
+    def chunk(self, n_rows):
+        """Satu potongan DataFrame berisi tepat n_rows baris."""
+        rng = self.rng
+        # Jumlah baris per order (item + cicilan pembayaran), minimal 1
+        items = rng.geometric(0.87, n_rows)
+        items = items[np.cumsum(items) <= n_rows]
+        items = np.append(items, n_rows - items.sum()) if items.sum() < n_rows else items
+        n_orders = len(items)
+
+        order_ids = np.arange(self.next_order, self.next_order + n_orders)
+        self.next_order += n_orders
+        customer = rng.choice(self.n_customers, n_orders, p=self.customer_weights)
+        day = rng.choice(DAYS, n_orders, p=self.day_weights)
+        hour = rng.choice(24, n_orders, p=self.hour_weights)
+        timestamp = (START + pd.to_timedelta(day, unit='D') + pd.to_timedelta(hour, unit='h')
+                     + pd.to_timedelta(rng.integers(0, 3600, n_orders), unit='s'))
+        payment = rng.choice(len(PAYMENT_TYPES), n_orders, p=PAYMENT_WEIGHTS)
+        # Satu ulasan per order; ~0.8% order tanpa ulasan
+        review = (rng.choice(5, n_orders, p=REVIEW_WEIGHTS) + 1).astype('float32')
+        review[rng.random(n_orders) < 0.008] = np.nan
+
+        row_order = np.repeat(np.arange(n_orders), items)
+        product = rng.choice(self.n_products, n_rows, p=self.product_weights)
+        category = self.product_category[product]
+        price = self.product_price[product] * rng.uniform(0.9, 1.1, n_rows) + rng.uniform(7, 30, n_rows)
+        customer_rows = customer[row_order]
+
+        return pd.DataFrame({
+            'customer_id': _hex_ids(customer_rows, 0x9E3779B97F4A7C15F39CC0605CEDC835),
+            'order_id': _hex_ids(order_ids[row_order], 0xD6E8FEB86659FD93C2B2AE3D27D4EB4F),
+            'order_purchase_timestamp': timestamp[row_order].strftime('%Y-%m-%d %H:%M:%S'),
+            'payment_value': np.round(price, 2),
+            'payment_type': np.array(PAYMENT_TYPES)[payment[row_order]],
+            'product_category_name': pd.Series(np.array(CATEGORIES, dtype=object)[category]).where(category >= 0),
+            'product_id': _hex_ids(product, 0xBF58476D1CE4E5B94D2E8F6A3B5C7D19),
+            'review_score': review[row_order],
+            'customer_lat': self.customer_lat[customer_rows],
+            'customer_lng': self.customer_lng[customer_rows],
+        })
+
+
+def write_dataset(n_rows, path, seed=0, chunk_size=500_000):
+    """Tulis dataset sintetis n_rows baris ke CSV atau Parquet (menurut ekstensi) secara bertahap."""
+    generator = OrderGenerator(n_rows, seed)
+    tmp_path = path + ".tmp"
+    writer = None
+    written = 0
+    try:
+        while written < n_rows:
+            chunk = generator.chunk(min(chunk_size, n_rows - written))
+            if path.endswith(".parquet"):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                writer.write_table(table)
+            else:
+                chunk.to_csv(tmp_path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def ensure_dataset(n_rows, directory, seed=0):
+    """Path CSV sintetis untuk n_rows baris; dibuat hanya bila belum ada."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"orders_{n_rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        write_dataset(n_rows, path, seed)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buat data order sintetis dengan skema all_data.csv.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--out-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for n in args.rows:
+        path = os.path.join(args.out_dir, f"orders_{n}_seed{args.seed}.{args.format}")
+        start = time.perf_counter()
+        write_dataset(n, path, args.seed)
+        size_mb = os.path.getsize(path) / 1024 ** 2
+        print(f"{n:>10} baris -> {path} ({size_mb:.1f} MB, {time.perf_counter() - start:.1f} s)")
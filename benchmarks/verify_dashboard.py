@@ -0,0 +1,114 @@
+import os
+import sys
+import argparse
+import tempfile
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+from data_loader import DATA_CSV
+from generate_data import OrderGenerator
+
+# Verifikasi dashboard dengan AppTest Streamlit untuk kombinasi filter di
+# tepi rentang (setiap kasus dijalankan lalu semua bagian analisis dibuka,
+# tanpa exception), untuk jendela tanpa transaksi, dan untuk alur ekspor.
+
+
+def labelled(elements, label):
+    return [element for element in elements if element.label == label][0]
+
+
+def run_all_sections(at):
+    assert not at.exception, [e.value for e in at.exception]
+    for section in at.radio(key='active_section').options:
+        at.radio(key='active_section').set_value(section).run()
+        assert not at.exception, [e.value for e in at.exception]
+
+
+def check_one_day_window(at, orders):
+    # Jendela satu hari: setiap pelanggan punya recency yang sama, slider
+    # dengan min == max tidak dibuat
+    day = orders['order_purchase_timestamp'].max().date()
+    labelled(at.date_input, "Rentang Waktu").set_value((day, day)).run()
+    run_all_sections(at)
+    sliders = [slider.label for slider in at.slider]
+    assert "Recency Range" not in sliders, sliders
+    print(f"  jendela satu hari ({day}): tanpa error, slider tanpa rentang dilewati")
+
+
+def check_empty_window(at, orders, empty_day):
+    # Jendela tanpa transaksi: peringatan, bagian analisis dilewati, sisa halaman tetap dirender
+    labelled(at.date_input, "Rentang Waktu").set_value((empty_day, empty_day)).run()
+    assert not at.exception, [e.value for e in at.exception]
+    assert [w.value for w in at.warning] == ["Tidak ada transaksi dalam rentang waktu yang dipilih."]
+    assert not at.radio, "bagian analisis dirender untuk jendela kosong"
+    assert "💬 Feedback Pengunjung" in [h.value for h in at.header], "feedback tidak dirender"
+    print(f"  jendela tanpa transaksi ({empty_day}): peringatan, footer dan feedback tetap dirender")
+
+
+def check_filters_survive_date_change(at, orders):
+    # Kategori dan segmen yang dipilih tetap terpilih saat rentang tanggal diubah
+    category = orders['product_category_name'].value_counts().index[0]
+    segment = at.selectbox(key='segment_filter').options[1]
+    at.selectbox(key='category_filter').set_value(category)
+    at.selectbox(key='segment_filter').set_value(segment).run()
+    assert not at.exception, [e.value for e in at.exception]
+    last = orders['order_purchase_timestamp'].max()
+    window = ((last - pd.DateOffset(months=3)).date(), last.date())
+    labelled(at.date_input, "Rentang Waktu").set_value(window).run()
+    assert (at.selectbox(key='category_filter').value, at.selectbox(key='segment_filter').value) == (category, segment)
+    run_all_sections(at)
+
+    # Kategori yang tidak punya order di jendela waktu: hasil kosong, bukan error
+    first = orders['order_purchase_timestamp'].min()
+    in_first_day = orders.loc[orders['order_purchase_timestamp'].dt.date == first.date(), 'product_category_name']
+    missing = sorted(set(orders['product_category_name'].dropna()) - set(in_first_day))[0]
+    at.selectbox(key='category_filter').set_value(missing)
+    at.selectbox(key='segment_filter').set_value('All')
+    labelled(at.date_input, "Rentang Waktu").set_value((first.date(), first.date())).run()
+    assert at.selectbox(key='category_filter').value == missing
+    run_all_sections(at)
+    print(f"  kategori '{category}' dan segmen '{segment}' tetap terpilih setelah rentang tanggal diubah;"
+          f" kategori tanpa order di jendela ('{missing}') tanpa error")
+
+
+def check_export_download_once(at, orders):
+    # Tombol unduh (isi file disalin ke memori oleh Streamlit) hanya ada pada
+    # run tepat setelah "Siapkan"; rerun berikutnya tidak memuat file lagi
+    sections = at.radio(key='active_section').options
+    at.radio(key='active_section').set_value(next(s for s in sections if 'Insights' in s)).run()
+    assert not at.get('download_button')
+    at.button(key='sales_export_prepare').click().run()
+    assert not at.exception, [e.value for e in at.exception]
+    assert [button.proto.label for button in at.get('download_button')] == ["📥 Download Filtered Sales Data"]
+    at.run()
+    assert not at.get('download_button'), "tombol unduh tetap dirender setelah rerun"
+    print("  tombol unduh ekspor hanya dirender tepat setelah file disiapkan")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi dashboard untuk filter di tepi rentang dan alur ekspor.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        orders = OrderGenerator(args.rows, args.seed).chunk(args.rows)
+        # Satu hari di tengah rentang dikosongkan untuk kasus jendela tanpa transaksi
+        days = pd.to_datetime(orders['order_purchase_timestamp']).dt.date
+        empty_day = sorted(days.unique())[len(days.unique()) // 2]
+        orders = orders[days != empty_day].reset_index(drop=True)
+        orders.to_csv(os.path.join(workdir, DATA_CSV), index=False)
+        orders['order_purchase_timestamp'] = pd.to_datetime(orders['order_purchase_timestamp'])
+        # Dashboard membaca all_data.csv dari direktori kerja; cache bersama dimatikan
+        os.environ["DASHBOARD_PROFILE_LOG"] = ""
+        os.environ["DASHBOARD_SHARED_CACHE"] = ""
+        os.chdir(workdir)
+
+        from streamlit.testing.v1 import AppTest
+        checks = [check_one_day_window, check_filters_survive_date_change, check_export_download_once,
+                  lambda at, orders: check_empty_window(at, orders, empty_day)]
+        for check in checks:
+            at = AppTest.from_file(os.path.join(ROOT, "dashboard.py"), default_timeout=600).run()
+            check(at, orders)
+    print("OK: dashboard berjalan tanpa error untuk semua kasus")
@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from data_loader import load_dataset, convert_to_parquet, DASHBOARD_COLUMNS
+from order_store import OrderStore
+from filter_index import FilterIndex, clip_to_range
+from cube import build_cube, rollup
+from spatial import SpatialGrid, ZOOM_RESOLUTIONS
+from analytics import segmented_rfm, peak_periods
+from engine import DuckDBEngine
+from export import write_export, EXPORT_FORMATS
+from generate_data import OrderGenerator
+
+
+def pandas_results(store, index, rfm, start_date, end_date, category, segment):
+    """Hasil jalur pandas seperti di dashboard (OrderStore + FilterIndex)."""
+    lo, hi = store.bounds(start_date, end_date)
+    category_rows = index.columns['product_category_name'].rows(category) if category else None
+    customers = rfm.index[rfm['segment'] == segment] if segment else None
+    segment_rows = index.customers.rows_for(customers) if segment else None
+    if category_rows is None and segment_rows is None:
+        rows = np.arange(lo, hi)
+    else:
+        rows = index.query(lo, hi, category=category_rows, segment=segment_rows)
+    data = store.take(rows, store.source_columns)[store.source_columns]
+    return data, rows, customers
+
+
+def _key(value):
+    if isinstance(value, tuple):
+        return tuple(_key(v) for v in value)
+    return float(value) if isinstance(value, (int, float, np.number)) else str(value)
+
+
+def read_export(path, fmt):
+    """File ekspor sebagai DataFrame dengan tipe yang bisa dibandingkan antar format."""
+    if fmt == 'parquet':
+        df = pd.read_parquet(path)
+        # Parquet pandas menyimpan kolom categorical dan timestamp ns; DuckDB menulis string dan timestamp us
+        for col in df.columns:
+            if df[col].dtype in ('category', object):
+                df[col] = df[col].astype(object).where(df[col].notna(), None)
+            elif pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = df[col].astype('datetime64[ns]')
+        return df
+    return pd.read_csv(path, compression='gzip' if fmt == 'csv.gz' else None)
+
+
+def compare(engine, store, index, grid, start_date, end_date, category, segment):
+    rfm = segmented_rfm(store.window(start_date, end_date))
+    engine_rfm = engine.rfm(start_date, end_date)
+    pd.testing.assert_frame_equal(engine_rfm, rfm[['recency', 'frequency', 'monetary']], check_index_type=False)
+
+    data, rows, customers = pandas_results(store, index, rfm, start_date, end_date, category, segment)
+    filters = dict(start_date=start_date, end_date=end_date, category=category, customers=customers)
+
+    metrics = engine.order_metrics(**filters)
+    assert metrics['rows'] == len(data)
+    assert metrics['total_orders'] == data['order_id'].nunique()
+    assert metrics['total_products'] == data['product_id'].nunique()
+    assert np.isclose(metrics['total_revenue'], data['payment_value'].sum(), rtol=1e-9)
+
+    reviews = engine.value_counts('review_score', **filters)
+    expected = data['review_score'].value_counts()
+    assert reviews.sort_index().to_dict() == expected.sort_index().to_dict()
+    assert engine.peak_periods(**filters) == peak_periods(data)
+
+    cube = engine.cube(rfm['segment'], **filters)
+    expected_cube = build_cube(data, rfm['segment'])
+    for by in ['month', ['day_of_week', 'hour_of_day'], 'payment_type', 'product_category_name', 'segment']:
+        got, want = rollup(cube, by), rollup(expected_cube, by)
+        # Jam/hari bisa bertipe int (DuckDB) atau float (pandas, bila ada NaT)
+        got.index = pd.Index([_key(k) for k in got.index], tupleize_cols=False)
+        want.index = pd.Index([_key(k) for k in want.index], tupleize_cols=False)
+        pd.testing.assert_frame_equal(got.sort_index(), want.sort_index(), check_dtype=False, rtol=1e-9)
+
+    for zoom in ZOOM_RESOLUTIONS:
+        pd.testing.assert_frame_equal(engine.map_cells(zoom, **filters), grid.aggregate(rows, zoom),
+                                      check_dtype=False, rtol=1e-9)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, (_, suffix, _) in EXPORT_FORMATS.items():
+            got = read_export(engine.export(os.path.join(tmp, "engine" + suffix), fmt, **filters), fmt)
+            want = read_export(write_export(data, os.path.join(tmp, "pandas" + suffix), fmt), fmt)
+            # Koordinat float32 bisa dicetak dengan digit berbeda oleh DuckDB dan pandas
+            pd.testing.assert_frame_equal(got, want, check_dtype=False, rtol=1e-6)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi engine DuckDB terhadap jalur pandas.")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "orders.csv")
+        parquet_path = os.path.join(tmp, "orders.parquet")
+        orders = OrderGenerator(args.rows, args.seed).chunk(args.rows)
+        # Beberapa timestamp kosong, seperti baris rusak di data asli
+        orders.loc[orders.sample(frac=0.002, random_state=args.seed).index, 'order_purchase_timestamp'] = None
+        orders.to_csv(csv_path, index=False)
+
+        df, _ = load_dataset(DASHBOARD_COLUMNS, csv_path, parquet_path)
+        store = OrderStore(df)
+        index = FilterIndex(store.frame)
+        grid = SpatialGrid(store.frame)
+        first, last = store.min_timestamp.date(), store.max_timestamp.date()
+        top_category = store.frame['product_category_name'].value_counts().index[0]
+        cases = [
+            (None, None, None, None),
+            (first, last, None, None),
+            (pd.Timestamp('2017-03-01').date(), pd.Timestamp('2017-08-31').date(), None, None),
+            (pd.Timestamp('2017-05-14').date(), pd.Timestamp('2018-02-03').date(), top_category, None),
+            (first, last, None, 'Hibernating'),
+            (pd.Timestamp('2017-01-10').date(), last, top_category, 'At Risk'),
+        ]
+
+        for source in ('csv', 'parquet'):
+            if source == 'parquet':
+                convert_to_parquet(csv_path, parquet_path)
+            engine = DuckDBEngine(csv_path, parquet_path)
+            assert engine.source == source
+            low, high = engine.time_range()
+            assert (low, high) == (store.min_timestamp, store.max_timestamp)
+            for start_date, end_date, category, segment in cases:
+                started = time.perf_counter()
+                compare(engine, store, index, grid, start_date, end_date, category, segment)
+                # Urutan kategori di sidebar: kemunculan pertama dalam jendela waktu
+                categories = index.columns['product_category_name']
+                first_rows = {c: clip_to_range(categories.rows(c), *store.bounds(start_date, end_date)) for c in categories.labels}
+                expected = sorted((c for c, r in first_rows.items() if len(r)), key=lambda c: first_rows[c][0])
+                assert engine.categories(start_date, end_date) == expected
+                print(f"OK {source:>7} {str(start_date):>10} – {str(end_date):<10} "
+                      f"{category or 'All':<16} {segment or 'All':<8} {time.perf_counter() - started:.2f} s")
+    print("OK: engine DuckDB identik dengan jalur pandas")
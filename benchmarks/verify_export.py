@@ -0,0 +1,91 @@
+import os
+import sys
+import argparse
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from data_loader import load_dataset, DASHBOARD_COLUMNS
+from export import ExportCache, write_export, EXPORT_FORMATS
+from generate_data import OrderGenerator
+
+# Verifikasi ekspor: file yang ditulis per potongan (banyak potongan kecil)
+# dibaca kembali identik dengan satu kali to_csv/to_parquet untuk setiap
+# format, termasuk tabel kosong dan subset kolom, dan cache file ekspor
+# tidak pernah melebihi batas ukurannya kecuali untuk satu file terbaru.
+
+
+def read_back(path, fmt):
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_csv(path, compression='gzip' if fmt == 'csv.gz' else None)
+
+
+def check_roundtrip(df, tmp, chunk_rows):
+    for fmt, (_, suffix, _) in EXPORT_FORMATS.items():
+        chunked = read_back(write_export(df, os.path.join(tmp, "chunked" + suffix), fmt, chunk_rows), fmt)
+        whole = os.path.join(tmp, "whole" + suffix)
+        if fmt == 'parquet':
+            df.to_parquet(whole, index=False)
+        else:
+            df.to_csv(whole, index=False, compression='gzip' if fmt == 'csv.gz' else None)
+        pd.testing.assert_frame_equal(chunked, read_back(whole, fmt))
+        print(f"  {fmt:<8} {len(df):>7} baris, potongan {chunk_rows}: identik")
+
+
+def check_columns(df, tmp, chunk_rows):
+    # Kolom dipilih per potongan: hasilnya sama dengan menulis df[columns]
+    columns = ['order_id', 'payment_value', 'product_category_name']
+    for fmt, (_, suffix, _) in EXPORT_FORMATS.items():
+        chunked = read_back(write_export(df, os.path.join(tmp, "columns" + suffix), fmt, chunk_rows, columns), fmt)
+        whole = read_back(write_export(df[columns], os.path.join(tmp, "subset" + suffix), fmt, chunk_rows), fmt)
+        pd.testing.assert_frame_equal(chunked, whole)
+    print(f"  kolom terpilih {columns}: identik")
+
+
+def check_cache(df, tmp):
+    sizes = {}
+    cache = ExportCache(max_bytes=1, directory=tmp)
+    for fmt, (_, suffix, _) in EXPORT_FORMATS.items():
+        cache.create(('all', fmt), suffix, lambda path: write_export(df, path, fmt))
+        sizes[fmt] = cache.total_bytes
+        # Batas 1 byte: hanya file terbaru yang dipertahankan
+        assert len(cache) == 1 and len(os.listdir(tmp)) == 1
+        with cache.open(('all', fmt)) as f:
+            assert len(f.read()) == sizes[fmt]
+
+    # Muat csv + satu file lain: saat parquet dibuat, csv.gz yang dihapus
+    max_bytes = sizes['csv'] + max(sizes['csv.gz'], sizes['parquet'])
+    tmp = os.path.join(tmp, "lru")
+    os.makedirs(tmp)
+    cache = ExportCache(max_bytes=max_bytes, directory=tmp)
+    for fmt, (_, suffix, _) in EXPORT_FORMATS.items():
+        cache.create(('all', fmt), suffix, lambda path: write_export(df, path, fmt))
+        cache.open(('all', 'csv')).close()  # csv paling baru dipakai, jadi tidak dihapus
+        assert cache.total_bytes <= max_bytes or len(cache) == 1
+    assert cache.open(('all', 'csv.gz')) is None, "file yang paling lama tidak dipakai harus dihapus"
+    cache.open(('all', 'csv')).close()
+    assert sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)) == cache.total_bytes
+    print(f"  cache: total {cache.total_bytes} byte <= batas {max_bytes} byte, LRU menghapus csv.gz")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi ekspor per potongan dan cache file ekspor.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "orders.csv")
+        OrderGenerator(args.rows, args.seed).chunk(args.rows).to_csv(csv_path, index=False)
+        # Tipe kolom seperti di dashboard (categorical, float32, datetime)
+        df, _ = load_dataset(DASHBOARD_COLUMNS, csv_path, os.path.join(tmp, "orders.parquet"))
+        os.remove(csv_path)
+        for chunk_rows in [args.rows // 7, args.rows * 2]:
+            check_roundtrip(df, tmp, chunk_rows)
+        check_roundtrip(df.iloc[:0], tmp, 1000)
+        check_columns(df, tmp, args.rows // 7)
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+        check_cache(df, tmp)
+    print("OK: ekspor per potongan identik dan cache ekspor dalam batas ukuran")
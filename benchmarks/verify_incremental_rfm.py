@@ -0,0 +1,47 @@
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rfm import RFMStore, compute_rfm, PENDING_MIN
+
+
+def random_orders(rng, n, n_customers, start):
+    return pd.DataFrame({
+        'customer_id': [f"c{c}" for c in rng.integers(0, n_customers, n)],
+        'order_id': [f"o{start + i}" for i in range(n)],
+        'order_purchase_timestamp': pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 700 * 86400, n), unit='s'),
+        'payment_value': np.round(rng.lognormal(4.5, 1.0, n), 2),
+    })
+
+
+def check_sequence(seed):
+    # Urutan append acak: jumlah batch dan ukuran batch berbeda per seed
+    rng = np.random.default_rng(seed)
+    n_customers = int(rng.integers(5, 500))
+    batches, start = [], 0
+    for _ in range(int(rng.integers(1, 12))):
+        size = int(rng.integers(0, 400))
+        batches.append(random_orders(rng, size, n_customers, start))
+        start += size
+
+    expected = compute_rfm(pd.concat(batches, ignore_index=True))
+    # pending_min=0: buffer pelanggan baru disisipkan ke state di tengah urutan append
+    for pending_min in [PENDING_MIN, 0]:
+        store = RFMStore(pending_min=pending_min)
+        for batch in batches:
+            store.update(batch)
+        # monetary dibandingkan dengan toleransi karena urutan penjumlahan float berbeda
+        pd.testing.assert_frame_equal(store.to_rfm(), expected, check_index_type=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi RFMStore inkremental terhadap compute_rfm penuh.")
+    parser.add_argument("--sequences", type=int, default=200)
+    args = parser.parse_args()
+
+    for seed in range(args.sequences):
+        check_sequence(seed)
+    print(f"OK: {args.sequences} urutan append acak identik dengan perhitungan penuh")
@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+from data_loader import load_dataset, DASHBOARD_COLUMNS, DATA_CSV
+from rfm import compute_rfm, segment_table
+from order_store import OrderStore
+from spatial import SpatialGrid
+from analytics import order_cube
+from shared_cache import SharedCache, warm_up, SHARED_CACHE_DIR
+from generate_data import OrderGenerator
+
+# Verifikasi cache bersama antarproses: entri dibaca kembali identik (kolom
+# numerik langsung dari file yang dipetakan ke memori), eviction LRU menjaga
+# batas ukuran, beberapa proses yang meminta entri sama hanya menghitungnya
+# sekali, dan setelah warm-up dashboard tidak menghitung entri baru.
+
+
+def check_roundtrip(store, tmp):
+    rfm = segment_table(compute_rfm(store.frame))
+    grid = SpatialGrid(store.frame)
+    cache = SharedCache(os.path.join(tmp, "roundtrip"))
+    for name, frame in [('orders', store.frame), ('rfm', rfm), ('cube', order_cube(store.frame, rfm['segment']))]:
+        cache.get_or_compute(name, ('v1',), lambda: frame)
+        cached = cache.get(name, ('v1',))
+        pd.testing.assert_frame_equal(cached, frame)
+        print(f"  {name:<12} {len(frame):>8} baris: identik")
+    # Kolom numerik tanpa null tidak disalin: array read-only dari file yang dipetakan
+    assert not cache.get('orders', ('v1',))['payment_value'].to_numpy().flags.writeable
+    arrays = cache.get_or_compute('spatial_grid', ('v1',), grid.arrays, kind='arrays')
+    restored = SpatialGrid.from_arrays(store.frame, cache.get('spatial_grid', ('v1',), kind='arrays'))
+    rows = np.arange(0, len(store), 3)
+    for zoom in grid.levels:
+        pd.testing.assert_frame_equal(restored.aggregate(rows, zoom), grid.aggregate(rows, zoom))
+    assert isinstance(arrays['order_codes'], np.ndarray)
+    assert cache.get('rfm', ('v2',)) is None
+    print(f"  spatial_grid {len(grid.levels)} level: identik")
+
+
+def check_eviction(tmp):
+    frame = pd.DataFrame({'x': np.arange(100_000, dtype='float64')})
+    cache = SharedCache(os.path.join(tmp, "eviction"), max_bytes=1)
+    size = None
+    for i in range(3):
+        cache.get_or_compute('frame', (i,), lambda: frame)
+        size = size or cache.total_bytes
+        # Batas 1 byte: hanya entri terbaru yang dipertahankan
+        assert len(cache) == 1 and cache.get('frame', (i,)) is not None
+
+    # Muat dua entri: entri yang paling lama dibaca yang dihapus
+    cache.max_bytes = 2 * size
+    cache.get_or_compute('frame', (3,), lambda: frame)
+    time.sleep(0.01)
+    cache.get('frame', (2,))
+    time.sleep(0.01)
+    cache.get_or_compute('frame', (4,), lambda: frame)
+    assert cache.get('frame', (3,)) is None, "entri yang paling lama dipakai harus dihapus"
+    assert cache.get('frame', (2,)) is not None and cache.get('frame', (4,)) is not None
+    assert cache.total_bytes <= cache.max_bytes
+    print(f"  eviction: {len(cache)} entri, {cache.total_bytes} byte <= batas {cache.max_bytes} byte")
+
+
+def _slow_compute(args):
+    directory, log_path = args
+    cache = SharedCache(directory)
+
+    def compute():
+        with open(log_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.5)
+        return pd.DataFrame({'x': np.arange(10)})
+
+    return len(cache.get_or_compute('slow', ('v1',), compute))
+
+
+def check_processes(tmp, n_processes=4):
+    directory, log_path = os.path.join(tmp, "processes"), os.path.join(tmp, "computed.log")
+    with multiprocessing.get_context("fork").Pool(n_processes) as pool:
+        results = pool.map(_slow_compute, [(directory, log_path)] * n_processes)
+    with open(log_path) as f:
+        computed = f.read().split()
+    assert results == [10] * n_processes
+    assert len(computed) == 1, f"entri dihitung {len(computed)} kali oleh {n_processes} proses"
+    print(f"  {n_processes} proses bersamaan: dihitung sekali, {n_processes - 1} proses membaca hasilnya")
+
+
+def check_warm_up(workdir):
+    # Warm-up lewat entry point, seperti dijalankan sebelum worker server dimulai
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, "shared_cache.py"), "--workers", "1"],
+                   cwd=workdir, check=True, capture_output=True)
+    cold = time.perf_counter() - start
+    cache = SharedCache(SHARED_CACHE_DIR)
+    entries = sorted(os.path.basename(path) for path, _, _ in cache.entries())
+
+    # Worker baru: semua hasil startup dibaca dari cache, tidak ada yang dihitung
+    start = time.perf_counter()
+    names = [name for name, _ in warm_up(cache)]
+    warm = time.perf_counter() - start
+    assert cache.misses == 0 and cache.hits == len(names), (cache.hits, cache.misses)
+    start = time.perf_counter()
+    warm_up(None)
+    uncached = time.perf_counter() - start
+    print(f"  warm-up {cold:.2f} s (proses baru); worker baru: {warm:.2f} s dari cache vs {uncached:.2f} s tanpa cache")
+
+    # Dashboard memakai nama dan key entri yang sama: tidak ada entri baru
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(ROOT, "dashboard.py"), default_timeout=600).run()
+    assert not at.exception, [e.value for e in at.exception]
+    for section in at.radio(key='active_section').options:
+        at.radio(key='active_section').set_value(section).run()
+        assert not at.exception, [e.value for e in at.exception]
+    after = sorted(os.path.basename(path) for path, _, _ in cache.entries())
+    assert after == entries, f"dashboard menghitung entri baru: {sorted(set(after) - set(entries))}"
+    print(f"  dashboard setelah warm-up: {len(entries)} entri ({', '.join(names)}) dipakai tanpa dihitung ulang")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi cache bersama antarproses dan warm-up.")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = os.path.join(tmp, "app")
+        os.makedirs(workdir)
+        OrderGenerator(args.rows, args.seed).chunk(args.rows).to_csv(os.path.join(workdir, DATA_CSV), index=False)
+        df, _ = load_dataset(DASHBOARD_COLUMNS, os.path.join(workdir, DATA_CSV), os.path.join(workdir, "missing.parquet"))
+        check_roundtrip(OrderStore(df), tmp)
+        check_eviction(tmp)
+        check_processes(tmp)
+        # Dashboard dan warm-up membaca all_data.csv dan shared_cache/ dari direktori kerja
+        os.environ["DASHBOARD_PROFILE_LOG"] = ""
+        os.chdir(workdir)
+        check_warm_up(workdir)
+    print("OK: cache bersama identik, dalam batas ukuran, dan dipakai bersama antarproses")
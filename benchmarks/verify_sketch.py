@@ -0,0 +1,161 @@
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from sketch import KLLSketch, rank_error_bound
+from rfm import (RFMSketch, RFMStore, compute_rfm, score_rfm, quintile_scores, exact_boundaries, sketch_partitions,
+                 SCORE_QUANTILES, MAX_STALE_FRACTION)
+from verify_incremental_rfm import random_orders
+
+# Verifikasi batas error sketch kuantil: error rank ternormalisasi setiap
+# kuantil harus <= rank_error_bound(k) untuk minimal 99% query (batas
+# probabilistik), baik untuk satu aliran, update bertahap, maupun gabungan
+# partisi. Skor kuintil RFM dari sketch dibandingkan dengan skor dari
+# kuantil eksak, gabungan sketch partisi harus identik untuk berapa pun
+# pembagian partisi ke worker, dan pelanggan tanpa timestamp (recency NaN)
+# tidak boleh menggeser batas kuintil pelanggan lain.
+
+QUERY_QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+def rank_errors(values, estimates, qs):
+    """Jarak q ke interval rank [F(<x), F(<=x)] dari setiap estimasi x."""
+    ordered = np.sort(values[~np.isnan(values)])
+    below = np.searchsorted(ordered, estimates, side='left') / len(ordered)
+    upto = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return np.maximum(0, np.maximum(below - qs, qs - upto))
+
+
+def distributions(rng, n):
+    return {
+        'lognormal': rng.lognormal(5, 1.2, n),
+        'uniform': rng.uniform(0, 1, n),
+        # Banyak nilai kembar seperti frequency (sebagian besar pelanggan 1 order)
+        'geometric': rng.geometric(0.7, n).astype('float64'),
+        'sorted': np.sort(rng.normal(0, 1, n)),
+    }
+
+
+def build(values, mode, k, seed):
+    if mode == 'single':
+        return KLLSketch(k, seed).update(values)
+    if mode == 'stream':
+        sketch = KLLSketch(k, seed)
+        for batch in np.array_split(values, 200):
+            sketch.update(batch)
+        return sketch
+    partitions = [KLLSketch(k, seed * 100 + i).update(part) for i, part in enumerate(np.array_split(values, 8))]
+    merged = partitions[0]
+    for part in partitions[1:]:
+        merged.merge(part)
+    return merged
+
+
+def check_kll(k, trials, n):
+    bound = rank_error_bound(k)
+    for mode in ['single', 'stream', 'merge']:
+        errors = []
+        for seed in range(trials):
+            for name, values in distributions(np.random.default_rng(seed), n).items():
+                sketch = build(values, mode, k, seed)
+                assert len(sketch) == n and sketch.size() < 4 * k, (mode, name, sketch.size())
+                errors.append(rank_errors(values, sketch.quantiles(QUERY_QUANTILES), QUERY_QUANTILES))
+        errors = np.concatenate(errors)
+        exceed = (errors > bound).mean()
+        print(f"  k={k:<4} {mode:<7} p99 error {np.quantile(errors, 0.99):.4f}  max {errors.max():.4f}  "
+              f"bound {bound:.4f}  query di atas batas {exceed:.2%}")
+        assert exceed <= 0.01, f"error rank KLL melebihi batas untuk {exceed:.2%} query ({mode}, k={k})"
+
+
+def check_scores(rfm, sketch, origin, bound):
+    """Batas kuintil sketch dalam batas error; skor berbeda paling banyak satu kuintil."""
+    boundaries = sketch.boundaries(origin)
+    for col, estimates in boundaries.items():
+        values = rfm[col].to_numpy(dtype='float64')
+        errors = rank_errors(values, estimates, np.array(SCORE_QUANTILES))
+        assert (errors <= bound).all(), (col, errors, bound)
+    approx = score_rfm(rfm, sketch, origin)
+    exact = quintile_scores(rfm, exact_boundaries(rfm))
+    difference = (approx - exact).abs()
+    assert difference.to_numpy().max() <= 1, "skor sketch berbeda lebih dari satu kuintil"
+    return (difference[['r_score', 'f_score', 'm_score']] > 0).to_numpy().mean()
+
+
+def check_worker_split(rfm):
+    """Sketch partisi yang dibangun di worker mana pun dan digabung memberi batas yang sama."""
+    expected = RFMSketch.merged(RFMSketch.partitioned(rfm)).boundaries()
+    labels = sketch_partitions(rfm.index)
+    for workers in [2, 3, 5]:
+        sketches = {}
+        for worker in range(workers):
+            # Urutan baris di worker berbeda dari tabel penuh
+            sketches.update(RFMSketch.partitioned(rfm[labels % workers == worker].iloc[::-1]))
+        boundaries = RFMSketch.merged(sketches).boundaries()
+        for col, values in expected.items():
+            np.testing.assert_array_equal(boundaries[col], values, err_msg=f"{col}, {workers} worker")
+
+
+def check_missing_timestamps(orders):
+    """Pelanggan yang semua order-nya tanpa timestamp (recency NaN) tidak menggeser batas recency."""
+    rfm = compute_rfm(orders)
+    missing = orders.iloc[:3].assign(customer_id='no_timestamp', order_purchase_timestamp=pd.NaT)
+    with_missing = compute_rfm(pd.concat([orders, missing], ignore_index=True))
+    assert np.isnan(with_missing.loc['no_timestamp', 'recency'])
+    for bounds, expected in [(exact_boundaries(with_missing), exact_boundaries(rfm)),
+                             (RFMSketch.merged(RFMSketch.partitioned(with_missing)).boundaries(),
+                              RFMSketch.merged(RFMSketch.partitioned(rfm)).boundaries())]:
+        assert all(np.isfinite(values).all() for values in bounds.values()), bounds
+        np.testing.assert_array_equal(bounds['recency'], expected['recency'])
+    # Pelanggan dengan recency terbesar tetap di kuintil terbawah, bukan skor 5 semua
+    r_scores = score_rfm(with_missing)['r_score']
+    assert r_scores['no_timestamp'] == 1 and r_scores[rfm['recency'].idxmax()] == 1
+    pd.testing.assert_series_equal(r_scores.drop('no_timestamp'), score_rfm(rfm)['r_score'])
+
+
+def check_rfm(trials, n_orders):
+    bound = rank_error_bound()
+    changed = []
+    for seed in range(trials):
+        rng = np.random.default_rng(seed)
+        orders = random_orders(rng, n_orders, n_orders // 2, 0)
+        rfm = compute_rfm(orders)
+        check_worker_split(rfm)
+        check_missing_timestamps(orders)
+
+        # Satu sketch untuk seluruh tabel dan gabungan sketch 8 partisi
+        changed.append(check_scores(rfm, RFMSketch.from_rfm(rfm), 0.0, bound))
+        parts = [RFMSketch.from_rfm(rfm.iloc[rows], seed=i) for i, rows in enumerate(np.array_split(np.arange(len(rfm)), 8))]
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+        changed.append(check_scores(rfm, merged, 0.0, bound))
+
+        # RFMStore inkremental: sketch di-update per batch, nilai lama pelanggan
+        # yang berubah ikut dihitung sebagai error tambahan (stale)
+        store = RFMStore()
+        store.sketch  # buat sketch sejak awal agar jalur update inkremental yang diuji
+        for rows in np.array_split(np.arange(len(orders)), 20):
+            store.update(orders.iloc[rows])
+            assert store.sketch.stale_fraction <= MAX_STALE_FRACTION
+        scores = store.scores()
+        current = store.to_rfm()
+        origin = store.max_date.value / 86400e9
+        check_scores(current, store.sketch, origin, bound + store.sketch.stale_fraction)
+        pd.testing.assert_frame_equal(scores, score_rfm(current, store.sketch, origin))
+    print(f"  skor RFM: rata-rata {np.mean(changed):.2%} skor R/F/M berbeda satu kuintil dari skor eksak;"
+          f" gabungan sketch partisi identik untuk 2, 3, dan 5 worker; recency NaN tidak menggeser batas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi batas error sketch kuantil KLL dan skor kuintil RFM.")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for k in [100, 200]:
+        check_kll(k, args.trials, args.rows)
+    check_rfm(args.trials, args.rows)
+    print("OK: error sketch dalam batas yang didokumentasikan")
@@ -0,0 +1,198 @@
+import io
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from filter_index import LRUCache
+
+
+def bin_edges(values, nbins=50, method='fixed'):
+    """Batas bin untuk histogram yang dihitung di server.
+
+    method='fixed': nbins bin dengan lebar sama dari min ke max.
+    method='auto': jumlah bin adaptif (aturan numpy 'auto', maksimal nbins).
+    Data bilangan bulat dengan rentang kecil memakai satu bin per nilai.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.array([0.0, 1.0])
+    low, high = values.min(), values.max()
+    if np.all(values == np.round(values)) and high - low + 1 <= nbins:
+        return np.arange(low - 0.5, high + 1.5)
+    if method == 'auto':
+        edges = np.histogram_bin_edges(values, bins='auto')
+        if len(edges) - 1 <= nbins:
+            return edges
+    if low == high:
+        return np.array([low - 0.5, high + 0.5])
+    return np.linspace(low, high, nbins + 1)
+
+
+def histogram(values, nbins=50, method='fixed', weights=None):
+    """Hitung (edges, counts) dengan NumPy; hanya hasil ini yang dikirim ke browser.
+
+    weights: jumlah kemunculan tiap nilai, untuk input yang sudah berupa
+    value counts (misalnya hasil query engine) alih-alih nilai mentah.
+    """
+    values = np.asarray(values, dtype='float64')
+    finite = np.isfinite(values)
+    values = values[finite]
+    edges = bin_edges(values, nbins, method)
+    if weights is None:
+        counts, edges = np.histogram(values, bins=edges)
+        return edges, counts
+    counts, edges = np.histogram(values, bins=edges, weights=np.asarray(weights, dtype='float64')[finite])
+    return edges, counts.astype(np.int64)
+
+
+def histogram_figure(edges, counts, title, color, x_title=None, bargap=0):
+    """Bar trace berisi jumlah per bin sebagai pengganti px.histogram."""
+    import plotly.graph_objects as go
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges) * (1 - bargap)
+    fig = go.Figure(go.Bar(
+        x=centers,
+        y=counts,
+        width=widths,
+        marker_color=color,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate="%{customdata[0]:.4g} – %{customdata[1]:.4g}<br>count=%{y}<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title='count')
+    return fig
+
+
+def payload_bytes(fig):
+    """Ukuran JSON figure yang dikirim Streamlit ke browser."""
+    return len(fig.to_json().encode('utf-8'))
+
+
+def allocate_sample(counts, size, min_per_segment):
+    """Kuota sampel per segmen: minimal min_per_segment, sisanya proporsional ukuran segmen."""
+    counts = np.asarray(counts, dtype=np.int64)
+    if counts.sum() <= size:
+        return counts.copy()
+    quota = np.minimum(counts, min_per_segment)
+    remaining = size - quota.sum()
+    if remaining <= 0:
+        # Jatah minimum saja sudah melebihi ukuran sampel: bagi rata sebisanya
+        quota = np.zeros_like(counts)
+        for _ in range(size):
+            open_segments = np.flatnonzero(quota < counts)
+            quota[open_segments[np.argmin(quota[open_segments])]] += 1
+        return quota
+    # Metode sisa terbesar (largest remainder), dibatasi kapasitas tiap segmen
+    while remaining > 0:
+        capacity = counts - quota
+        weights = np.where(capacity > 0, counts, 0)
+        share = remaining * weights / weights.sum()
+        extra = np.minimum(np.floor(share).astype(np.int64), capacity)
+        if extra.sum() == 0:
+            order = np.argsort(-(share - np.floor(share)), kind='stable')
+            extra[order[capacity[order] > 0][:remaining]] = 1
+        quota += extra
+        remaining -= int(extra.sum())
+    return quota
+
+
+class StratifiedSampler:
+    """Sampel terstratifikasi per segmen yang deterministik (seeded).
+
+    Posisi pelanggan setiap segmen diacak sekali saat dibuat; pengambilan
+    sampel cukup berjalan di urutan acak itu sampai kuota terpenuhi,
+    sehingga biayanya sebanding dengan ukuran sampel, bukan populasi.
+    """
+
+    def __init__(self, rfm, seed=42):
+        rng = np.random.default_rng(seed)
+        self.rfm = rfm
+        codes, labels = pd.factorize(rfm['segment'])
+        self.labels = pd.Index(labels)
+        self.shuffled = [rng.permutation(np.flatnonzero(codes == i)) for i in range(len(labels))]
+
+    def sample(self, subset, size=1000, min_per_segment=50):
+        """Ambil sampel dari subset (irisan baris rfm) dengan kuota per segmen."""
+        positions = self.rfm.index.get_indexer(subset.index)
+        mask = np.zeros(len(self.rfm), dtype=bool)
+        mask[positions] = True
+
+        segment_counts = subset['segment'].value_counts()
+        counts = segment_counts.reindex(self.labels, fill_value=0).to_numpy()
+        quota = allocate_sample(counts, size, min_per_segment)
+
+        picked = []
+        for shuffled, want in zip(self.shuffled, quota):
+            taken, start = [], 0
+            chunk = max(int(want) * 2, 64)
+            while want > 0 and start < len(shuffled):
+                candidates = shuffled[start:start + chunk]
+                candidates = candidates[mask[candidates]][:want]
+                taken.append(candidates)
+                want -= len(candidates)
+                start += chunk
+                chunk *= 2
+            picked.extend(taken)
+        if not picked:
+            return subset.iloc[:0]
+        return self.rfm.iloc[np.sort(np.concatenate(picked))]
+
+
+def render_wordcloud_png(frequencies, width=800, height=400):
+    """Word cloud dari pemetaan kategori -> jumlah (tanpa tokenisasi teks), sebagai PNG."""
+    # Diimpor saat word cloud pertama dirender: wordcloud ikut memuat matplotlib
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(width=width, height=height, background_color='white', random_state=42)
+    wordcloud.generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_correlation_heatmap_png(rfm):
+    """Heatmap korelasi recency, frequency, dan monetary sebagai PNG."""
+    # seaborn dan matplotlib (impor paling mahal di dashboard) dimuat saat heatmap pertama dirender
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    fig, ax = plt.subplots()
+    # Only include numeric columns (recency, frequency, monetary)
+    sns.heatmap(rfm[['recency', 'frequency', 'monetary']].corr(), annot=True, cmap='coolwarm', ax=ax)
+    image = io.BytesIO()
+    fig.savefig(image, format='png', bbox_inches='tight', dpi=200)
+    plt.close(fig)
+    return image.getvalue()
+
+
+class WordCloudRenderer:
+    """Render word cloud di worker latar belakang dengan cache PNG per vektor jumlah.
+
+    submit() langsung mengembalikan Future; halaman tetap dirender sementara
+    word cloud dibuat, dan permintaan yang sama hanya dirender sekali.
+    """
+
+    def __init__(self, max_workers=1, cache_size=64):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wordcloud')
+        self.cache = LRUCache(maxsize=cache_size)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, frequencies):
+        key = tuple(sorted((str(name), int(count)) for name, count in frequencies.items()))
+        png = self.cache.get(key)
+        if png is not None:
+            future = Future()
+            future.set_result(png)
+            return future
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = self.executor.submit(self._render, key)
+            return self._pending[key]
+
+    def _render(self, key):
+        try:
+            png = render_wordcloud_png(dict(key))
+            self.cache.put(key, png)
+            return png
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
@@ -0,0 +1,195 @@
+import os
+import time
+import argparse
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+from data_loader import load_dataset, file_fingerprint, decode_index, DATA_CSV, DATA_PARQUET, DASHBOARD_COLUMNS
+
+# Model churn: dilatih offline dari RFM + fitur order, disimpan dengan joblib,
+# lalu dipakai dashboard dan precompute.py untuk menskor seluruh pelanggan
+# dalam satu panggilan predict_proba.
+
+MODEL_PATH = os.path.join("models", "churn_model.joblib")
+
+# Pelanggan dianggap churn bila tidak berbelanja dalam HORIZON_DAYS setelah cutoff
+HORIZON_DAYS = 90
+
+FEATURE_COLUMNS = ['recency', 'frequency', 'monetary', 'n_orders', 'avg_order_value',
+                   'tenure_days', 'avg_review', 'n_categories']
+
+# Ambang probabilitas untuk level risiko yang ditampilkan
+RISK_LEVELS = [(0.7, 'High'), (0.4, 'Medium')]
+# Level untuk pelanggan tanpa probabilitas churn (tidak ada di skor model)
+UNSCORED = 'Unscored'
+
+
+def model_version(path=MODEL_PATH):
+    """Sidik jari file model (kunci cache), atau None bila model belum dilatih."""
+    return file_fingerprint(path) if os.path.exists(path) else None
+
+
+def customer_aggregates(df):
+    """Agregat order per pelanggan yang menjadi dasar fitur churn."""
+    aggregates = df.groupby('customer_id', observed=True).agg(
+        last_purchase=('order_purchase_timestamp', 'max'),
+        first_purchase=('order_purchase_timestamp', 'min'),
+        frequency=('order_id', 'count'),
+        monetary=('payment_value', 'sum'),
+        n_orders=('order_id', 'nunique'),
+        avg_review=('review_score', 'mean'),
+        n_categories=('product_category_name', 'nunique'),
+    )
+    aggregates.index = decode_index(aggregates.index)
+    return aggregates
+
+
+def feature_frame(aggregates, max_date=None):
+    """Fitur churn dari customer_aggregates(); recency dan tenure relatif terhadap max_date."""
+    if max_date is None:
+        max_date = aggregates['last_purchase'].max() + pd.Timedelta(days=1)
+    n_orders = aggregates['n_orders']
+    return pd.DataFrame({
+        'recency': (max_date - aggregates['last_purchase']).dt.days,
+        'frequency': aggregates['frequency'],
+        'monetary': aggregates['monetary'],
+        'n_orders': n_orders,
+        'avg_order_value': aggregates['monetary'] / n_orders.where(n_orders > 0),
+        'tenure_days': (max_date - aggregates['first_purchase']).dt.days,
+        'avg_review': aggregates['avg_review'],
+        'n_categories': aggregates['n_categories'],
+    }, index=aggregates.index).astype('float64')
+
+
+def customer_features(df, max_date=None):
+    """Fitur churn per pelanggan (index customer_id) dari tabel order."""
+    return feature_frame(customer_aggregates(df), max_date)
+
+
+def training_set(df, horizon_days=HORIZON_DAYS):
+    """(X, y, cutoff): fitur dari order sampai cutoff, label 1 bila tidak ada order sesudahnya."""
+    timestamps = df['order_purchase_timestamp']
+    cutoff = timestamps.max() - pd.Timedelta(days=horizon_days)
+    history = df[timestamps <= cutoff]
+    future_customers = df.loc[timestamps > cutoff, 'customer_id'].unique()
+    X = customer_features(history, cutoff + pd.Timedelta(days=1))
+    y = pd.Series(~X.index.isin(future_customers), index=X.index, name='churned').astype('int8')
+    return X, y, cutoff
+
+
+def train_model(df, horizon_days=HORIZON_DAYS, seed=0):
+    """Latih model churn dan kembalikan bundle (model, fitur, metrik) untuk save_model()."""
+    # scikit-learn hanya diimpor saat melatih; dashboard cukup memuat model jadi
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    X, y, cutoff = training_set(df, horizon_days)
+    if y.nunique() < 2:
+        raise ValueError("Label churn hanya berisi satu kelas; coba horizon yang lain")
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed, stratify=y)
+    model = HistGradientBoostingClassifier(max_iter=200, learning_rate=0.1, random_state=seed)
+    model.fit(X_train, y_train)
+    auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    # Model akhir dilatih ulang dengan seluruh data setelah dievaluasi
+    model.fit(X, y)
+    return {
+        'model': model,
+        'features': FEATURE_COLUMNS,
+        'horizon_days': horizon_days,
+        'cutoff': cutoff,
+        'trained_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'metrics': {'customers': len(X), 'churn_rate': float(y.mean()), 'auc': float(auc)},
+    }
+
+
+def save_model(bundle, path=MODEL_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Tulis ke file sementara lalu rename agar dashboard tidak membaca model setengah jadi
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_model(path=MODEL_PATH):
+    """Bundle model dari save_model(), atau None bila belum ada model terlatih."""
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+def risk_levels(probabilities):
+    """Level risiko High/Medium/Low dari probabilitas churn; NaN (pelanggan tanpa skor) menjadi UNSCORED."""
+    values = np.asarray(probabilities, dtype='float64')
+    conditions = [np.isnan(values)] + [values >= threshold for threshold, _ in RISK_LEVELS]
+    labels = np.select(conditions, [UNSCORED] + [label for _, label in RISK_LEVELS], default='Low')
+    return pd.Series(labels, index=getattr(probabilities, 'index', None), name='churn_risk')
+
+
+class ChurnScorer:
+    """Skor churn per pelanggan dengan rescoring inkremental.
+
+    Hash setiap baris fitur yang sudah diskor disimpan; pemanggilan
+    berikutnya hanya mengirim pelanggan baru atau yang barisnya berubah ke
+    model, dalam satu panggilan predict_proba. Karena recency relatif
+    terhadap tanggal order terakhir, data yang memajukan tanggal itu
+    mengubah baris semua pelanggan.
+    """
+
+    def __init__(self, bundle):
+        self.model = bundle['model']
+        self.features = bundle['features']
+        self.horizon_days = bundle['horizon_days']
+        self.hashes = pd.Series(dtype='uint64')
+        self.probabilities = pd.Series(dtype='float64', name='churn_probability')
+        self.last_rescored = 0
+        # Dipakai bersama oleh semua sesi dashboard
+        self._lock = threading.Lock()
+
+    def score(self, features):
+        """Series churn_probability untuk setiap pelanggan di features (index customer_id)."""
+        features = features[self.features]
+        hashes = pd.util.hash_pandas_object(features, index=False).to_numpy()
+        with self._lock:
+            positions = self.hashes.index.get_indexer(features.index)
+            changed = positions < 0
+            known = ~changed
+            changed[known] = self.hashes.to_numpy()[positions[known]] != hashes[known]
+
+            probabilities = np.empty(len(features), dtype='float64')
+            probabilities[known] = self.probabilities.to_numpy()[positions[known]]
+            if changed.any():
+                probabilities[changed] = self.model.predict_proba(features[changed])[:, 1]
+
+            # Pelanggan yang tidak ada lagi di features ikut terbuang
+            self.hashes = pd.Series(hashes, index=features.index)
+            self.probabilities = pd.Series(probabilities, index=features.index, name='churn_probability')
+            self.last_rescored = int(changed.sum())
+            return self.probabilities
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latih model churn dari data order dan simpan ke file model.")
+    parser.add_argument("--csv", default=DATA_CSV)
+    parser.add_argument("--parquet", default=DATA_PARQUET)
+    parser.add_argument("--horizon", type=int, default=HORIZON_DAYS,
+                        help="hari tanpa order setelah cutoff yang dianggap churn")
+    parser.add_argument("--out", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    df, load_report = load_dataset(DASHBOARD_COLUMNS, args.csv, args.parquet)
+    print(f"Load: {load_report['rows']} baris dari {load_report['source']} ({load_report['seconds']:.2f} s)")
+    start = time.perf_counter()
+    bundle = train_model(df, args.horizon)
+    metrics = bundle['metrics']
+    print(f"Training: {metrics['customers']} pelanggan, churn rate {metrics['churn_rate']:.1%}, "
+          f"AUC {metrics['auc']:.3f}, cutoff {bundle['cutoff'].date()} ({time.perf_counter() - start:.2f} s)")
+    print(f"Model ditulis ke {save_model(bundle, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# Dimensi cube: bulan × hari × jam × kategori produk × metode pembayaran × segmen pelanggan
+CUBE_DIMENSIONS = ['month', 'day_of_week', 'hour_of_day', 'product_category_name', 'payment_type', 'segment']
+CUBE_MEASURES = ['count', 'revenue', 'review_sum', 'review_count']
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def time_dimensions(df):
+    """(bulan, hari, jam) per baris; memakai kolom waktu turunan OrderStore bila ada.
+
+    Hasilnya bertipe sama dengan turunan dari timestamp: bulan string (NaN
+    untuk NaT), hari dan jam int32, atau float64 bila ada NaT.
+    """
+    if 'order_purchase_month' in df.columns:
+        day, hour = df['day_of_week'], df['hour_of_day']
+        valid = day >= 0
+        if valid.all():
+            day, hour = day.astype('int32'), hour.astype('int32')
+        else:
+            day, hour = day.where(valid), hour.where(valid)
+        return df['order_purchase_month'].astype(object), day, hour
+    timestamps = df['order_purchase_timestamp']
+    return (timestamps.dt.to_period('M').astype(str).where(timestamps.notna()),
+            timestamps.dt.dayofweek, timestamps.dt.hour)
+
+
+def order_dimensions(df, segments):
+    """Kolom dimensi untuk setiap baris order (tanpa mengubah df)."""
+    month, day_of_week, hour_of_day = time_dimensions(df)
+    return pd.DataFrame({
+        'month': month,
+        'day_of_week': day_of_week,
+        'hour_of_day': hour_of_day,
+        'product_category_name': df['product_category_name'],
+        'payment_type': df['payment_type'],
+        'segment': df['customer_id'].map(segments),
+    }, index=df.index)
+
+
+def build_cube(df, segments):
+    """Agregasi awal order menjadi sel cube (hanya sel yang berisi data).
+
+    segments adalah Series customer_id -> segmen dari tabel RFM.
+    """
+    cells = order_dimensions(df, segments)
+    review = df['review_score'].astype('float64')
+    cells['count'] = 1
+    cells['revenue'] = df['payment_value']
+    cells['review_sum'] = review.fillna(0.0)
+    cells['review_count'] = review.notna().astype('int64')
+    cube = cells.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)[CUBE_MEASURES].sum().reset_index()
+    for col in ['product_category_name', 'payment_type', 'segment']:
+        cube[col] = cube[col].astype('category')
+    return cube
+
+
+def aligned_months(start_date, end_date, first_date, last_date):
+    """Daftar bulan 'YYYY-MM' bila jendela waktu mencakup bulan-bulan penuh, selain itu None.
+
+    Batas jendela yang jatuh pada tanggal pertama/terakhir data dianggap
+    selaras karena tidak ada order di luarnya.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    start_aligned = start.day == 1 or start_date == first_date
+    end_aligned = end.is_month_end or end_date == last_date
+    if not (start_aligned and end_aligned):
+        return None
+    return pd.period_range(start, end, freq='M').astype(str).tolist()
+
+
+def rollup(cube, by, months=None, category=None, segment=None):
+    """Jumlahkan measure cube per dimensi `by` untuk filter yang aktif.
+
+    months: koleksi string 'YYYY-MM' yang masuk jendela waktu (None = semua).
+    category / segment: nilai tunggal atau None untuk 'All'.
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    if months is not None:
+        mask &= cube['month'].isin(months).to_numpy()
+    if category is not None:
+        mask &= (cube['product_category_name'] == category).to_numpy()
+    if segment is not None:
+        mask &= (cube['segment'] == segment).to_numpy()
+    if isinstance(by, str):
+        by = [by]
+    return cube[mask].groupby(by, observed=True)[CUBE_MEASURES].sum()
@@ -1,64 +1,161 @@
-import os
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import timedelta
-import seaborn as sns
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-import numpy as np
-import calendar
-from plotly.subplots import make_subplots
-import time
+from profiler import RerunProfiler, profiled_cache, append_log, fragment_section, process_startup
+
+# Profiler per rerun: waktu dan memori setiap bagian serta hit/miss cache.
+# Dibuat sebelum impor lain agar waktu impor modul tercatat (section 'imports');
+# pustaka visualisasi berat (seaborn, matplotlib, wordcloud) baru dimuat saat
+# chart yang memakainya pertama kali dirender
+profiler = RerunProfiler().activate()
+with profiler.section('imports'):
+    import streamlit as st
+    import pandas as pd
+    import plotly.express as px
+    import numpy as np
+    from data_loader import data_version, file_fingerprint
+    from rfm import SEGMENT_RULES_FILE, DEFAULT_SEGMENT, load_segment_rules
+    from order_store import TIME_FIELDS
+    from cube import build_cube, aligned_months
+    from analytics import (filter_rfm, order_summary, SUMMARY_COLUMNS, churn_risk, segment_characteristics,
+                           monthly_sales, hourly_sales, hourly_heatmap, payment_breakdown, category_summary)
+    from engine import ENGINE, DuckDBEngine
+    from churn import ChurnScorer, load_model, model_version, risk_levels, UNSCORED
+    from parallel import CUBE_INPUT_COLUMNS
+    from filter_index import FilterIndex, LRUCache
+    from chart_data import histogram, histogram_figure, StratifiedSampler, WordCloudRenderer
+    from spatial import ZOOM_RESOLUTIONS
+    from export import ExportCache, write_export, EXPORT_FORMATS
+    from feedback_store import init_store, add_feedback, feedback_summary, count_feedback, search_feedback
+    from shared_cache import (SharedCache, SHARED_CACHE_DIR, load_order_store, spatial_grid, segmented_rfm,
+                              order_cube, churn_scores, correlation_heatmap)
 
 # 🛠 Set konfigurasi halaman Streamlit
 st.set_page_config(page_title="E-Commerce Data Analysis", page_icon="📊", layout="wide")
 
-# Load dataset
+# Cache hasil bersama antarproses di disk (shared_cache.py); None bila DASHBOARD_SHARED_CACHE dikosongkan
+@st.cache_resource
+def get_shared_cache():
+    return SharedCache() if SHARED_CACHE_DIR else None
+
+# Load dataset (Parquet kolumnar jika tersedia, CSV sebagai fallback) ke
+# OrderStore terurut waktu; dibagi antar sesi dan tidak dimodifikasi. Bila
+# proses server lain (atau warm-up) sudah memuatnya, dibaca dari cache bersama
+@profiled_cache(st.cache_resource)
+def load_data(data_version):
+    return load_order_store(get_shared_cache(), data_version)
+
+# Mode engine 'duckdb' (DASHBOARD_ENGINE=duckdb): data tidak dimuat ke memori,
+# filter dan agregasi dijalankan sebagai query atas Parquet
+@profiled_cache(st.cache_resource)
+def get_engine(data_version):
+    return DuckDBEngine()
+
+# Hitung RFM + segmen sekali per versi data, versi aturan segmen, dan rentang waktu;
+# argumen _store (OrderStore atau DuckDBEngine) tidak di-hash oleh Streamlit,
+# kuncinya adalah sidik jari. Rentang penuh dibaca dari artefak precompute.py bila versinya cocok.
+# Dashboard tidak membuat process pool (fork dari server Streamlit yang
+# multi-thread tidak aman); RFM dan cube seluruh data dihitung paralel oleh
+# warm-up cache bersama atau precompute.py dengan --workers
+@profiled_cache(st.cache_data)
+def get_rfm(data_version, rules_version, start_date, end_date, _store):
+    return segmented_rfm(get_shared_cache(), data_version, rules_version, start_date, end_date, _store)
+
+# Cube OLAP untuk tab Sales dan Product: sekali per versi data, segmen dari RFM seluruh data
+@profiled_cache(st.cache_data)
+def get_cube(data_version, rules_version, _store):
+    return order_cube(get_shared_cache(), data_version, rules_version, _store,
+                      lambda: get_rfm(data_version, rules_version, None, None, _store))
+
+# Query engine per kombinasi filter (argumen _filters tidak di-hash; kuncinya filter_key)
+@profiled_cache(st.cache_data)
+def get_engine_summary(filter_key, _engine, _filters):
+    return _engine.order_summary(**_filters)
+
+@profiled_cache(st.cache_data)
+def get_engine_cube(filter_key, _engine, _segments, _filters):
+    return _engine.cube(_segments, **_filters)
+
+@profiled_cache(st.cache_data)
+def get_engine_map_cells(filter_key, zoom, _engine, _filters):
+    return _engine.map_cells(zoom, **_filters)
+
+# Model churn terlatih (churn.py) dimuat sekali per versi file model; scorer menyimpan
+# skor terakhir sehingga versi data baru hanya menskor ulang pelanggan yang fiturnya berubah
+@profiled_cache(st.cache_resource)
+def get_churn_scorer(model_version):
+    bundle = load_model()
+    return None if bundle is None else ChurnScorer(bundle)
+
+# Probabilitas churn seluruh pelanggan, sekali per versi data dan versi model;
+# dari artefak precompute.py bila dibuat dengan model yang sama
+@profiled_cache(st.cache_data)
+def get_churn_scores(data_version, rules_version, model_version, _store):
+    return churn_scores(get_shared_cache(), data_version, rules_version, model_version, _store,
+                        lambda: get_churn_scorer(model_version))
+
+# Index row id untuk filter kategori/pembayaran/pelanggan/segmen dan cache
+# LRU hasil filter; keduanya dibagi antar sesi untuk satu versi data
+@profiled_cache(st.cache_resource)
+def get_filter_index(data_version, _store):
+    return FilterIndex(_store.frame)
+
+@st.cache_resource
+def get_filter_cache(data_version):
+    return LRUCache(maxsize=32)
+
+# Grid spasial multi-resolusi untuk peta, dihitung sekali per versi data
+@profiled_cache(st.cache_resource)
+def get_spatial_grid(data_version, _store):
+    return spatial_grid(get_shared_cache(), data_version, _store)
+
+# Sel peta per kombinasi filter dan level zoom (row id = posisi di OrderStore.frame);
+# slice jendela baru diubah menjadi row id di dalam cache, hanya saat cache miss
+@profiled_cache(st.cache_data)
+def get_map_cells(filter_key, zoom, _grid, _store, _rows):
+    return _grid.aggregate(_store.row_ids(_rows), zoom)
+
+# Sampler 3D scatter: urutan acak per segmen disiapkan sekali per tabel RFM
+@profiled_cache(st.cache_resource)
+def get_sampler(rfm_key, _rfm):
+    return StratifiedSampler(_rfm)
+
+# Sampel per kombinasi filter; seed tetap sehingga filter yang sama memberi sampel yang sama
+@profiled_cache(st.cache_data)
+def get_scatter_sample(filter_key, _sampler, _subset):
+    return _sampler.sample(_subset, size=1000, min_per_segment=50)
+
+# File ekspor yang sudah dibuat (dibatasi total ukuran, LRU), dibagi antar sesi
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+# Worker latar belakang untuk word cloud, dibagi antar sesi
+@st.cache_resource
+def get_wordcloud_renderer():
+    return WordCloudRenderer()
+
+# Kategori seluruh data, urut sesuai kemunculan pertama; _source adalah FilterIndex atau DuckDBEngine
+@profiled_cache(st.cache_data)
+def get_product_categories(data_version, _source):
+    if isinstance(_source, DuckDBEngine):
+        return _source.categories()
+    category_index = _source.columns['product_category_name']
+    first_rows = {category: category_index.rows(category) for category in category_index.labels}
+    return sorted((category for category, rows in first_rows.items() if len(rows)), key=lambda category: first_rows[category][0])
+
+# Nama segmen sesuai urutan aturan, ditambah segmen default
 @st.cache_data
-def load_data():
-    all_data = pd.read_csv("all_data.csv")
-    all_data['order_purchase_timestamp'] = pd.to_datetime(all_data['order_purchase_timestamp'], errors='coerce')
-    return all_data
-
-all_data = load_data()
-
-# Menentukan tanggal analisis
-max_date = all_data['order_purchase_timestamp'].max() + timedelta(days=1)
-
-# Menghitung Recency, Frequency, dan Monetary (RFM)
-rfm = all_data.groupby('customer_id').agg({
-    'order_purchase_timestamp': lambda x: (max_date - x.max()).days,
-    'order_id': 'count',
-    'payment_value': 'sum'
-}).rename(columns={
-    'order_purchase_timestamp': 'recency',
-    'order_id': 'frequency',
-    'payment_value': 'monetary'
-})
-
-# RFM Segmentation
-def rfm_segment(row):
-    # Definisi untuk RFM segmentation
-    if row['recency'] <= 30 and row['frequency'] >= 3 and row['monetary'] >= 1000:
-        return 'Champions'
-    elif row['recency'] <= 30 and row['frequency'] >= 2 and row['monetary'] >= 750:
-        return 'Loyal Customers'
-    elif row['recency'] <= 90 and row['frequency'] >= 2 and row['monetary'] >= 500:
-        return 'Potential Loyalists'
-    elif row['recency'] <= 30 and row['frequency'] <= 2 and row['monetary'] <= 250:
-        return 'New Customers'
-    elif row['recency'] <= 180 and row['frequency'] >= 3 and row['monetary'] >= 500:
-        return 'Need Attention'
-    elif row['recency'] > 180 and row['frequency'] >= 2 and row['monetary'] >= 250:
-        return 'At Risk'
-    elif row['recency'] > 365 and row['frequency'] <= 2 and row['monetary'] <= 250:
-        return 'Lost'
+def get_segment_names(rules_version):
+    return load_segment_rules()['segment'].tolist() + [DEFAULT_SEGMENT]
+
+with profiler.section('load_data'):
+    current_version = data_version()
+    if ENGINE == 'duckdb':
+        data_engine = get_engine(current_version)
+        data_source, data_columns = data_engine, data_engine.columns
     else:
-        return 'Others'
-
-rfm['segment'] = rfm.apply(rfm_segment, axis=1)
+        order_store, load_report = load_data(current_version)
+        filter_index = get_filter_index(current_version, order_store)
+        filter_cache = get_filter_cache(current_version)
+        data_source, data_columns = order_store, order_store.frame.columns
 
 st.title("📊 E-Commerce Data Analysis Dashboard")
 
@@ -82,411 +179,627 @@ st.markdown("---")
 
 # Sidebar untuk filter
 st.sidebar.header("🔍 Filter Data")
-recency_range = st.sidebar.slider("Recency Range", int(rfm['recency'].min()), int(rfm['recency'].max()), (int(rfm['recency'].min()), int(rfm['recency'].max())))
-frequency_range = st.sidebar.slider("Frequency Range", int(rfm['frequency'].min()), int(rfm['frequency'].max()), (int(rfm['frequency'].min()), int(rfm['frequency'].max())))
-monetary_range = st.sidebar.slider("Monetary Range", float(rfm['monetary'].min()), float(rfm['monetary'].max()), (float(rfm['monetary'].min()), float(rfm['monetary'].max())))
-
-product_categories = all_data['product_category_name'].dropna().unique().tolist()
-selected_category = st.sidebar.selectbox("Pilih Kategori Produk", ['All'] + product_categories)
-
-# Tambahkan filter untuk segmen pelanggan
-customer_segments = rfm['segment'].unique().tolist()
-selected_segment = st.sidebar.selectbox("Pilih Segmen Pelanggan", ['All'] + customer_segments)
-
-# Tambahkan filter periode waktu
-if 'order_purchase_timestamp' in all_data.columns:
-    min_date = all_data['order_purchase_timestamp'].min().date()
-    max_date_filter = all_data['order_purchase_timestamp'].max().date()
-    date_range = st.sidebar.date_input(
-        "Rentang Waktu",
-        [min_date, max_date_filter],
-        min_value=min_date,
-        max_value=max_date_filter
-    )
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        all_data = all_data[(all_data['order_purchase_timestamp'].dt.date >= start_date) & 
-                           (all_data['order_purchase_timestamp'].dt.date <= end_date)]
-
-if selected_category != 'All':
-    filtered_data = all_data[all_data['product_category_name'] == selected_category]
+if ENGINE == 'duckdb':
+    st.sidebar.caption(f"Data: {data_engine.source} • engine DuckDB (out-of-core)")
+    first_timestamp, last_timestamp = data_engine.time_range()
 else:
-    filtered_data = all_data
-
-filtered_rfm = rfm[(rfm['recency'].between(recency_range[0], recency_range[1])) &
-                    (rfm['frequency'].between(frequency_range[0], frequency_range[1])) &
-                    (rfm['monetary'].between(monetary_range[0], monetary_range[1]))]
-
-if selected_segment != 'All':
-    filtered_rfm = filtered_rfm[filtered_rfm['segment'] == selected_segment]
-    customer_ids = filtered_rfm.index.tolist()
-    filtered_data = filtered_data[filtered_data['customer_id'].isin(customer_ids)]
-
-# Tambahkan tab untuk memisahkan bagian analisis
-tabs = st.tabs(["📌 Summary", "👥 Customer Segmentation", "📊 Sales Analysis", "🔍 Product Analysis", "💡 Insights"])
-
-with tabs[0]:
-    st.subheader("📌 RFM Summary (Filtered)")
-    st.write(filtered_rfm.describe())
+    st.sidebar.caption(f"Data: {load_report['source']} • {load_report['seconds']:.2f} s • {load_report['memory_mb']:.1f} MB")
+    first_timestamp, last_timestamp = order_store.min_timestamp, order_store.max_timestamp
+
+# Filter periode waktu lebih dulu, karena RFM dihitung dalam rentang ini
+min_date = first_timestamp.date()
+max_date_filter = last_timestamp.date()
+date_range = st.sidebar.date_input(
+    "Rentang Waktu",
+    [min_date, max_date_filter],
+    min_value=min_date,
+    max_value=max_date_filter
+)
+if len(date_range) == 2:
+    start_date, end_date = date_range
+    window_dates = dict(start_date=start_date, end_date=end_date)
+else:
+    start_date, end_date = min_date, max_date_filter
+    window_dates = dict(start_date=None, end_date=None)
+if ENGINE == 'duckdb':
+    window_bounds = tuple(window_dates.values())
+else:
+    window_bounds = order_store.bounds(**window_dates)
+    window_rows = slice(*window_bounds)
+
+# Menghitung Recency, Frequency, dan Monetary (RFM) dalam rentang terpilih;
+# rentang penuh memakai seluruh data agar cache-nya dipakai bersama
+if (start_date, end_date) == (min_date, max_date_filter):
+    start_date = end_date = None
+with profiler.section('rfm'):
+    rules_version = file_fingerprint(SEGMENT_RULES_FILE)
+    rfm = get_rfm(current_version, rules_version, start_date, end_date, data_source)
+# Pilihan kategori dan segmen dari seluruh data, bukan dari jendela waktu:
+# pilihan selectbox yang berubah membuat Streamlit menganggapnya widget baru,
+# sehingga pilihan pengguna kembali ke 'All' setiap kali rentang tanggal diubah
+if ENGINE != 'duckdb':
+    category_index = filter_index.columns['product_category_name']
+product_categories = get_product_categories(current_version, data_engine if ENGINE == 'duckdb' else filter_index)
+selected_category = st.sidebar.selectbox("Pilih Kategori Produk", ['All'] + product_categories, key='category_filter')
+
+# Tambahkan filter untuk segmen pelanggan (semua segmen dari aturan segmen)
+customer_segments = get_segment_names(rules_version)
+selected_segment = st.sidebar.selectbox("Pilih Segmen Pelanggan", ['All'] + customer_segments, key='segment_filter')
+
+# Jendela tanpa transaksi: hanya bagian analisis yang dilewati; footer,
+# feedback, dan log profiler tetap dijalankan
+has_orders = not rfm.empty
+full_window = start_date is None
+if not has_orders:
+    st.warning("Tidak ada transaksi dalam rentang waktu yang dipilih.")
+else:
+    # Slider rentang RFM (inklusif). Kolom yang hanya punya satu nilai dalam jendela
+    # waktu (misalnya jendela satu hari) tidak bisa dibuat slider karena min == max:
+    # seluruh rentangnya langsung dipakai sebagai filter
+    rfm_bounds = {col: (cast(rfm[col].min()), cast(rfm[col].max()))
+                  for col, cast in [('recency', int), ('frequency', int), ('monetary', float)]}
+
+    def rfm_range_slider(label, column):
+        low, high = rfm_bounds[column]
+        if low == high:
+            st.sidebar.caption(f"{label}: semua pelanggan bernilai {low}")
+            return (low, high)
+        return st.sidebar.slider(label, low, high, (low, high))
+
+    recency_range = rfm_range_slider("Recency Range", 'recency')
+    frequency_range = rfm_range_slider("Frequency Range", 'frequency')
+    monetary_range = rfm_range_slider("Monetary Range", 'monetary')
+
+    sliders_full = (recency_range == rfm_bounds['recency'] and frequency_range == rfm_bounds['frequency'] and
+                    monetary_range == rfm_bounds['monetary'])
+
+    # Terapkan filter lewat index row id; hasil akhir (row id, bukan salinan
+    # baris order) disimpan di cache LRU dengan kunci seluruh kombinasi filter
+    with profiler.section('filters'):
+        filter_key = (current_version, rules_version, window_bounds, selected_category, selected_segment,
+                      recency_range, frequency_range, monetary_range)
+        segment_filter = None if selected_segment == 'All' else selected_segment
+        if ENGINE == 'duckdb':
+            # Filter diteruskan ke query; pelanggan terpilih dikirim sebagai tabel kecil
+            filtered_rfm = filter_rfm(rfm, recency_range, frequency_range, monetary_range, segment_filter)
+            engine_filters = dict(window_dates,
+                                  category=None if selected_category == 'All' else selected_category,
+                                  customers=None if segment_filter is None else filtered_rfm.index)
+            filter_result = (None, filtered_rfm, get_engine_summary(filter_key, data_engine, engine_filters))
+        else:
+            engine_filters = None
+            filter_result = filter_cache.get(filter_key)
+            profiler.cache_event('filter_cache', hit=filter_result is not None)
+        if filter_result is None:
+            filtered_rfm = filter_rfm(rfm, recency_range, frequency_range, monetary_range, segment_filter)
+
+            category_rows = None
+            if selected_category != 'All':
+                category_rows = category_index.rows(selected_category)
+
+            segment_rows = None
+            if selected_segment != 'All':
+                if full_window and sliders_full:
+                    # Segmen dari RFM seluruh data: pakai index segmen yang sudah jadi
+                    segment_rows = filter_index.segment_index(rules_version, rfm['segment']).rows(selected_segment)
+                else:
+                    segment_rows = filter_index.customers.rows_for(filtered_rfm.index)
 
-    total_customers = filtered_rfm.shape[0]
-    avg_recency = filtered_rfm['recency'].mean()
-    avg_frequency = filtered_rfm['frequency'].mean()
-    avg_monetary = filtered_rfm['monetary'].mean()
+            if category_rows is None and segment_rows is None:
+                filtered_rows = window_rows
+            else:
+                filtered_rows = filter_index.query(*window_bounds, category=category_rows, segment=segment_rows)
+            filtered_summary = order_summary(order_store.take(filtered_rows, SUMMARY_COLUMNS))
+            filter_result = (filtered_rows, filtered_rfm, filtered_summary)
+            filter_cache.put(filter_key, filter_result)
+        filtered_rows, filtered_rfm, filtered_summary = filter_result
+
+# Histogram dibinning di server per kombinasi filter; browser hanya menerima jumlah per bin
+@profiled_cache(st.cache_data)
+def get_histograms(filter_key, _filtered_rfm, _review_counts):
+    return {
+        'recency': histogram(_filtered_rfm['recency'], nbins=50),
+        'frequency': histogram(_filtered_rfm['frequency'], nbins=50),
+        'monetary': histogram(_filtered_rfm['monetary'], nbins=50),
+        'review_score': histogram(_review_counts.index, nbins=5, weights=_review_counts.to_numpy()),
+    }
 
-    # Tambahkan animasi loading untuk metrik
-    with st.spinner("Loading metrics..."):
-        time.sleep(0.5)  # Simulasi loading
+# Cube kecil dari baris terfilter, untuk filter yang tidak bisa dijawab cube utama;
+# hanya kolom input cube yang diambil dari baris tersebut
+@profiled_cache(st.cache_data)
+def get_filtered_cube(filter_key, _store, _rows, _segments):
+    return build_cube(_store.take(_rows, CUBE_INPUT_COLUMNS + TIME_FIELDS), _segments)
+
+# Heatmap korelasi RFM dirender (PNG) sekali per tabel RFM, bukan setiap rerun;
+# lewat cache bersama, worker baru setelah warm-up tidak perlu memuat seaborn
+@profiled_cache(st.cache_data)
+def get_correlation_heatmap(rfm_key, _rfm):
+    return correlation_heatmap(get_shared_cache(), rfm_key, _rfm)
+
+# Pilih sumber agregat: cube yang sudah dihitung bila filter aktif dapat dijawab
+# dengan roll-up (jendela bulan penuh, segmen dari RFM seluruh data), selain
+# itu cube kecil dibangun dari baris yang sudah terfilter. Cube baru dihitung
+# saat unit yang memakainya dirender
+cube_months = None if full_window else aligned_months(start_date, end_date, min_date, max_date_filter)
+segment_from_cube = selected_segment == 'All' or (has_orders and full_window and sliders_full)
+
+def sales_source():
+    if full_window or cube_months is not None:
+        return get_cube(current_version, rules_version, data_source), cube_months
+    if ENGINE == 'duckdb':
+        return get_engine_cube(('sales',) + filter_key[:3], data_engine, rfm['segment'], window_dates), None
+    return get_filtered_cube(('sales',) + filter_key[:3], order_store, window_rows, rfm['segment']), None
+
+def product_source():
+    if (full_window or cube_months is not None) and segment_from_cube:
+        product_filters = dict(months=cube_months,
+                               category=None if selected_category == 'All' else selected_category,
+                               segment=None if selected_segment == 'All' else selected_segment)
+        return get_cube(current_version, rules_version, data_source), product_filters
+    if ENGINE == 'duckdb':
+        return get_engine_cube(filter_key, data_engine, rfm['segment'], engine_filters), {}
+    return get_filtered_cube(filter_key, order_store, filtered_rows, rfm['segment']), {}
+
+# Setiap bagian analisis adalah fragment dengan input eksplisit: widget di
+# dalamnya hanya menjalankan ulang fragment itu, dan bagian yang tidak dipilih
+# tidak dihitung sama sekali
+SECTIONS = ["📌 Summary", "👥 Customer Segmentation", "📊 Sales Analysis", "🔍 Product Analysis", "💡 Insights"]
+
+@st.fragment
+def summary_section(filter_key, rfm_key, rfm, filtered_rfm, filtered_summary):
+    with fragment_section('summary') as profiler:
+        profiler.step('describe')
+        st.subheader("📌 RFM Summary (Filtered)")
+        st.write(filtered_rfm.describe())
+
+        total_customers = filtered_rfm.shape[0]
+        avg_recency = filtered_rfm['recency'].mean()
+        avg_frequency = filtered_rfm['frequency'].mean()
+        avg_monetary = filtered_rfm['monetary'].mean()
+
+        profiler.step('metrics')
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Total Customers", total_customers)
         col2.metric("Avg Recency", f"{avg_recency:.2f} days")
         col3.metric("Avg Frequency", f"{avg_frequency:.2f} orders")
         col4.metric("Avg Monetary", f"${avg_monetary:.2f}")
 
-    # Tambahkan baris metrik ringkasan tambahan
-    total_orders = filtered_data['order_id'].nunique()
-    total_revenue = filtered_data['payment_value'].sum()
-    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-    total_products = filtered_data['product_id'].nunique()
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Orders", total_orders)
-    col2.metric("Total Revenue", f"${total_revenue:.2f}")
-    col3.metric("Avg Order Value", f"${avg_order_value:.2f}")
-    col4.metric("Total Products", total_products)
-
-    # Use only numeric columns for correlation
-    st.subheader("📊 Heatmap Hubungan antara RFM Metrics")
-    fig, ax = plt.subplots()
-    # Only include numeric columns (recency, frequency, monetary)
-    rfm_numeric = rfm[['recency', 'frequency', 'monetary']]
-    sns.heatmap(rfm_numeric.corr(), annot=True, cmap='coolwarm', ax=ax)
-    st.pyplot(fig)
+        # Tambahkan baris metrik ringkasan tambahan
+        total_orders = filtered_summary['total_orders']
+        total_revenue = filtered_summary['total_revenue']
+        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
+        total_products = filtered_summary['total_products']
 
-    
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Orders", total_orders)
+        col2.metric("Total Revenue", f"${total_revenue:.2f}")
+        col3.metric("Avg Order Value", f"${avg_order_value:.2f}")
+        col4.metric("Total Products", total_products)
+
+        profiler.step('corr_heatmap')
+        st.subheader("📊 Heatmap Hubungan antara RFM Metrics")
+        st.image(get_correlation_heatmap(rfm_key, rfm), use_container_width=True)
+
+        profiler.step('histograms')
+        histograms = get_histograms(filter_key, filtered_rfm, filtered_summary['review_counts'])
+
+        # Visualisasi Distribusi Recency
+        st.subheader("📈 Recency Distribution")
+        fig_recency = histogram_figure(*histograms['recency'], title='Recency Distribution', color='blue', x_title='recency')
+        st.plotly_chart(fig_recency, use_container_width=True)
+
+        # Visualisasi Distribusi Frequency
+        st.subheader("📉 Frequency Distribution")
+        fig_frequency = histogram_figure(*histograms['frequency'], title='Frequency Distribution', color='green', x_title='frequency')
+        st.plotly_chart(fig_frequency, use_container_width=True)
+
+        # Visualisasi Distribusi Monetary
+        st.subheader("💰 Monetary Distribution")
+        fig_monetary = histogram_figure(*histograms['monetary'], title='Monetary Distribution', color='orange', x_title='monetary')
+        st.plotly_chart(fig_monetary, use_container_width=True)
+
+@st.fragment
+def segmentation_section(filter_key, rfm_key, rfm, filtered_rfm):
+    with fragment_section('segmentation') as profiler:
+        st.subheader("👥 Segmentasi Pelanggan")
+
+        # Visualisasi segmen pelanggan
+        profiler.step('segment_charts')
+        segment_counts = filtered_rfm['segment'].value_counts()
+        segment_counts = segment_counts[segment_counts > 0].reset_index()
+        segment_counts.columns = ['Segment', 'Count']
 
-    # Visualisasi Distribusi Recency
-    st.subheader("📈 Recency Distribution")
-    fig_recency = px.histogram(filtered_rfm, x='recency', nbins=50, title='Recency Distribution', color_discrete_sequence=['blue'])
-    st.plotly_chart(fig_recency, use_container_width=True)
+        col1, col2 = st.columns(2)
 
-    # Visualisasi Distribusi Frequency
-    st.subheader("📉 Frequency Distribution")
-    fig_frequency = px.histogram(filtered_rfm, x='frequency', nbins=50, title='Frequency Distribution', color_discrete_sequence=['green'])
-    st.plotly_chart(fig_frequency, use_container_width=True)
+        with col1:
+            fig_segments = px.pie(segment_counts, values='Count', names='Segment', title='Distribusi Segmen Pelanggan',
+                                 color_discrete_sequence=px.colors.qualitative.Bold)
+            fig_segments.update_traces(textposition='inside', textinfo='percent+label')
+            st.plotly_chart(fig_segments, use_container_width=True)
 
-    # Visualisasi Distribusi Monetary
-    st.subheader("💰 Monetary Distribution")
-    fig_monetary = px.histogram(filtered_rfm, x='monetary', nbins=50, title='Monetary Distribution', color_discrete_sequence=['orange'])
-    st.plotly_chart(fig_monetary, use_container_width=True)
+        with col2:
+            fig_segments_bar = px.bar(segment_counts, x='Segment', y='Count',
+                                     title='Jumlah Pelanggan per Segmen',
+                                     color='Segment', color_discrete_sequence=px.colors.qualitative.Bold)
+            st.plotly_chart(fig_segments_bar, use_container_width=True)
+
+        # 3D Scatter plot untuk segmentasi RFM
+        profiler.step('scatter_3d')
+        st.subheader("🔍 3D Visualisasi RFM Segments")
+        # Sampel terstratifikasi (min. 50 titik per segmen, maks. 1000 titik) untuk performa
+        sampler = get_sampler(rfm_key, rfm)
+        sampled_rfm = get_scatter_sample(filter_key, sampler, filtered_rfm)
+
+        fig_3d = px.scatter_3d(sampled_rfm, x='recency', y='frequency', z='monetary',
+                              color='segment', size='monetary', opacity=0.7,
+                              title="3D Visualisasi Segmentasi RFM",
+                              color_discrete_sequence=px.colors.qualitative.Bold)
+
+        fig_3d.update_layout(scene=dict(
+            xaxis_title='Recency (days)',
+            yaxis_title='Frequency (orders)',
+            zaxis_title='Monetary (value)'
+        ))
+
+        st.plotly_chart(fig_3d, use_container_width=True)
+
+        # Karakteristik segmen
+        profiler.step('characteristics')
+        st.subheader("📊 Karakteristik Segmen Pelanggan")
+        segment_summary = segment_characteristics(filtered_rfm)
+
+        fig_char = px.bar(segment_summary, x='segment', y=['recency', 'frequency', 'monetary'],
+                         title="Rata-rata Metrik RFM per Segmen", barmode='group',
+                         color_discrete_sequence=px.colors.qualitative.Safe)
+
+        st.plotly_chart(fig_char, use_container_width=True)
+
+# Pilihan metrik hanya menggambar ulang grafik tren dari agregat bulanan yang sudah ada
+@st.fragment
+def monthly_trend(monthly_data):
+    with fragment_section('trend_chart'):
+        # Tambahkan pilihan metrik untuk visualisasi
+        sales_metric = st.radio("Pilih Metrik Penjualan", ["Jumlah Pesanan", "Pendapatan"], horizontal=True)
+
+        y_column = 'count' if sales_metric == "Jumlah Pesanan" else 'revenue'
+        y_title = 'Jumlah Pesanan' if sales_metric == "Jumlah Pesanan" else 'Pendapatan (USD)'
+
+        fig_trend = px.line(monthly_data, x='order_purchase_month', y=y_column,
+                           title=f'Tren {sales_metric} Bulanan', markers=True,
+                           labels={'order_purchase_month': 'Bulan', y_column: y_title})
+
+        fig_trend.update_xaxes(categoryorder='category ascending')  # Mengurutkan bulan secara kronologis
+        st.plotly_chart(fig_trend, use_container_width=True)
+
+@st.fragment
+def sales_section(sales_source, product_source):
+    with fragment_section('sales') as profiler:
+        st.subheader("📅 Analisis Penjualan")
+
+        # Tren penjualan dari waktu ke waktu
+        profiler.step('monthly_trend')
+        st.subheader("📈 Tren Penjualan Bulanan")
+        sales_cube, sales_months = sales_source()
+        # Gunakan format tanggal yang JSON serializable
+        monthly_trend(monthly_sales(sales_cube, months=sales_months))
+
+        # Heatmap Penjualan Mingguan
+        profiler.step('hourly_heatmap')
+        if 'order_purchase_timestamp' in data_columns:
+            st.subheader("🔥 Heatmap Penjualan Harian")
+            hourly_sales_pivot = hourly_heatmap(hourly_sales(sales_cube, months=sales_months))
+
+            fig = px.imshow(hourly_sales_pivot,
+                           labels=dict(x="Jam", y="Hari", color="Jumlah Pesanan"),
+                           x=hourly_sales_pivot.columns,
+                           y=hourly_sales_pivot.index,
+                           color_continuous_scale='Viridis')
+
+            fig.update_layout(
+                title="Heatmap Waktu Pemesanan (Hari vs Jam)",
+                xaxis_title="Jam",
+                yaxis_title="Hari"
+            )
 
-with tabs[1]:
-    st.subheader("👥 Segmentasi Pelanggan")
-    
-    # Visualisasi segmen pelanggan
-    segment_counts = filtered_rfm['segment'].value_counts().reset_index()
-    segment_counts.columns = ['Segment', 'Count']
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        fig_segments = px.pie(segment_counts, values='Count', names='Segment', title='Distribusi Segmen Pelanggan', 
-                             color_discrete_sequence=px.colors.qualitative.Bold)
-        fig_segments.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_segments, use_container_width=True)
-    
-    with col2:
-        fig_segments_bar = px.bar(segment_counts, x='Segment', y='Count', 
-                                 title='Jumlah Pelanggan per Segmen',
-                                 color='Segment', color_discrete_sequence=px.colors.qualitative.Bold)
-        st.plotly_chart(fig_segments_bar, use_container_width=True)
-    
-    # 3D Scatter plot untuk segmentasi RFM
-    st.subheader("🔍 3D Visualisasi RFM Segments")
-    sample_size = min(1000, len(filtered_rfm))  # Batasi sampel untuk performa
-    sampled_rfm = filtered_rfm.sample(sample_size) if len(filtered_rfm) > sample_size else filtered_rfm
-    
-    fig_3d = px.scatter_3d(sampled_rfm, x='recency', y='frequency', z='monetary',
-                          color='segment', size='monetary', opacity=0.7,
-                          title="3D Visualisasi Segmentasi RFM",
-                          color_discrete_sequence=px.colors.qualitative.Bold)
-    
-    fig_3d.update_layout(scene=dict(
-        xaxis_title='Recency (days)',
-        yaxis_title='Frequency (orders)',
-        zaxis_title='Monetary (value)'
-    ))
-    
-    st.plotly_chart(fig_3d, use_container_width=True)
-    
-    # Karakteristik segmen
-    st.subheader("📊 Karakteristik Segmen Pelanggan")
-    segment_characteristics = filtered_rfm.groupby('segment').agg({
-        'recency': 'mean',
-        'frequency': 'mean',
-        'monetary': 'mean'
-    }).reset_index()
-    
-    segment_characteristics = segment_characteristics.round(2)
-    
-    fig_char = px.bar(segment_characteristics, x='segment', y=['recency', 'frequency', 'monetary'],
-                     title="Rata-rata Metrik RFM per Segmen", barmode='group',
-                     color_discrete_sequence=px.colors.qualitative.Safe)
-    
-    st.plotly_chart(fig_char, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True)
+
+        # Analisis Metode Pembayaran
+        profiler.step('payment')
+        st.subheader("💳 Analisis Metode Pembayaran")
+        if 'payment_type' in data_columns:
+            product_cube, product_filters = product_source()
+            payment_counts, payment_revenue = payment_breakdown(product_cube, **product_filters)
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                fig_payment = px.pie(
+                    values=payment_counts.values,
+                    names=payment_counts.index,
+                    title="Distribusi Metode Pembayaran",
+                    hole=0.4
+                )
+                st.plotly_chart(fig_payment, use_container_width=True)
+
+            with col2:
+                fig_payment_rev = px.bar(
+                    payment_revenue,
+                    x='payment_type',
+                    y='payment_value',
+                    title="Pendapatan per Metode Pembayaran",
+                    color='payment_type',
+                    labels={'payment_type': 'Metode Pembayaran', 'payment_value': 'Pendapatan (USD)'}
+                )
+                st.plotly_chart(fig_payment_rev, use_container_width=True)
+        else:
+            st.warning("Kolom 'payment_type' tidak ditemukan dalam dataset.")
+
+# Perubahan zoom hanya mengambil sel grid level baru dan menggambar ulang peta
+@st.fragment
+def sales_map(filter_key, filtered_rows, engine_filters, n_rows):
+    with fragment_section('map_chart'):
+        # Level zoom menentukan ukuran sel grid; hanya satu titik per sel yang dikirim
+        map_zoom = st.select_slider("Level Zoom Peta", options=list(ZOOM_RESOLUTIONS), value=3)
+        if ENGINE == 'duckdb':
+            map_data = get_engine_map_cells(filter_key, map_zoom, data_engine, engine_filters)
+        else:
+            spatial_grid = get_spatial_grid(current_version, order_store)
+            map_data = get_map_cells(filter_key, map_zoom, spatial_grid, order_store, filtered_rows)
+        map_center = None
+        if not map_data.empty:
+            map_center = dict(lat=float(np.average(map_data['lat'], weights=map_data['orders'])),
+                              lon=float(np.average(map_data['lng'], weights=map_data['orders'])))
+        fig_map = px.scatter_mapbox(map_data, lat='lat', lon='lng', size='orders', color='revenue',
+                                    hover_data={'orders': True, 'revenue': ':.2f'},
+                                    zoom=map_zoom, center=map_center, mapbox_style="carto-positron",
+                                    color_continuous_scale='Viridis',
+                                    title="Distribusi Pelanggan di Brazil")
+        st.caption(f"{len(map_data)} sel grid {ZOOM_RESOLUTIONS[map_zoom]}° dari {n_rows} baris order")
+        st.plotly_chart(fig_map, use_container_width=True)
+
+@st.fragment
+def product_section(filter_key, filtered_rfm, filtered_summary, filtered_rows, engine_filters, product_source):
+    with fragment_section('product') as profiler:
+        st.subheader("🔍 Analisis Produk")
+
+        # Top 10 Kategori Produk
+        profiler.step('top_categories')
+        st.subheader("🏆 Top 10 Kategori Produk")
+        product_cube, product_filters = product_source()
+        category_totals = category_summary(product_cube, **product_filters)
+        top_categories = category_totals['count'].nlargest(10)
+        if top_categories.empty:
+            st.info("Tidak ada penjualan produk untuk filter yang dipilih.")
+        else:
+            fig_top = px.bar(
+                x=top_categories.index,
+                y=top_categories.values,
+                title="Top 10 Kategori Produk",
+                labels={'x': 'Kategori', 'y': 'Jumlah Penjualan'},
+                color_discrete_sequence=['#1f77b4']
+            )
+            st.plotly_chart(fig_top, use_container_width=True)
+
+        # Word Cloud Produk Terlaris
+        profiler.step('wordcloud_submit')
+        st.subheader("🌟 Word Cloud Produk Terlaris")
+        # Menghindari error jika tidak ada kategori produk yang dipilih
+        category_frequencies = category_totals['count'][category_totals['count'] > 0].to_dict()
+        if category_frequencies:
+            # Dibuat dari jumlah per kategori di worker latar belakang; gambar diisi di akhir bagian ini
+            wordcloud_slot = st.empty()
+            wordcloud_slot.info("Membuat word cloud...")
+            wordcloud_job = get_wordcloud_renderer().submit(category_frequencies)
+        else:
+            wordcloud_job = None
+            st.warning("Tidak ada data kategori produk untuk ditampilkan.")
+
+        # Analisis Penjualan vs Review
+        profiler.step('ratings')
+        if 'review_score' in data_columns and 'product_category_name' in data_columns:
+            st.subheader("⭐ Analisis Rating Produk")
+
+            avg_reviews = category_totals['review_score'].reset_index()
+            avg_reviews = avg_reviews.sort_values('review_score', ascending=False).head(10)
+
+            fig_reviews = px.bar(
+                avg_reviews,
+                x='product_category_name',
+                y='review_score',
+                title="Kategori Produk dengan Rating Tertinggi",
+                color='review_score',
+                color_continuous_scale=px.colors.sequential.Viridis,
+                labels={'product_category_name': 'Kategori Produk', 'review_score': 'Rating Rata-rata'}
+            )
+            st.plotly_chart(fig_reviews, use_container_width=True)
+
+            # Distribusi review score
+            st.subheader("📊 Distribusi Rating")
+            histograms = get_histograms(filter_key, filtered_rfm, filtered_summary['review_counts'])
+            fig_rating_dist = histogram_figure(
+                *histograms['review_score'],
+                title="Distribusi Rating Produk",
+                color='goldenrod',
+                x_title='review_score',
+                bargap=0.1
+            )
+            st.plotly_chart(fig_rating_dist, use_container_width=True)
+
+        # Peta Interaktif
+        profiler.step('map')
+        st.subheader("🗺️ Peta Distribusi Penjualan di Brazil")
+        if 'customer_lat' in data_columns and 'customer_lng' in data_columns:
+            sales_map(filter_key, filtered_rows, engine_filters, filtered_summary['rows'])
+        else:
+            st.warning("Kolom 'customer_lat' dan 'customer_lng' tidak ditemukan dalam dataset.")
+
+        # Isi word cloud setelah bagian lain di unit ini selesai dirender; pada run
+        # penuh unit ini juga yang terakhir dijalankan (lihat analysis_area)
+        profiler.step('wordcloud_render')
+        if wordcloud_job is not None:
+            wordcloud_slot.image(wordcloud_job.result(), use_container_width=True)
+
+# Panel ekspor satu tabel: pilih format, siapkan file (sekali per filter dan
+# format, ditulis per potongan ke disk), lalu unduh. Tombol hanya menjalankan ulang panel ini.
+# st.download_button membaca seluruh file ke media file manager Streamlit (di
+# memori, per sesi), jadi tombol unduh hanya dirender pada run tepat setelah
+# "Siapkan" ditekan; rerun berikutnya tidak mereferensikan file itu lagi dan
+# Streamlit melepas salinannya. File di disk tetap tersimpan, sehingga menekan
+# "Siapkan" lagi untuk filter dan format yang sama tidak menulis ulang file
+@st.fragment
+def export_panel(name, label, file_stem, export_key, write):
+    export_format = st.selectbox(f"Format {label}", list(EXPORT_FORMATS), key=f"{name}_export_format",
+                                 format_func=lambda fmt: EXPORT_FORMATS[fmt][0])
+    _, suffix, mime = EXPORT_FORMATS[export_format]
+    key = export_key + (export_format,)
+    export_cache = get_export_cache()
+    export_file = None
+    if st.button(f"⚙️ Siapkan {label}", key=f"{name}_export_prepare"):
+        export_file = export_cache.open(key)
+        if export_file is None:
+            with st.spinner("Menyiapkan file..."):
+                export_cache.create(key, suffix, lambda path: write(path, export_format))
+            export_file = export_cache.open(key)
+    if export_file is not None:
+        with export_file:
+            st.download_button(
+                label=f"📥 Download {label}",
+                data=export_file,
+                file_name=file_stem + suffix,
+                mime=mime,
+                key=f"{name}_export_download",
+                on_click='ignore',
+            )
+
+@st.fragment
+def insights_section(filter_key, filtered_rfm, filtered_summary, filtered_rows, engine_filters):
+    with fragment_section('insights') as profiler:
+        st.subheader("💡 Insights dan Rekomendasi")
+
+        # Ekspor Data
+        profiler.step('export')
+        st.subheader("📤 Ekspor Data Analisis")
+
+        # File baru ditulis saat tombol "Siapkan" ditekan, bukan di setiap rerun
+        if ENGINE == 'duckdb':
+            write_sales = lambda path, fmt: data_engine.export(path, fmt, **engine_filters)
+        else:
+            write_sales = lambda path, fmt: write_export(order_store.take(filtered_rows, order_store.source_columns),
+                                                         path, fmt, columns=order_store.source_columns)
 
-with tabs[2]:
-    st.subheader("📅 Analisis Penjualan")
-    
-    # Tren penjualan dari waktu ke waktu
-    st.subheader("📈 Tren Penjualan Bulanan")
-    # Gunakan format tanggal yang JSON serializable
-    all_data['order_purchase_month'] = all_data['order_purchase_timestamp'].dt.to_period('M').astype(str)
-    monthly_sales = all_data.groupby('order_purchase_month').size().reset_index(name='count')
-    monthly_revenue = all_data.groupby('order_purchase_month')['payment_value'].sum().reset_index()
-    monthly_revenue.columns = ['order_purchase_month', 'revenue']
-    
-    monthly_data = pd.merge(monthly_sales, monthly_revenue, on='order_purchase_month')
-    
-    # Tambahkan pilihan metrik untuk visualisasi
-    sales_metric = st.radio("Pilih Metrik Penjualan", ["Jumlah Pesanan", "Pendapatan"], horizontal=True)
-    
-    y_column = 'count' if sales_metric == "Jumlah Pesanan" else 'revenue'
-    y_title = 'Jumlah Pesanan' if sales_metric == "Jumlah Pesanan" else 'Pendapatan (USD)'
-    
-    fig_trend = px.line(monthly_data, x='order_purchase_month', y=y_column, 
-                       title=f'Tren {sales_metric} Bulanan', markers=True,
-                       labels={'order_purchase_month': 'Bulan', y_column: y_title})
-    
-    fig_trend.update_xaxes(categoryorder='category ascending')  # Mengurutkan bulan secara kronologis
-    st.plotly_chart(fig_trend, use_container_width=True)
-    
-    # Heatmap Penjualan Mingguan
-    if 'order_purchase_timestamp' in all_data.columns:
-        st.subheader("🔥 Heatmap Penjualan Harian")
-        all_data['day_of_week'] = all_data['order_purchase_timestamp'].dt.day_name()
-        all_data['hour_of_day'] = all_data['order_purchase_timestamp'].dt.hour
-        
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        
-        hourly_sales = all_data.groupby(['day_of_week', 'hour_of_day']).size().reset_index(name='count')
-        hourly_sales_pivot = hourly_sales.pivot_table(index='day_of_week', columns='hour_of_day', values='count', fill_value=0)
-        
-        # Reindex to ensure correct order of days
-        hourly_sales_pivot = hourly_sales_pivot.reindex(day_order)
-        
-        fig = px.imshow(hourly_sales_pivot, 
-                       labels=dict(x="Jam", y="Hari", color="Jumlah Pesanan"),
-                       x=hourly_sales_pivot.columns, 
-                       y=hourly_sales_pivot.index,
-                       color_continuous_scale='Viridis')
-        
-        fig.update_layout(
-            title="Heatmap Waktu Pemesanan (Hari vs Jam)",
-            xaxis_title="Jam",
-            yaxis_title="Hari"
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Analisis Metode Pembayaran
-    st.subheader("💳 Analisis Metode Pembayaran")
-    if 'payment_type' in filtered_data.columns:
-        payment_counts = filtered_data['payment_type'].value_counts()
-        payment_revenue = filtered_data.groupby('payment_type')['payment_value'].sum().reset_index()
-        
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            fig_payment = px.pie(
-                values=payment_counts.values,
-                names=payment_counts.index,
-                title="Distribusi Metode Pembayaran",
-                hole=0.4
-            )
-            st.plotly_chart(fig_payment, use_container_width=True)
-        
+            export_panel('rfm', "RFM Data", 'rfm_data', ('rfm',) + filter_key,
+                         lambda path, fmt: write_export(filtered_rfm.reset_index(), path, fmt))
+
         with col2:
-            fig_payment_rev = px.bar(
-                payment_revenue,
-                x='payment_type',
-                y='payment_value',
-                title="Pendapatan per Metode Pembayaran",
-                color='payment_type',
-                labels={'payment_type': 'Metode Pembayaran', 'payment_value': 'Pendapatan (USD)'}
+            export_panel('sales', "Filtered Sales Data", 'filtered_sales_data', ('sales',) + filter_key, write_sales)
+
+        # Tampilkan insights berdasarkan analisis data
+        profiler.step('key_insights')
+        st.subheader("🔍 Key Insights")
+
+        # Calculating insights
+        top_segment = filtered_rfm['segment'].value_counts().index[0] if len(filtered_rfm) > 0 else "N/A"
+        top_category = filtered_summary['top_category']
+        peak_month_name, peak_day_name = filtered_summary['peak_month'], filtered_summary['peak_day']
+
+        insights = [
+            f"Segmen pelanggan terbesar adalah '{top_segment}', yang memerlukan strategi khusus untuk mempertahankan loyalitas mereka.",
+            f"Kategori produk terlaris adalah '{top_category}', yang menunjukkan permintaan pasar yang tinggi.",
+            f"Bulan dengan penjualan tertinggi adalah {peak_month_name}, yang menunjukkan pola musiman dalam penjualan.",
+            f"Hari dengan penjualan tertinggi adalah {peak_day_name}, yang dapat dimanfaatkan untuk strategi promosi.",
+        ]
+
+        for i, insight in enumerate(insights):
+            st.write(f"{i+1}. {insight}")
+
+        # Rekomendasi berdasarkan segmen pelanggan
+        profiler.step('recommendations')
+        st.subheader("📋 Rekomendasi Strategi")
+
+        rekomendasi = {
+            "Champions": "Tawarkan program loyalitas eksklusif dan akses ke produk terbaru.",
+            "Loyal Customers": "Berikan diskon khusus dan penawaran bundle untuk meningkatkan nilai transaksi.",
+            "Potential Loyalists": "Promosikan program membership dan manfaatnya untuk mendorong pembelian berulang.",
+            "New Customers": "Tawarkan pengalaman onboarding yang menarik dan insentif untuk pembelian kedua.",
+            "Need Attention": "Kirimkan email personalisasi dengan penawaran untuk kembali berbelanja.",
+            "At Risk": "Berikan diskon besar dan penawaran istimewa untuk mengembalikan minat mereka.",
+            "Promising": "Bangun kedekatan merek lewat rekomendasi produk dan voucher pembelian berikutnya.",
+            "About to Sleep": "Ingatkan dengan produk populer dan diskon terbatas waktu sebelum mereka berhenti berbelanja.",
+            "Can't Lose Them": "Hubungi secara personal dan tawarkan insentif terbaik agar pelanggan bernilai tinggi ini kembali.",
+            "Hibernating": "Tawarkan produk relevan dengan harga khusus untuk membangkitkan kembali minat mereka.",
+            "Lost": "Jalankan kampanye reaktivasi dengan penawaran yang tidak dapat ditolak."
+        }
+
+        for segment, reco in rekomendasi.items():
+            expander = st.expander(f"Strategi untuk Segmen '{segment}'")
+            with expander:
+                st.write(reco)
+
+        # Prediksi Sederhana
+        profiler.step('churn')
+        st.subheader("🔮 Prediksi Churn Risk")
+
+        if len(filtered_rfm) > 0:
+            current_model = model_version()
+            if current_model is not None and get_churn_scorer(current_model) is not None:
+                # Probabilitas dari model terlatih, dihitung untuk seluruh pelanggan per versi data
+                churn_scores = get_churn_scores(current_version, rules_version, current_model, data_source)
+                # Pelanggan tanpa skor model (NaN setelah reindex) dihitung terpisah, bukan sebagai 'Low'
+                churn_levels = risk_levels(churn_scores.reindex(filtered_rfm.index))
+                st.caption(f"Probabilitas tidak berbelanja dalam {get_churn_scorer(current_model).horizon_days} hari "
+                           "ke depan menurut model churn terlatih.")
+                unscored = int((churn_levels == UNSCORED).sum())
+                if unscored:
+                    st.caption(f"{unscored} pelanggan belum memiliki skor churn dan ditampilkan sebagai '{UNSCORED}'.")
+            else:
+                # Tanpa model terlatih: risiko churn sederhana berdasarkan recency
+                churn_levels = churn_risk(filtered_rfm)
+                st.caption("Model churn belum dilatih (`python churn.py`); risiko dihitung dari recency.")
+
+            churn_counts = churn_levels.value_counts().reset_index()
+            churn_counts.columns = ['Risk Level', 'Count']
+
+            fig_churn = px.pie(
+                churn_counts,
+                values='Count',
+                names='Risk Level',
+                title="Distribusi Risiko Churn Pelanggan",
+                color='Risk Level',
+                color_discrete_map={'High': 'red', 'Medium': 'orange', 'Low': 'green', UNSCORED: 'lightgrey'}
             )
-            st.plotly_chart(fig_payment_rev, use_container_width=True)
-    else:
-        st.warning("Kolom 'payment_type' tidak ditemukan dalam dataset.")
 
-with tabs[3]:
-    st.subheader("🔍 Analisis Produk")
-    
-    # Top 10 Kategori Produk
-    st.subheader("🏆 Top 10 Kategori Produk")
-    top_categories = filtered_data['product_category_name'].value_counts().nlargest(10)
-    fig_top = px.bar(
-        x=top_categories.index, 
-        y=top_categories.values, 
-        title="Top 10 Kategori Produk",
-        labels={'x': 'Kategori', 'y': 'Jumlah Penjualan'},
-        color_discrete_sequence=['#1f77b4']
-    )
-    st.plotly_chart(fig_top, use_container_width=True)
-    
-    # Word Cloud Produk Terlaris
-    st.subheader("🌟 Word Cloud Produk Terlaris")
-    # Menghindari error jika tidak ada kategori produk yang dipilih
-    if filtered_data['product_category_name'].dropna().shape[0] > 0:
-        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(' '.join(filtered_data['product_category_name'].dropna()))
-        fig, ax = plt.subplots()
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis("off")
-        st.pyplot(fig)
-    else:
-        st.warning("Tidak ada data kategori produk untuk ditampilkan.")
-    
-    # Analisis Penjualan vs Review
-    if 'review_score' in filtered_data.columns and 'product_category_name' in filtered_data.columns:
-        st.subheader("⭐ Analisis Rating Produk")
-        
-        avg_reviews = filtered_data.groupby('product_category_name')['review_score'].mean().reset_index()
-        avg_reviews = avg_reviews.sort_values('review_score', ascending=False).head(10)
-        
-        fig_reviews = px.bar(
-            avg_reviews,
-            x='product_category_name',
-            y='review_score',
-            title="Kategori Produk dengan Rating Tertinggi",
-            color='review_score',
-            color_continuous_scale=px.colors.sequential.Viridis,
-            labels={'product_category_name': 'Kategori Produk', 'review_score': 'Rating Rata-rata'}
-        )
-        st.plotly_chart(fig_reviews, use_container_width=True)
-        
-        # Distribusi review score
-        st.subheader("📊 Distribusi Rating")
-        fig_rating_dist = px.histogram(
-            filtered_data,
-            x='review_score',
-            nbins=5,
-            title="Distribusi Rating Produk",
-            color_discrete_sequence=['goldenrod']
-        )
-        fig_rating_dist.update_layout(bargap=0.1)
-        st.plotly_chart(fig_rating_dist, use_container_width=True)
-    
-    # Peta Interaktif
-    st.subheader("🗺️ Peta Distribusi Penjualan di Brazil")
-    if 'customer_lat' in all_data.columns and 'customer_lng' in all_data.columns:
-        map_data = all_data.dropna(subset=['customer_lat', 'customer_lng'])
-        fig_map = px.scatter_mapbox(map_data, lat='customer_lat', lon='customer_lng', zoom=3, mapbox_style="carto-positron",
-                                    title="Distribusi Pelanggan di Brazil")
-        st.plotly_chart(fig_map, use_container_width=True)
-    else:
-        st.warning("Kolom 'customer_lat' dan 'customer_lng' tidak ditemukan dalam dataset.")
+            st.plotly_chart(fig_churn, use_container_width=True)
+
+            # Highlight high risk customers
+            if 'High' in churn_levels.values:
+                high_risk = int((churn_levels == 'High').sum())
+                st.warning(f"⚠️ Terdapat {high_risk} pelanggan dengan risiko churn tinggi. Perlu tindakan segera untuk kampanye retensi.")
+
+@st.fragment
+def analysis_sections(filter_key, rfm_key, rfm, filtered_rfm, filtered_summary, filtered_rows, engine_filters,
+                      sales_source, product_source):
+    # Pindah bagian hanya menjalankan ulang fragment ini, bukan seluruh skrip
+    with fragment_section('sections'):
+        active_section = st.radio("Bagian Analisis", SECTIONS, horizontal=True,
+                                  key='active_section', label_visibility='collapsed')
+        if active_section == SECTIONS[0]:
+            summary_section(filter_key, rfm_key, rfm, filtered_rfm, filtered_summary)
+        elif active_section == SECTIONS[1]:
+            segmentation_section(filter_key, rfm_key, rfm, filtered_rfm)
+        elif active_section == SECTIONS[2]:
+            sales_section(sales_source, product_source)
+        elif active_section == SECTIONS[3]:
+            product_section(filter_key, filtered_rfm, filtered_summary, filtered_rows, engine_filters, product_source)
+        else:
+            insights_section(filter_key, filtered_rfm, filtered_summary, filtered_rows, engine_filters)
 
-with tabs[4]:
-    st.subheader("💡 Insights dan Rekomendasi")
-    
-    # Ekspor Data
-    st.subheader("📤 Ekspor Data Analisis")
-    
-    # Fungsi helper untuk ekspor data
-    @st.cache_data
-    def convert_df_to_csv(df):
-        return df.to_csv(index=False).encode('utf-8')
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.download_button(
-            label="📥 Download RFM Data",
-            data=convert_df_to_csv(filtered_rfm.reset_index()),
-            file_name='rfm_data.csv',
-            mime='text/csv',
-        )
-    
-    with col2:
-        st.download_button(
-            label="📥 Download Filtered Sales Data",
-            data=convert_df_to_csv(filtered_data),
-            file_name='filtered_sales_data.csv',
-            mime='text/csv',
-        )
-    
-    # Tampilkan insights berdasarkan analisis data
-    st.subheader("🔍 Key Insights")
-    
-    # Calculating insights
-    top_segment = filtered_rfm['segment'].value_counts().index[0] if len(filtered_rfm) > 0 else "N/A"
-    top_category = filtered_data['product_category_name'].value_counts().index[0] if 'product_category_name' in filtered_data.columns and len(filtered_data) > 0 else "N/A"
-    
-    if 'order_purchase_timestamp' in filtered_data.columns and len(filtered_data) > 0:
-        filtered_data['month'] = filtered_data['order_purchase_timestamp'].dt.month
-        filtered_data['day_of_week'] = filtered_data['order_purchase_timestamp'].dt.dayofweek
-        peak_month = filtered_data['month'].value_counts().index[0]
-        peak_month_name = calendar.month_name[peak_month]
-        peak_day = filtered_data['day_of_week'].value_counts().index[0]
-        peak_day_name = calendar.day_name[peak_day]
-    else:
-        peak_month_name = "N/A"
-        peak_day_name = "N/A"
-    
-    insights = [
-        f"Segmen pelanggan terbesar adalah '{top_segment}', yang memerlukan strategi khusus untuk mempertahankan loyalitas mereka.",
-        f"Kategori produk terlaris adalah '{top_category}', yang menunjukkan permintaan pasar yang tinggi.",
-        f"Bulan dengan penjualan tertinggi adalah {peak_month_name}, yang menunjukkan pola musiman dalam penjualan.",
-        f"Hari dengan penjualan tertinggi adalah {peak_day_name}, yang dapat dimanfaatkan untuk strategi promosi.",
-    ]
-    
-    for i, insight in enumerate(insights):
-        st.write(f"{i+1}. {insight}")
-    
-    # Rekomendasi berdasarkan segmen pelanggan
-    st.subheader("📋 Rekomendasi Strategi")
-    
-    rekomendasi = {
-        "Champions": "Tawarkan program loyalitas eksklusif dan akses ke produk terbaru.",
-        "Loyal Customers": "Berikan diskon khusus dan penawaran bundle untuk meningkatkan nilai transaksi.",
-        "Potential Loyalists": "Promosikan program membership dan manfaatnya untuk mendorong pembelian berulang.",
-        "New Customers": "Tawarkan pengalaman onboarding yang menarik dan insentif untuk pembelian kedua.",
-        "Need Attention": "Kirimkan email personalisasi dengan penawaran untuk kembali berbelanja.",
-        "At Risk": "Berikan diskon besar dan penawaran istimewa untuk mengembalikan minat mereka.",
-        "Lost": "Jalankan kampanye reaktivasi dengan penawaran yang tidak dapat ditolak."
-    }
-    
-    for segment, reco in rekomendasi.items():
-        expander = st.expander(f"Strategi untuk Segmen '{segment}'")
-        with expander:
-            st.write(reco)
-    
-    # Prediksi Sederhana
-    st.subheader("🔮 Prediksi Churn Risk")
-    
-    if len(filtered_rfm) > 0:
-        # Menghitung risiko churn sederhana berdasarkan recency
-        filtered_rfm['churn_risk'] = np.where(filtered_rfm['recency'] > 180, 'High',
-                                             np.where(filtered_rfm['recency'] > 90, 'Medium', 'Low'))
-        
-        churn_counts = filtered_rfm['churn_risk'].value_counts().reset_index()
-        churn_counts.columns = ['Risk Level', 'Count']
-        
-        fig_churn = px.pie(
-            churn_counts,
-            values='Count',
-            names='Risk Level',
-            title="Distribusi Risiko Churn Pelanggan",
-            color='Risk Level',
-            color_discrete_map={'High': 'red', 'Medium': 'orange', 'Low': 'green'}
-        )
-        
-        st.plotly_chart(fig_churn, use_container_width=True)
-        
-        # Highlight high risk customers
-        if 'High' in filtered_rfm['churn_risk'].values:
-            high_risk = filtered_rfm[filtered_rfm['churn_risk'] == 'High'].shape[0]
-            st.warning(f"⚠️ Terdapat {high_risk} pelanggan dengan risiko churn tinggi. Perlu tindakan segera untuk kampanye retensi.")
+# Bagian analisis tampil di atas footer tetapi dijalankan di akhir skrip: word
+# cloud yang masih dibuat di latar belakang ditunggu paling akhir, setelah
+# footer dan feedback sudah tampil
+analysis_area = st.container()
 
 st.markdown("---")
 st.caption("📌 Dashboard dibuat dengan Streamlit dan Plotly | Data: E-Commerce Public Dataset")
@@ -494,7 +807,20 @@ st.caption("👤 Nama: Muhammad Fery Syahputra")
 st.caption("📧 Email: ferys2343@gmail.com")
 st.caption("🆔 ID Dicoding: A009YBM322")
 
+# Siapkan penyimpanan feedback (SQLite) sekali per proses; feedback.csv lama dimigrasikan otomatis
+@st.cache_resource
+def init_feedback_store():
+    init_store()
+
+# Migrasi atau database yang gagal (CSV lama rusak, feedback.db terkunci) tidak
+# menghentikan dashboard; exception tidak di-cache sehingga dicoba lagi saat rerun
+try:
+    init_feedback_store()
+except Exception as e:
+    st.error(f"Terjadi kesalahan saat menyiapkan penyimpanan feedback: {str(e)}")
+
 # Tambahkan feedback form
+profiler.step('feedback')
 with st.expander("📝 Berikan Feedback"):
     # Use a form to collect inputs without rerunning until submission
     with st.form(key="feedback_form"):
@@ -505,31 +831,9 @@ with st.expander("📝 Berikan Feedback"):
     
     if submit_button:
         if feedback and nama:
-            # Buat dictionary untuk data feedback
-            feedback_data = {
-                "nama": nama,
-                "pesan": feedback,
-                "rating": rating,
-                "timestamp": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Path file untuk menyimpan feedback
-            feedback_file = "feedback.csv"
-            
-            # Buat DataFrame untuk data baru
-            new_feedback_df = pd.DataFrame([feedback_data])
-            
             try:
-                # Coba baca file yang sudah ada
-                if os.path.exists(feedback_file) and os.path.getsize(feedback_file) > 0:
-                    feedback_df = pd.read_csv(feedback_file)
-                    feedback_df = pd.concat([feedback_df, new_feedback_df], ignore_index=True)
-                else:
-                    # Jika file tidak ada atau kosong, gunakan data baru saja
-                    feedback_df = new_feedback_df
-                
-                # Simpan ke file CSV
-                feedback_df.to_csv(feedback_file, index=False)
+                # Simpan sebagai satu baris baru (append), tanpa menulis ulang seluruh data
+                add_feedback(nama, feedback, rating)
                 st.success("Terima kasih atas feedback Anda!")
                 
             except Exception as e:
@@ -540,129 +844,126 @@ with st.expander("📝 Berikan Feedback"):
 # Tampilkan semua feedback yang sudah masuk
 st.header("💬 Feedback Pengunjung")
 
-feedback_file = "feedback.csv"
 try:
-    if os.path.exists(feedback_file) and os.path.getsize(feedback_file) > 0:
-        feedback_df = pd.read_csv(feedback_file)
+    # Statistik ringkasan dihitung oleh SQLite, tanpa memuat seluruh feedback
+    total_feedback, avg_rating = feedback_summary()
+    
+    if total_feedback > 0:
+        # Tampilkan ringkasan dengan metrik
+        col_stats1, col_stats2 = st.columns(2)
+        with col_stats1:
+            st.metric(label="Total Feedback", value=total_feedback)
+        with col_stats2:
+            st.metric(label="Rating Rata-rata", value=f"{avg_rating:.1f} ⭐")
         
-        if not feedback_df.empty:
-            # Tambahkan statistik ringkasan di bagian atas
-            total_feedback = len(feedback_df)
-            avg_rating = feedback_df['rating'].mean()
-            
-            # Tampilkan ringkasan dengan metrik
-            col_stats1, col_stats2 = st.columns(2)
-            with col_stats1:
-                st.metric(label="Total Feedback", value=total_feedback)
-            with col_stats2:
-                st.metric(label="Rating Rata-rata", value=f"{avg_rating:.1f} ⭐")
-            
-            # Tambahkan filter dan sorting
-            col_filter, col_sort = st.columns(2)
-            with col_filter:
-                min_rating = st.slider("Filter berdasarkan rating minimum:", 1, 5, 1)
-                filtered_df = feedback_df[feedback_df['rating'] >= min_rating]
-            with col_sort:
-                sort_option = st.selectbox("Urutkan berdasarkan:", 
-                                          ["Terbaru", "Terlama", "Rating Tertinggi", "Rating Terendah"])
-            
-            # Terapkan pengurutan yang dipilih
-            if sort_option == "Terbaru":
-                filtered_df = filtered_df.sort_values(by="timestamp", ascending=False)
-            elif sort_option == "Terlama":
-                filtered_df = filtered_df.sort_values(by="timestamp", ascending=True)
-            elif sort_option == "Rating Tertinggi":
-                filtered_df = filtered_df.sort_values(by="rating", ascending=False)
-            else:  # Rating Terendah
-                filtered_df = filtered_df.sort_values(by="rating", ascending=True)
-            
-            # Tambahkan baris pencarian sederhana
-            search_query = st.text_input("Cari berdasarkan nama atau kata kunci:")
-            if search_query:
-                filtered_df = filtered_df[
-                    filtered_df['nama'].str.contains(search_query, case=False) | 
-                    filtered_df['pesan'].str.contains(search_query, case=False)
-                ]
-            
-            st.markdown("---")
+        # Tambahkan filter dan sorting
+        col_filter, col_sort = st.columns(2)
+        with col_filter:
+            min_rating = st.slider("Filter berdasarkan rating minimum:", 1, 5, 1)
+        with col_sort:
+            sort_option = st.selectbox("Urutkan berdasarkan:", 
+                                      ["Terbaru", "Terlama", "Rating Tertinggi", "Rating Terendah"])
+        
+        # Tambahkan baris pencarian (index full-text di SQLite)
+        search_query = st.text_input("Cari berdasarkan nama atau kata kunci:")
+        
+        st.markdown("---")
+        
+        # Filter rating, pencarian, dan urutan dijalankan oleh query index;
+        # hanya halaman yang sedang dilihat yang diambil dan dirender
+        page_size = 10
+        total_matching = count_feedback(search_query, min_rating)
+        n_pages = max(1, -(-total_matching // page_size))
+        page = st.number_input("Halaman", min_value=1, max_value=n_pages, value=1, step=1) if n_pages > 1 else 1
+        filtered_df = search_feedback(search_query, min_rating, sort_option, page, page_size)
+        
+        # Tampilkan jumlah feedback yang ditampilkan setelah filter
+        st.write(f"Menampilkan {total_matching} dari {total_feedback} feedback (halaman {page} dari {n_pages})")
+        
+        # Gunakan layout dengan card untuk menampilkan feedback
+        if not filtered_df.empty:
+            # Konversi timestamp ke format yang lebih mudah dibaca (sekali untuk satu halaman)
+            parsed_dates = pd.to_datetime(filtered_df['timestamp'], errors='coerce')
+            formatted_dates = parsed_dates.dt.strftime("%d %b %Y, %H:%M").fillna(filtered_df['timestamp'])
             
-            # Tampilkan jumlah feedback yang ditampilkan setelah filter
-            st.write(f"Menampilkan {len(filtered_df)} dari {total_feedback} feedback")
+            # Tentukan jumlah kolom untuk grid card
+            cols_per_row = 2
             
-            # Gunakan layout dengan card untuk menampilkan feedback
-            if not filtered_df.empty:
-                # Tentukan jumlah kolom untuk grid card
-                cols_per_row = 2
+            # Buat baris untuk setiap n card
+            for i in range(0, len(filtered_df), cols_per_row):
+                cols = st.columns(cols_per_row)
                 
-                # Buat baris untuk setiap n card
-                for i in range(0, len(filtered_df), cols_per_row):
-                    cols = st.columns(cols_per_row)
-                    
-                    # Isi setiap kolom dengan card
-                    for j in range(cols_per_row):
-                        if i + j < len(filtered_df):
-                            row = filtered_df.iloc[i + j]
-                            
-                            # Konversi timestamp ke format yang lebih mudah dibaca
-                            try:
-                                timestamp = pd.to_datetime(row['timestamp'])
-                                formatted_date = timestamp.strftime("%d %b %Y, %H:%M")
-                            except:
-                                formatted_date = row['timestamp']
-                            
-                            # Tentukan warna berdasarkan rating
-                            if row['rating'] >= 4:
-                                card_color = "#4CAF50"  # Hijau
-                                bg_color = "#e8f5e9"
-                                text_bg = "#c8e6c9"  # Latar belakang pesan yang lebih gelap
-                            elif row['rating'] >= 3:
-                                card_color = "#FF9800"  # Oranye
-                                bg_color = "#fff3e0"
-                                text_bg = "#ffe0b2"  # Latar belakang pesan yang lebih gelap
-                            else:
-                                card_color = "#F44336"  # Merah
-                                bg_color = "#ffebee"
-                                text_bg = "#ffcdd2"  # Latar belakang pesan yang lebih gelap
-                            
-                            # Buat card dengan HTML dan CSS
-                            with cols[j]:
-                                st.markdown(f"""
+                # Isi setiap kolom dengan card
+                for j in range(cols_per_row):
+                    if i + j < len(filtered_df):
+                        row = filtered_df.iloc[i + j]
+                        formatted_date = formatted_dates.iloc[i + j]
+                        
+                        # Tentukan warna berdasarkan rating
+                        if row['rating'] >= 4:
+                            card_color = "#4CAF50"  # Hijau
+                            bg_color = "#e8f5e9"
+                            text_bg = "#c8e6c9"  # Latar belakang pesan yang lebih gelap
+                        elif row['rating'] >= 3:
+                            card_color = "#FF9800"  # Oranye
+                            bg_color = "#fff3e0"
+                            text_bg = "#ffe0b2"  # Latar belakang pesan yang lebih gelap
+                        else:
+                            card_color = "#F44336"  # Merah
+                            bg_color = "#ffebee"
+                            text_bg = "#ffcdd2"  # Latar belakang pesan yang lebih gelap
+                        
+                        # Buat card dengan HTML dan CSS
+                        with cols[j]:
+                            st.markdown(f"""
+                            <div style="
+                                border-radius: 10px;
+                                border-left: 5px solid {card_color};
+                                background-color: {bg_color};
+                                padding: 15px;
+                                margin-bottom: 15px;
+                                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+                            ">
+                                <h3 style="margin-top: 0; color: #333;">{row['nama']}</h3>
+                                <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
+                                    <span style="color: #666; font-size: 0.8em;">📅 {formatted_date}</span>
+                                    <span style="font-size: 1.2em;">{"⭐" * int(row['rating'])}</span>
+                                </div>
                                 <div style="
-                                    border-radius: 10px;
-                                    border-left: 5px solid {card_color};
-                                    background-color: {bg_color};
-                                    padding: 15px;
-                                    margin-bottom: 15px;
-                                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+                                    background-color: {text_bg};
+                                    padding: 12px;
+                                    border-radius: 5px;
+                                    margin-bottom: 0;
+                                    color: #333;
+                                    font-weight: 400;
+                                    border: 1px solid rgba(0,0,0,0.1);
                                 ">
-                                    <h3 style="margin-top: 0; color: #333;">{row['nama']}</h3>
-                                    <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
-                                        <span style="color: #666; font-size: 0.8em;">📅 {formatted_date}</span>
-                                        <span style="font-size: 1.2em;">{"⭐" * int(row['rating'])}</span>
-                                    </div>
-                                    <div style="
-                                        background-color: {text_bg};
-                                        padding: 12px;
-                                        border-radius: 5px;
-                                        margin-bottom: 0;
-                                        color: #333;
-                                        font-weight: 400;
-                                        border: 1px solid rgba(0,0,0,0.1);
-                                    ">
-                                        {row['pesan']}
-                                    </div>
+                                    {row['pesan']}
                                 </div>
-                                """, unsafe_allow_html=True)
-            else:
-                st.info("Tidak ada feedback yang sesuai dengan filter atau pencarian Anda.")
+                            </div>
+                            """, unsafe_allow_html=True)
         else:
-            st.info("Belum ada feedback yang diberikan.")
+            st.info("Tidak ada feedback yang sesuai dengan filter atau pencarian Anda.")
     else:
         st.info("Belum ada feedback yang diberikan.")
 
 except Exception as e:
     st.error(f"Terjadi kesalahan saat membaca feedback: {str(e)}")
-    # Jika terjadi error, hapus file yang mungkin rusak
-    if os.path.exists(feedback_file) and os.path.getsize(feedback_file) == 0:
-        os.remove(feedback_file)
-        st.info("File feedback telah direset. Silakan coba lagi.")
\ No newline at end of file
+
+rfm_key = (current_version, rules_version, start_date, end_date)
+if has_orders:
+    with analysis_area:
+        analysis_sections(filter_key, rfm_key, rfm, filtered_rfm, filtered_summary, filtered_rows, engine_filters,
+                          sales_source, product_source)
+
+# Rincian waktu rerun ini: selalu dicatat ke log JSONL, panel sidebar opsional
+profiler.finish()
+append_log(profiler)
+if st.sidebar.checkbox("⏱ Tampilkan profil performa"):
+    st.sidebar.caption(f"Rerun: {profiler.total_ms:.0f} ms • RSS {profiler.record()['rss_mb']:.0f} MB")
+    startup = process_startup()
+    if startup is not None:
+        st.sidebar.caption(f"Startup proses: impor {startup['import_ms']:.0f} ms • "
+                           f"render pertama {startup['first_render_ms']:.0f} ms")
+    st.sidebar.dataframe(profiler.summary(), hide_index=True, use_container_width=True)
+    st.sidebar.dataframe(profiler.cache_summary(), hide_index=True, use_container_width=True)
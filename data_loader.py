@@ -0,0 +1,170 @@
+import os
+import time
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Lokasi dataset mentah (CSV) dan versi kolumnar hasil konversi (Parquet)
+DATA_CSV = "all_data.csv"
+DATA_PARQUET = "all_data.parquet"
+
+# Kolom yang benar-benar dipakai oleh dashboard (column projection)
+DASHBOARD_COLUMNS = [
+    'customer_id', 'order_id', 'order_purchase_timestamp', 'payment_value',
+    'payment_type', 'product_category_name', 'product_id', 'review_score',
+    'customer_lat', 'customer_lng',
+]
+
+# Kolom dengan kardinalitas rendah disimpan sebagai categorical
+CATEGORY_COLUMNS = ['product_category_name', 'payment_type']
+
+# Kolom ID (string hash 32 karakter) di-dictionary-encode: setiap baris hanya
+# menyimpan kode integer, string uniknya disimpan sekali
+ID_COLUMNS = ['customer_id', 'order_id', 'product_id']
+
+# Kolom ID yang hampir unik per baris justru lebih besar sebagai categorical
+# (kamus + hash table pandas di atasnya); seperti dictionary encoding Parquet,
+# kolom itu tetap string bila jumlah nilai unik melebihi rasio ini
+DICTIONARY_MAX_RATIO = 0.5
+
+# Kolom numerik yang aman dipersempit ke float32 (rating 1-5 dan koordinat)
+FLOAT32_COLUMNS = ['review_score', 'customer_lat', 'customer_lng']
+
+# Kunci metadata Parquet untuk menyimpan sidik jari CSV sumber
+SOURCE_KEY = b'source_fingerprint'
+
+
+def file_fingerprint(path):
+    # Ukuran + waktu modifikasi cukup untuk mendeteksi file yang berubah
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def data_version(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Sidik jari data sumber, dipakai sebagai kunci cache hasil komputasi."""
+    if os.path.exists(csv_path):
+        return file_fingerprint(csv_path)
+    return file_fingerprint(parquet_path)
+
+
+def encode_categories(df):
+    """Kolom kategori dan ID (bila kamusnya cukup kecil) sebagai categorical dengan kategori terurut.
+
+    Kategori terurut membuat groupby/unique atas kode menghasilkan urutan yang
+    sama dengan kolom string aslinya.
+    """
+    for col in ID_COLUMNS + CATEGORY_COLUMNS:
+        if col not in df.columns:
+            continue
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+        elif not df[col].cat.categories.is_monotonic_increasing:
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+        if col in ID_COLUMNS and len(df[col].cat.categories) > DICTIONARY_MAX_RATIO * len(df):
+            # String unik dipakai bersama oleh baris dengan ID yang sama
+            df[col] = df[col].astype(object)
+    return df
+
+
+def decode_index(index):
+    """Index hasil groupby kolom categorical sebagai Index nilai aslinya (mis. string customer_id)."""
+    if isinstance(index, pd.CategoricalIndex):
+        return index.astype(index.categories.dtype)
+    return index
+
+
+def apply_schema(df):
+    """Terapkan skema tetap: timestamp asli, categorical, dan tipe numerik tersempit."""
+    df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'], errors='coerce')
+    encode_categories(df)
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    # payment_value tetap float64 karena dijumlahkan menjadi nilai monetary
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def convert_to_parquet(csv_path=DATA_CSV, parquet_path=DATA_PARQUET, compression='zstd'):
+    """Konversi satu kali CSV ke Parquet bertipe dan terkompresi."""
+    df = apply_schema(pd.read_csv(csv_path))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_KEY] = file_fingerprint(csv_path).encode()
+    table = table.replace_schema_metadata(metadata)
+    # Tulis ke file sementara lalu rename agar pembaca tidak melihat file setengah jadi
+    tmp_path = parquet_path + ".tmp"
+    pq.write_table(table, tmp_path, compression=compression)
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def parquet_is_fresh(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    if not os.path.exists(parquet_path):
+        return False
+    # Tanpa CSV sumber, file Parquet adalah satu-satunya sumber data
+    if not os.path.exists(csv_path):
+        return True
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    return metadata.get(SOURCE_KEY, b'').decode() == file_fingerprint(csv_path)
+
+
+def read_parquet(columns=None, parquet_path=DATA_PARQUET):
+    available = pq.read_schema(parquet_path).names
+    if columns is not None:
+        columns = [col for col in columns if col in available]
+    # memory_map=True: halaman file dibaca langsung dari page cache OS.
+    # Kolom ID dibaca langsung sebagai dictionary (categorical) tanpa string per baris
+    dictionary_columns = [col for col in ID_COLUMNS + CATEGORY_COLUMNS
+                          if col in (available if columns is None else columns)]
+    table = pq.read_table(parquet_path, columns=columns, memory_map=True, read_dictionary=dictionary_columns)
+    return encode_categories(table.to_pandas())
+
+
+def read_csv(columns=None, csv_path=DATA_CSV):
+    if columns is not None:
+        wanted = set(columns)
+        df = pd.read_csv(csv_path, usecols=lambda col: col in wanted)
+    else:
+        df = pd.read_csv(csv_path)
+    return apply_schema(df)
+
+
+def load_dataset(columns=None, csv_path=DATA_CSV, parquet_path=DATA_PARQUET, source=None):
+    """Baca dataset dari Parquet (memory-mapped) atau CSV sebagai fallback.
+
+    Mengembalikan tuple (DataFrame, report) dengan report berisi sumber data,
+    waktu load (detik), memori DataFrame (MB), dan jumlah baris.
+    """
+    if source is None:
+        source = 'parquet' if parquet_is_fresh(csv_path, parquet_path) else 'csv'
+    start = time.perf_counter()
+    if source == 'parquet':
+        df = read_parquet(columns, parquet_path)
+    else:
+        df = read_csv(columns, csv_path)
+    report = {
+        'source': source,
+        'seconds': time.perf_counter() - start,
+        'memory_mb': df.memory_usage(deep=True).sum() / 1024 ** 2,
+        'rows': len(df),
+    }
+    return df, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konversi all_data.csv ke Parquet kolumnar.")
+    parser.add_argument("--csv", default=DATA_CSV)
+    parser.add_argument("--out", default=DATA_PARQUET)
+    parser.add_argument("--compression", default="zstd")
+    args = parser.parse_args()
+
+    convert_to_parquet(args.csv, args.out, args.compression)
+    print(f"Parquet ditulis ke {args.out}")
+
+    # Bandingkan waktu dan memori kedua jalur load
+    for source in ('csv', 'parquet'):
+        _, report = load_dataset(DASHBOARD_COLUMNS, args.csv, args.out, source=source)
+        print(f"{report['source']:>8}: {report['rows']} baris, {report['seconds']:.3f} s, {report['memory_mb']:.1f} MB")
@@ -0,0 +1,272 @@
+import os
+import calendar
+import numpy as np
+import pandas as pd
+from data_loader import DATA_CSV, DATA_PARQUET, parquet_is_fresh
+from rfm import RFMStore
+from spatial import ZOOM_RESOLUTIONS
+
+# Mode engine dashboard: 'pandas' (seluruh data di memori) atau 'duckdb'
+# (query out-of-core atas Parquet; hanya hasil kecil yang masuk ke pandas)
+ENGINE = os.environ.get("DASHBOARD_ENGINE", "pandas").strip().lower()
+ENGINES = ('pandas', 'duckdb')
+if ENGINE not in ENGINES:
+    # Salah ketik (misalnya 'duckbd') tidak boleh diam-diam menjalankan engine pandas
+    raise ValueError(f"DASHBOARD_ENGINE tidak dikenal: {ENGINE!r}; pilih salah satu dari {', '.join(ENGINES)}")
+
+# Skema CSV untuk engine bila Parquet belum tersedia, setara apply_schema()
+_CSV_TYPES = """
+    customer_id, order_id,
+    TRY_CAST(order_purchase_timestamp AS TIMESTAMP) AS order_purchase_timestamp,
+    CAST(payment_value AS DOUBLE) AS payment_value,
+    payment_type, product_category_name, product_id,
+    CAST(review_score AS FLOAT) AS review_score,
+    CAST(customer_lat AS FLOAT) AS customer_lat,
+    CAST(customer_lng AS FLOAT) AS customer_lng
+"""
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise ImportError("Mode engine 'duckdb' membutuhkan paket duckdb: pip install duckdb") from exc
+    return duckdb
+
+
+class DuckDBEngine:
+    """Query out-of-core atas all_data.parquet dengan DuckDB.
+
+    Filter sidebar, agregasi RFM, dan agregat tab dijalankan sebagai query
+    yang di-push ke file Parquet; hanya tabel hasil yang kecil (per pelanggan,
+    per sel cube, per sel peta) yang dikembalikan sebagai DataFrame. Semantik
+    filter sama dengan jalur pandas (OrderStore + FilterIndex):
+
+    - start_date/end_date: tanggal inklusif; tanpa keduanya, baris dengan
+      timestamp kosong ikut dihitung.
+    - category: satu nilai product_category_name atau None.
+    - customers: kumpulan customer_id (misalnya index filtered_rfm) atau None.
+    """
+
+    def __init__(self, csv_path=DATA_CSV, parquet_path=DATA_PARQUET, threads=None):
+        duckdb = _import_duckdb()
+        self.con = duckdb.connect()
+        if threads is not None:
+            self.con.execute(f"SET threads = {int(threads)}")
+        # file_row_number = urutan baris asli, pemecah seri saat mengurutkan waktu
+        if parquet_is_fresh(csv_path, parquet_path):
+            self.source = 'parquet'
+            relation = f"SELECT * FROM read_parquet('{_quote(parquet_path)}', file_row_number = true)"
+        else:
+            self.source = 'csv'
+            relation = (f"SELECT {_CSV_TYPES}, row_number() OVER () - 1 AS file_row_number "
+                        f"FROM read_csv('{_quote(csv_path)}', header = true, all_varchar = true)")
+        self.con.execute(f"CREATE VIEW orders AS {relation}")
+        self.columns = [row[0] for row in self.con.execute("DESCRIBE orders").fetchall()
+                        if row[0] != 'file_row_number']
+
+    def _execute(self, sql, params=None, customers=None, tables=None):
+        # Cursor per query: koneksi DuckDB tidak dibagi antar thread sesi Streamlit;
+        # DataFrame kecil (pelanggan terpilih, segmen) didaftarkan sebagai tabel
+        cursor = self.con.cursor()
+        tables = dict(tables or {})
+        if customers is not None:
+            tables['selected_customers'] = pd.DataFrame({'customer_id': pd.Index(customers).astype(object)})
+        for name, frame in tables.items():
+            cursor.register(name, frame)
+        cursor.execute(sql, params or [])
+        return cursor
+
+    def _query(self, sql, params=None, customers=None, tables=None):
+        cursor = self._execute(sql, params, customers, tables)
+        try:
+            return cursor.df()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _where(start_date=None, end_date=None, category=None, customers=None):
+        clauses, params = ["TRUE"], []
+        if start_date is not None:
+            clauses.append("order_purchase_timestamp >= ?")
+            params.append(pd.Timestamp(start_date).to_pydatetime())
+        if end_date is not None:
+            clauses.append("order_purchase_timestamp < ?")
+            params.append((pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_pydatetime())
+        if category is not None:
+            clauses.append("product_category_name = ?")
+            params.append(category)
+        if customers is not None:
+            clauses.append("customer_id IN (SELECT customer_id FROM selected_customers)")
+        return " AND ".join(clauses), params
+
+    def time_range(self):
+        """(timestamp pertama, timestamp terakhir) seluruh data."""
+        result = self._query("SELECT min(order_purchase_timestamp) AS lo, max(order_purchase_timestamp) AS hi FROM orders")
+        return pd.Timestamp(result['lo'].iloc[0]), pd.Timestamp(result['hi'].iloc[0])
+
+    def rfm(self, start_date=None, end_date=None):
+        """Tabel RFM dalam rentang waktu, sama dengan compute_rfm(store.window(...))."""
+        where, params = self._where(start_date, end_date)
+        aggregates = self._query(f"""
+            SELECT customer_id,
+                   max(order_purchase_timestamp) AS last_purchase,
+                   count(order_id) AS frequency,
+                   sum(payment_value) AS monetary
+            FROM orders WHERE {where} AND customer_id IS NOT NULL
+            GROUP BY customer_id ORDER BY customer_id
+        """, params)
+        aggregates['last_purchase'] = aggregates['last_purchase'].astype('datetime64[ns]')
+        return RFMStore(aggregates.set_index('customer_id')).to_rfm()
+
+    def customer_aggregates(self):
+        """Agregat per pelanggan untuk fitur churn, sama dengan churn.customer_aggregates()."""
+        aggregates = self._query("""
+            SELECT customer_id,
+                   max(order_purchase_timestamp) AS last_purchase,
+                   min(order_purchase_timestamp) AS first_purchase,
+                   count(order_id) AS frequency,
+                   sum(payment_value) AS monetary,
+                   count(DISTINCT order_id) AS n_orders,
+                   avg(review_score) AS avg_review,
+                   count(DISTINCT product_category_name) AS n_categories
+            FROM orders WHERE customer_id IS NOT NULL
+            GROUP BY customer_id ORDER BY customer_id
+        """)
+        for col in ['last_purchase', 'first_purchase']:
+            aggregates[col] = aggregates[col].astype('datetime64[ns]')
+        return aggregates.set_index('customer_id')
+
+    def categories(self, start_date=None, end_date=None):
+        """Kategori dalam rentang waktu, urut sesuai kemunculan pertama."""
+        where, params = self._where(start_date, end_date)
+        result = self._query(f"""
+            SELECT product_category_name
+            FROM orders WHERE {where} AND product_category_name IS NOT NULL
+            QUALIFY row_number() OVER (PARTITION BY product_category_name
+                                       ORDER BY order_purchase_timestamp NULLS LAST, file_row_number) = 1
+            ORDER BY order_purchase_timestamp NULLS LAST, file_row_number
+        """, params)
+        return result['product_category_name'].tolist()
+
+    def order_metrics(self, **filters):
+        """Jumlah baris, order unik, pendapatan, dan produk unik untuk filter aktif."""
+        where, params = self._where(**filters)
+        result = self._query(f"""
+            SELECT count(*) AS rows, count(DISTINCT order_id) AS total_orders,
+                   coalesce(sum(payment_value), 0) AS total_revenue,
+                   count(DISTINCT product_id) AS total_products
+            FROM orders WHERE {where}
+        """, params, filters.get('customers'))
+        row = result.iloc[0]
+        return {
+            'rows': int(row['rows']),
+            'total_orders': int(row['total_orders']),
+            'total_revenue': float(row['total_revenue']),
+            'total_products': int(row['total_products']),
+        }
+
+    def value_counts(self, column, **filters):
+        """Jumlah baris per nilai kolom (tanpa nilai kosong), terbanyak lebih dulu."""
+        where, params = self._where(**filters)
+        result = self._query(f"""
+            SELECT "{column}" AS value, count(*) AS count
+            FROM orders WHERE {where} AND "{column}" IS NOT NULL
+            GROUP BY 1 ORDER BY count DESC, value
+        """, params, filters.get('customers'))
+        return pd.Series(result['count'].to_numpy(), index=pd.Index(result['value'], name=column), name='count')
+
+    def order_summary(self, **filters):
+        """Ringkasan order terfilter dengan bentuk yang sama seperti analytics.order_summary()."""
+        summary = self.order_metrics(**filters)
+        categories = self.value_counts('product_category_name', **filters)
+        summary['top_category'] = categories.index[0] if len(categories) else "N/A"
+        summary['peak_month'], summary['peak_day'] = self.peak_periods(**filters)
+        summary['review_counts'] = self.value_counts('review_score', **filters).sort_index()
+        return summary
+
+    def cube(self, segments, **filters):
+        """Cube OLAP seperti build_cube(); segments adalah Series customer_id -> segmen."""
+        where, params = self._where(**filters)
+        customer_segments = pd.DataFrame({'customer_id': segments.index.astype(object),
+                                          'segment': segments.astype(object).to_numpy()})
+        cube = self._query(f"""
+            SELECT strftime(o.order_purchase_timestamp, '%Y-%m') AS month,
+                   isodow(o.order_purchase_timestamp) - 1 AS day_of_week,
+                   hour(o.order_purchase_timestamp) AS hour_of_day,
+                   o.product_category_name, o.payment_type, s.segment,
+                   count(*) AS count,
+                   sum(o.payment_value) AS revenue,
+                   coalesce(sum(CAST(o.review_score AS DOUBLE)), 0) AS review_sum,
+                   count(o.review_score) AS review_count
+            FROM orders o LEFT JOIN customer_segments s USING (customer_id)
+            WHERE {where}
+            GROUP BY ALL
+        """, params, filters.get('customers'), {'customer_segments': customer_segments})
+        for col in ['product_category_name', 'payment_type']:
+            cube[col] = cube[col].astype('category')
+        # Pertahankan urutan kategori segmen (urutan aturan) seperti build_cube()
+        segment_dtype = segments.dtype if isinstance(segments.dtype, pd.CategoricalDtype) else 'category'
+        cube['segment'] = cube['segment'].astype(segment_dtype)
+        return cube
+
+    def peak_periods(self, **filters):
+        """Nama bulan dan hari dengan baris order terbanyak, seperti analytics.peak_periods()."""
+        where, params = self._where(**filters)
+        result = self._query(f"""
+            SELECT (SELECT month(order_purchase_timestamp) FROM orders
+                    WHERE {where} AND order_purchase_timestamp IS NOT NULL
+                    GROUP BY 1 ORDER BY count(*) DESC, 1 LIMIT 1) AS peak_month,
+                   (SELECT isodow(order_purchase_timestamp) - 1 FROM orders
+                    WHERE {where} AND order_purchase_timestamp IS NOT NULL
+                    GROUP BY 1 ORDER BY count(*) DESC, 1 LIMIT 1) AS peak_day
+        """, params + params, filters.get('customers'))
+        peak_month, peak_day = result['peak_month'].iloc[0], result['peak_day'].iloc[0]
+        if pd.isna(peak_month):
+            return "N/A", "N/A"
+        return calendar.month_name[int(peak_month)], calendar.day_name[int(peak_day)]
+
+    def map_cells(self, zoom, **filters):
+        """Sel grid peta seperti SpatialGrid.aggregate() untuk filter aktif."""
+        size = ZOOM_RESOLUTIONS[zoom]
+        where, params = self._where(**filters)
+        cells = self._query(f"""
+            WITH located AS (
+                SELECT CAST(floor(CAST(customer_lat AS DOUBLE) / {size}) AS BIGINT) AS cell_row,
+                       CAST(floor(CAST(customer_lng AS DOUBLE) / {size}) AS BIGINT) AS cell_col,
+                       order_id, payment_value
+                FROM orders
+                WHERE {where} AND isfinite(customer_lat) AND isfinite(customer_lng)
+            )
+            SELECT cell_row, cell_col, count(DISTINCT order_id) AS orders, sum(payment_value) AS revenue
+            FROM located GROUP BY cell_row, cell_col ORDER BY cell_row * 1000003 + cell_col
+        """, params, filters.get('customers'))
+        return pd.DataFrame({
+            'lat': (cells['cell_row'].to_numpy() + 0.5) * size,
+            'lng': (cells['cell_col'].to_numpy() + 0.5) * size,
+            'orders': cells['orders'].to_numpy(),
+            'revenue': np.round(cells['revenue'].to_numpy(), 2),
+        })
+
+    def export(self, path, fmt, **filters):
+        """Tulis baris order terfilter ke path (format export.EXPORT_FORMATS).
+
+        DuckDB menulis hasil query langsung ke file secara streaming, tanpa
+        memuat seluruh baris ke memori.
+        """
+        options = {'csv': "FORMAT csv, HEADER", 'csv.gz': "FORMAT csv, HEADER, COMPRESSION gzip",
+                   'parquet': "FORMAT parquet"}
+        if fmt not in options:
+            raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+        where, params = self._where(**filters)
+        columns = ", ".join(f'"{col}"' for col in self.columns)
+        self._execute(f"""
+            COPY (SELECT {columns} FROM orders WHERE {where}
+                  ORDER BY order_purchase_timestamp NULLS LAST, file_row_number)
+            TO '{_quote(path)}' ({options[fmt]})
+        """, params, filters.get('customers')).close()
+        return path
+
+
+def _quote(path):
+    return str(path).replace("'", "''")
@@ -0,0 +1,128 @@
+import os
+import gzip
+import atexit
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Ekspor data on-demand: file hanya dibuat saat pengguna memintanya, ditulis
+# per potongan baris ke file sementara (bukan bytes utuh di memori), lalu
+# disimpan di cache LRU yang dibatasi total ukuran file di disk.
+
+# format -> (label, ekstensi file, MIME)
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', '.csv.gz', 'application/gzip'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+}
+
+# Baris per potongan saat menulis; memori tambahan sebatas satu potongan
+EXPORT_CHUNK_ROWS = 100_000
+
+# Batas total ukuran file ekspor yang disimpan (DASHBOARD_EXPORT_CACHE_MB)
+EXPORT_CACHE_MB = int(os.environ.get("DASHBOARD_EXPORT_CACHE_MB", "256"))
+
+
+def _chunks(df, chunk_rows, columns=None):
+    # Minimal satu potongan agar DataFrame kosong tetap menghasilkan header/skema
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk if columns is None else chunk[columns]
+
+
+def write_export(df, path, fmt, chunk_rows=EXPORT_CHUNK_ROWS, columns=None):
+    """Tulis df (tanpa index) ke path dalam format fmt, per chunk_rows baris.
+
+    columns membatasi kolom yang ditulis (None = semua); kolom dipilih per
+    potongan sehingga df tidak pernah disalin utuh.
+    """
+    if fmt == 'parquet':
+        writer = None
+        try:
+            for chunk in _chunks(df, chunk_rows, columns):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif fmt in ('csv', 'csv.gz'):
+        opener = gzip.open if fmt == 'csv.gz' else open
+        with opener(path, 'wt', encoding='utf-8', newline='') as f:
+            for i, chunk in enumerate(_chunks(df, chunk_rows, columns)):
+                chunk.to_csv(f, index=False, header=i == 0)
+    else:
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+    return path
+
+
+class ExportCache:
+    """File ekspor yang sudah dibuat, dibatasi total ukurannya (LRU).
+
+    Saat total ukuran melebihi max_bytes, file yang paling lama tidak
+    dipakai dihapus dari disk; file yang baru dibuat selalu dipertahankan.
+    Aman dipakai bersama oleh banyak sesi.
+    """
+
+    def __init__(self, max_bytes=EXPORT_CACHE_MB * 1024 ** 2, directory=None):
+        self.max_bytes = max_bytes
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="dashboard_export_")
+            atexit.register(shutil.rmtree, directory, True)
+        self.directory = directory
+        self.total_bytes = 0
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._files)
+
+    def open(self, key):
+        """File biner untuk key yang sudah dibuat, atau None.
+
+        Dibuka di dalam lock: file yang kemudian dihapus oleh eviction tetap
+        bisa dibaca lewat handle ini.
+        """
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is None:
+                return None
+            self._files.move_to_end(key)
+            return open(entry[0], "rb")
+
+    def create(self, key, suffix, write):
+        """Buat file untuk key dengan write(path) bila belum ada di cache."""
+        with self._lock:
+            if key in self._files:
+                self._files.move_to_end(key)
+                return
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.directory)
+        os.close(fd)
+        try:
+            write(path)
+        except BaseException:
+            os.remove(path)
+            raise
+        size = os.path.getsize(path)
+        with self._lock:
+            # Sesi lain bisa membuat file yang sama bersamaan; yang terakhir dipakai
+            previous = self._files.pop(key, None)
+            if previous is not None:
+                self._remove(previous)
+            self._files[key] = (path, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self._files) > 1:
+                _, oldest = self._files.popitem(last=False)
+                self._remove(oldest)
+
+    def _remove(self, entry):
+        path, size = entry
+        self.total_bytes -= size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,146 @@
+import os
+import sqlite3
+from contextlib import closing
+import pandas as pd
+
+# Penyimpanan feedback: SQLite mode WAL (append O(1), aman untuk banyak penulis)
+FEEDBACK_DB = "feedback.db"
+# File CSV lama yang dimigrasikan otomatis satu kali
+LEGACY_CSV = "feedback.csv"
+FEEDBACK_COLUMNS = ['nama', 'pesan', 'rating', 'timestamp']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama TEXT NOT NULL,
+    pesan TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_rating ON feedback (rating);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp);
+"""
+
+# Index full-text (FTS5, tokenizer trigram) atas nama dan pesan; trigram
+# membuat pencarian tetap berupa substring tanpa membedakan huruf besar/kecil
+_FTS_STATEMENTS = [
+    """CREATE VIRTUAL TABLE feedback_fts USING fts5(
+        nama, pesan, content='feedback', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER feedback_fts_insert AFTER INSERT ON feedback BEGIN
+        INSERT INTO feedback_fts (rowid, nama, pesan) VALUES (new.id, new.nama, new.pesan);
+    END""",
+    """CREATE TRIGGER feedback_fts_delete AFTER DELETE ON feedback BEGIN
+        INSERT INTO feedback_fts (feedback_fts, rowid, nama, pesan) VALUES ('delete', old.id, old.nama, old.pesan);
+    END""",
+]
+
+# Pilihan urutan di dashboard -> klausa ORDER BY (id sebagai pemecah seri)
+SORT_ORDERS = {
+    "Terbaru": "f.timestamp DESC, f.id DESC",
+    "Terlama": "f.timestamp ASC, f.id ASC",
+    "Rating Tertinggi": "f.rating DESC, f.id DESC",
+    "Rating Terendah": "f.rating ASC, f.id ASC",
+}
+# Trigram hanya bisa mencocokkan kueri minimal 3 karakter
+MIN_FTS_QUERY = 3
+
+
+def connect(db_path=FEEDBACK_DB):
+    # timeout: penulis lain yang sedang memegang lock ditunggu, bukan gagal
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def init_store(db_path=FEEDBACK_DB, legacy_csv=LEGACY_CSV):
+    """Buat skema bila belum ada dan migrasikan feedback.csv lama (sekali saja)."""
+    with closing(connect(db_path)) as conn:
+        conn.executescript(_SCHEMA)
+        # BEGIN IMMEDIATE: hanya satu proses yang menjalankan migrasi
+        conn.execute("BEGIN IMMEDIATE")
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'feedback_fts'").fetchone()
+        if has_fts is None:
+            # Buat index full-text dan isi dengan feedback yang sudah ada
+            for statement in _FTS_STATEMENTS:
+                conn.execute(statement)
+            conn.execute("INSERT INTO feedback_fts (feedback_fts) VALUES ('rebuild')")
+        migrated = conn.execute("SELECT value FROM meta WHERE key = 'csv_migrated'").fetchone()
+        if migrated is None and os.path.exists(legacy_csv) and os.path.getsize(legacy_csv) > 0:
+            legacy = pd.read_csv(legacy_csv, dtype={'nama': str, 'pesan': str, 'timestamp': str})
+            legacy = legacy.dropna(subset=FEEDBACK_COLUMNS)
+            conn.executemany(
+                "INSERT INTO feedback (nama, pesan, rating, timestamp) VALUES (?, ?, ?, ?)",
+                [(row.nama, row.pesan, int(row.rating), row.timestamp) for row in legacy.itertuples(index=False)],
+            )
+        if migrated is None:
+            conn.execute("INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)",
+                         (pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        conn.commit()
+
+
+def add_feedback(nama, pesan, rating, timestamp=None, db_path=FEEDBACK_DB):
+    """Tambahkan satu feedback (satu INSERT, tanpa membaca ulang seluruh data)."""
+    if timestamp is None:
+        timestamp = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+    with closing(connect(db_path)) as conn:
+        with conn:
+            conn.execute(
+                "INSERT INTO feedback (nama, pesan, rating, timestamp) VALUES (?, ?, ?, ?)",
+                (nama, pesan, int(rating), timestamp),
+            )
+
+
+def load_feedback(db_path=FEEDBACK_DB):
+    """Seluruh feedback dengan skema lama: nama, pesan, rating, timestamp."""
+    with closing(connect(db_path)) as conn:
+        return pd.read_sql_query("SELECT nama, pesan, rating, timestamp FROM feedback ORDER BY id", conn)
+
+
+def feedback_summary(db_path=FEEDBACK_DB):
+    """Jumlah feedback dan rating rata-rata tanpa memuat seluruh baris."""
+    with closing(connect(db_path)) as conn:
+        total, avg_rating = conn.execute("SELECT COUNT(*), AVG(rating) FROM feedback").fetchone()
+    return total, avg_rating
+
+
+def _search_clause(query, min_rating):
+    where, params = ["f.rating >= ?"], [int(min_rating)]
+    join = ""
+    query = query.strip()
+    if len(query) >= MIN_FTS_QUERY:
+        join = "JOIN feedback_fts ON feedback_fts.rowid = f.id"
+        where.append("feedback_fts MATCH ?")
+        params.append('"' + query.replace('"', '""') + '"')
+    elif query:
+        # Kueri terlalu pendek untuk trigram: cocokkan substring biasa
+        where.append("(f.nama LIKE ? ESCAPE '\\' OR f.pesan LIKE ? ESCAPE '\\')")
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        params += [pattern, pattern]
+    return f"FROM feedback f {join} WHERE {' AND '.join(where)}", params
+
+
+def count_feedback(query="", min_rating=1, db_path=FEEDBACK_DB):
+    """Jumlah feedback yang cocok dengan pencarian dan filter rating."""
+    clause, params = _search_clause(query, min_rating)
+    with closing(connect(db_path)) as conn:
+        return conn.execute(f"SELECT COUNT(*) {clause}", params).fetchone()[0]
+
+
+def search_feedback(query="", min_rating=1, sort="Terbaru", page=1, page_size=10, db_path=FEEDBACK_DB):
+    """Satu halaman feedback yang cocok dengan pencarian, filter rating, dan urutan.
+
+    Filter dan urutan dijalankan di SQLite; hanya baris halaman aktif yang diambil.
+    """
+    clause, params = _search_clause(query, min_rating)
+    with closing(connect(db_path)) as conn:
+        return pd.read_sql_query(
+            f"SELECT f.nama, f.pesan, f.rating, f.timestamp {clause} "
+            f"ORDER BY {SORT_ORDERS[sort]} LIMIT ? OFFSET ?",
+            conn, params=params + [int(page_size), (int(page) - 1) * int(page_size)],
+        )
@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+INDEXED_COLUMNS = ['product_category_name', 'payment_type']
+
+
+def index_dtype(n):
+    """Tipe integer tersempit untuk row id / kode di tabel berukuran n (int32 bila muat)."""
+    return np.int32 if n < 2 ** 31 else np.int64
+
+
+class GroupedRows:
+    """Inverted index nilai -> array row id terurut (CSR: order + offsets)."""
+
+    def __init__(self, values):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Kolom dictionary-encoded: kode categorical langsung menjadi kode grup
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        dtype = index_dtype(len(codes))
+        codes = codes.astype(dtype, copy=False)
+        self.codes = codes
+        self.labels = pd.Index(uniques)
+        # Row dengan nilai kosong (kode -1) tidak masuk ke grup mana pun
+        valid = codes >= 0
+        # argsort stabil: row id dalam setiap grup tetap terurut naik
+        self.order = np.argsort(np.where(valid, codes, len(uniques)), kind='stable')[:int(valid.sum())].astype(dtype)
+        counts = np.bincount(codes[valid], minlength=len(uniques))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def rows(self, value):
+        loc = self.labels.get_indexer([value])[0]
+        if loc < 0:
+            return np.empty(0, dtype=self.order.dtype)
+        return self.order[self.offsets[loc]:self.offsets[loc + 1]]
+
+    def rows_for(self, values):
+        """Gabungan row id untuk banyak nilai sekaligus (hasil terurut)."""
+        locs = self.labels.get_indexer(pd.Index(values))
+        locs = locs[locs >= 0]
+        starts = self.offsets[locs]
+        lengths = self.offsets[locs + 1] - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=self.order.dtype)
+        # Gather tervektorisasi untuk semua potongan [start, start + length)
+        positions = np.repeat(starts - np.cumsum(np.concatenate([[0], lengths[:-1]])), lengths) + np.arange(lengths.sum())
+        return np.sort(self.order[positions])
+
+
+def clip_to_range(rows, lo, hi):
+    # rows terurut, jadi jendela [lo, hi) cukup dicari dengan binary search
+    return rows[np.searchsorted(rows, lo, side='left'):np.searchsorted(rows, hi, side='left')]
+
+
+class FilterIndex:
+    """Index row id per kategori, metode pembayaran, pelanggan, dan segmen.
+
+    Row id adalah posisi baris di OrderStore.frame, sehingga jendela waktu
+    (irisan [lo, hi)) dan filter lain digabung dengan irisan himpunan.
+    """
+
+    def __init__(self, frame):
+        self.n_rows = len(frame)
+        self.columns = {col: GroupedRows(frame[col]) for col in INDEXED_COLUMNS if col in frame.columns}
+        self.customers = GroupedRows(frame['customer_id'])
+        self._segments = {}
+        self._lock = threading.Lock()
+
+    def segment_index(self, key, segments):
+        """Index row id per segmen; segments adalah Series customer_id -> segmen.
+
+        Disimpan per key (misalnya versi aturan segmen) karena segmen berubah
+        bila aturannya berubah.
+        """
+        with self._lock:
+            if key not in self._segments:
+                # Segmen setiap baris = segmen pelanggan pemilik baris tersebut
+                segment_by_customer = segments.reindex(self.customers.labels).to_numpy(dtype=object)
+                row_customer = self.customers.codes
+                values = np.where(row_customer >= 0, segment_by_customer[row_customer], None)
+                self._segments[key] = GroupedRows(values)
+            return self._segments[key]
+
+    def query(self, lo=0, hi=None, **filters):
+        """Row id terurut yang lolos semua filter dalam jendela [lo, hi).
+
+        Setiap filter bernilai None (tidak dibatasi) atau array row id terurut.
+        """
+        hi = self.n_rows if hi is None else hi
+        selected = [clip_to_range(rows, lo, hi) for rows in filters.values() if rows is not None]
+        if not selected:
+            return np.arange(lo, hi, dtype=index_dtype(self.n_rows))
+        # Mulai dari himpunan terkecil agar irisan secepat mungkin
+        selected.sort(key=len)
+        result = selected[0]
+        for rows in selected[1:]:
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+
+class LRUCache:
+    """Cache LRU berukuran terbatas (jumlah entri) dan aman untuk banyak sesi."""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
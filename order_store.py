@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN = 'order_purchase_timestamp'
+
+# Kolom waktu turunan yang dihitung sekali saat store dibuat (bukan per rerun):
+# bulan 'YYYY-MM' (categorical), hari dalam minggu 0-6 dan jam 0-23 (int8, -1 untuk NaT)
+TIME_FIELDS = ['order_purchase_month', 'day_of_week', 'hour_of_day']
+
+
+def time_fields(timestamps):
+    """Kolom TIME_FIELDS untuk Series timestamp."""
+    valid = timestamps.notna().to_numpy()
+    months = timestamps.to_numpy().astype('datetime64[M]')
+    # Bulan unik hanya puluhan: format string sekali per bulan, bukan per baris
+    unique_months, month_codes = np.unique(months[valid], return_inverse=True)
+    codes = np.full(len(timestamps), -1, dtype=np.int32)
+    codes[valid] = month_codes
+    labels = np.datetime_as_string(unique_months, unit='M').astype(object)
+    return pd.DataFrame({
+        'order_purchase_month': pd.Categorical.from_codes(codes, categories=labels),
+        'day_of_week': timestamps.dt.dayofweek.fillna(-1).astype('int8'),
+        'hour_of_day': timestamps.dt.hour.fillna(-1).astype('int8'),
+    }, index=timestamps.index)
+
+
+class OrderStore:
+    """Order yang diurutkan berdasarkan timestamp untuk slicing rentang waktu.
+
+    Rentang tanggal diubah menjadi irisan baris yang bersebelahan lewat
+    binary search (searchsorted), sehingga biayanya O(log n) + ukuran irisan.
+    Baris dengan timestamp kosong (NaT) disimpan di akhir dan hanya ikut
+    bila rentang tidak dibatasi sama sekali.
+
+    Kolom TIME_FIELDS ditambahkan ke frame; source_columns adalah kolom
+    aslinya (misalnya untuk ekspor).
+    """
+
+    def __init__(self, df, time_column=TIME_COLUMN):
+        frame = df.sort_values(time_column, kind='stable', na_position='last', ignore_index=True)
+        source_columns = list(frame.columns)
+        for col, values in time_fields(frame[time_column]).items():
+            frame[col] = values
+        self._attach(frame, time_column, source_columns)
+
+    @classmethod
+    def from_frame(cls, frame, time_column=TIME_COLUMN):
+        """Store dari frame OrderStore yang sudah jadi (mis. dari cache bersama), tanpa diurutkan ulang."""
+        store = cls.__new__(cls)
+        store._attach(frame, time_column, [col for col in frame.columns if col not in TIME_FIELDS])
+        return store
+
+    def _attach(self, frame, time_column, source_columns):
+        self.time_column = time_column
+        self.frame = frame
+        self.source_columns = source_columns
+        timestamps = self.frame[time_column]
+        self.n_valid = int(timestamps.notna().sum())
+        self._keys = timestamps.to_numpy()[:self.n_valid]
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def min_timestamp(self):
+        return self.frame[self.time_column].iloc[0] if self.n_valid else pd.NaT
+
+    @property
+    def max_timestamp(self):
+        return self.frame[self.time_column].iloc[self.n_valid - 1] if self.n_valid else pd.NaT
+
+    def bounds(self, start_date=None, end_date=None):
+        """Posisi [lo, hi) untuk tanggal start_date s.d. end_date (inklusif)."""
+        lo = 0
+        hi = len(self.frame) if start_date is None and end_date is None else self.n_valid
+        if start_date is not None:
+            lo = int(np.searchsorted(self._keys, np.datetime64(pd.Timestamp(start_date)), side='left'))
+        if end_date is not None:
+            # Batas atas eksklusif: awal hari setelah end_date
+            end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+            hi = int(np.searchsorted(self._keys, np.datetime64(end), side='left'))
+        return lo, max(lo, hi)
+
+    def window(self, start_date=None, end_date=None):
+        lo, hi = self.bounds(start_date, end_date)
+        return self.frame.iloc[lo:hi]
+
+    def take(self, rows, columns=None):
+        """Baris frame untuk rows (slice [lo, hi) atau array row id) tanpa salinan yang tidak perlu.
+
+        Slice menghasilkan view berisi semua kolom; untuk array row id hanya
+        kolom columns (None = semua) yang disalin. Pemanggil memilih sendiri
+        kolom yang dibutuhkannya dari hasil ini.
+        """
+        if isinstance(rows, slice) or columns is None:
+            return self.frame.iloc[rows]
+        return self.frame.iloc[rows, [self.frame.columns.get_loc(col) for col in columns]]
+
+    def row_ids(self, rows):
+        """Array row id untuk rows (slice [lo, hi) atau array row id)."""
+        if isinstance(rows, slice):
+            return np.arange(*rows.indices(len(self.frame)))
+        return rows
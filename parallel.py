@@ -0,0 +1,133 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from rfm import compute_rfm, segment_table, load_segment_rules, sketch_partitions, RFMSketch
+from cube import build_cube
+from order_store import TIME_FIELDS
+
+# Jalur eksekusi terpartisi: data dibagi per pelanggan (hash customer_id) untuk
+# RFM + segmen, atau per rentang bulan untuk cube penjualan, lalu setiap
+# partisi dihitung di process pool. Partisi tidak saling tumpang tindih
+# (pelanggan/bulan hanya ada di satu partisi), sehingga hasil gabungannya
+# identik dengan perhitungan serial, termasuk urutan penjumlahan float.
+# Skor kuintil memakai sketch kuantil per partisi sketch (rfm.SKETCH_PARTITIONS,
+# jumlahnya tetap): setiap worker memegang partisi sketch yang utuh, membangun
+# sketch-nya, dan sketch digabung berurutan nomor partisi. Hasilnya sama dengan
+# jalur serial untuk berapa pun jumlah worker.
+
+RFM_INPUT_COLUMNS = ['customer_id', 'order_id', 'order_purchase_timestamp', 'payment_value']
+CUBE_INPUT_COLUMNS = ['customer_id', 'order_purchase_timestamp', 'payment_value', 'payment_type',
+                      'product_category_name', 'review_score']
+
+
+def worker_pool(workers):
+    """Process pool untuk jalur terpartisi di proses batch (precompute, warm-up, benchmark).
+
+    'fork' hanya dipakai selama proses ini belum menjalankan thread lain: fork
+    dari proses multi-thread bisa membuat worker deadlock pada lock yang sedang
+    dipegang thread lain, jadi selain itu dipakai 'forkserver' (atau 'spawn').
+    Dashboard tidak memanggil fungsi ini: di server Streamlit selalu ada thread
+    lain, dan worker 'forkserver'/'spawn' akan mengeksekusi ulang skrip
+    dashboard (modul __main__ Streamlit) saat start.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods and threading.active_count() == 1:
+        method = 'fork'
+    else:
+        method = 'forkserver' if 'forkserver' in methods else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def customer_partitions(customer_ids, n_partitions):
+    """Label partisi per baris dari hash customer_id; satu pelanggan selalu di satu partisi.
+
+    Partisi worker adalah gabungan partisi sketch, jadi setiap partisi sketch
+    hanya ada di satu worker.
+    """
+    return sketch_partitions(customer_ids) % n_partitions
+
+
+def month_partitions(timestamps, n_partitions):
+    """Label partisi per baris: bulan-bulan berurutan dibagi menjadi n_partitions
+    rentang dengan jumlah baris kira-kira sama. Baris tanpa timestamp berlabel -1."""
+    values = timestamps.to_numpy()
+    valid = ~np.isnat(values)
+    months, inverse, counts = np.unique(values[valid].astype('datetime64[M]'),
+                                        return_inverse=True, return_counts=True)
+    # Partisi bulan = posisi jumlah baris kumulatif sebelum bulan itu
+    month_partition = (np.cumsum(counts) - counts) * n_partitions // max(counts.sum(), 1)
+    labels = np.full(len(values), -1, dtype='int64')
+    labels[valid] = month_partition[inverse]
+    return labels
+
+
+def split_partitions(df, labels, n_partitions):
+    """Potong df per label (0..n_partitions-1) dengan urutan baris asli tetap terjaga."""
+    order = np.argsort(labels, kind='stable')
+    edges = np.searchsorted(labels[order], np.arange(n_partitions + 1), side='left')
+    return [df.take(order[lo:hi]) for lo, hi in zip(edges[:-1], edges[1:])]
+
+
+def _rfm_partition(part, max_date):
+    rfm = compute_rfm(part, max_date)
+    return rfm, RFMSketch.partitioned(rfm)
+
+
+def _cube_partition(part, segments):
+    return build_cube(part, segments)
+
+
+def _map(executor, workers, fn, parts, *args):
+    """Jalankan fn untuk setiap partisi di executor (atau pool sementara)."""
+    if executor is not None:
+        return list(executor.map(fn, parts, *[[arg] * len(parts) for arg in args]))
+    with worker_pool(workers) as pool:
+        return list(pool.map(fn, parts, *[[arg] * len(parts) for arg in args]))
+
+
+def parallel_segmented_rfm(df, workers=1, rules=None, max_date=None, executor=None):
+    """Sama dengan analytics.segmented_rfm(), dihitung per partisi pelanggan.
+
+    max_date ditentukan dari seluruh data sebelum dibagi sehingga recency
+    setiap partisi memakai acuan yang sama. Skor dan segmen dihitung setelah
+    penggabungan dari gabungan sketch partisi, sama persis dengan run serial.
+    """
+    if rules is None:
+        rules = load_segment_rules()
+    if max_date is None:
+        max_date = df['order_purchase_timestamp'].max() + pd.Timedelta(days=1)
+    if workers <= 1:
+        return segment_table(compute_rfm(df, max_date), rules)
+    labels = customer_partitions(df['customer_id'], workers)
+    parts = split_partitions(df[RFM_INPUT_COLUMNS], labels, workers)
+    partials = _map(executor, workers, _rfm_partition, parts, max_date)
+    # Pelanggan antar partisi saling lepas: cukup digabung lalu diurutkan seperti groupby
+    rfm = pd.concat([part for part, _ in partials]).sort_index()
+    sketches = {}
+    for _, part_sketches in partials:
+        sketches.update(part_sketches)
+    return segment_table(rfm, rules, RFMSketch.merged(sketches))
+
+
+def parallel_order_cube(df, segments, workers=1, executor=None):
+    """Sama dengan analytics.order_cube(), dihitung per rentang bulan.
+
+    Bulan adalah dimensi cube, jadi setiap sel hanya berasal dari satu
+    partisi dan penggabungan cukup dengan concat berurutan.
+    """
+    if workers <= 1:
+        return build_cube(df[df['order_purchase_timestamp'].notna()], segments)
+    labels = month_partitions(df['order_purchase_timestamp'], workers)
+    # Kolom waktu turunan OrderStore ikut dikirim agar worker tidak menghitungnya ulang
+    columns = [col for col in CUBE_INPUT_COLUMNS + TIME_FIELDS if col in df.columns]
+    parts = [part for part in split_partitions(df[columns], labels, workers) if len(part)]
+    partials = _map(executor, workers, _cube_partition, parts, segments)
+    cube = pd.concat(partials, ignore_index=True)
+    # Kolom categorical hanya tetap categorical bila dtype semua partisi sama
+    # (kolom sumber categorical); selain itu bentuk ulang seperti build_cube()
+    for col in ['product_category_name', 'payment_type', 'segment']:
+        if cube[col].dtype != 'category':
+            cube[col] = cube[col].astype('category')
+    return cube
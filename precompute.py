@@ -0,0 +1,49 @@
+import os
+import time
+import argparse
+from data_loader import load_dataset, data_version, file_fingerprint, DATA_CSV, DATA_PARQUET, DASHBOARD_COLUMNS
+from rfm import load_segment_rules, SEGMENT_RULES_FILE
+from analytics import run_pipeline
+from artifacts import write_artifacts, ARTIFACTS_DIR
+from churn import load_model, model_version, MODEL_PATH
+
+# Batch job (misalnya nightly): hitung RFM, segmen, agregat, dan churn sekali,
+# lalu tulis artefak berversi yang tinggal dibaca oleh dashboard
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute artefak analitik untuk dashboard.")
+    parser.add_argument("--csv", default=DATA_CSV)
+    parser.add_argument("--parquet", default=DATA_PARQUET)
+    parser.add_argument("--rules", default=SEGMENT_RULES_FILE)
+    parser.add_argument("--out", default=ARTIFACTS_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="jumlah proses untuk RFM dan cube terpartisi (1 = serial)")
+    parser.add_argument("--model", default=MODEL_PATH,
+                        help="model churn terlatih (churn.py); tanpa file ini churn dihitung dari recency")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df, load_report = load_dataset(DASHBOARD_COLUMNS, args.csv, args.parquet)
+    print(f"Load: {load_report['rows']} baris dari {load_report['source']} ({load_report['seconds']:.2f} s)")
+
+    pipeline_start = time.perf_counter()
+    churn_model = load_model(args.model)
+    artifacts = run_pipeline(df, load_segment_rules(args.rules), workers=args.workers, churn_model=churn_model)
+    print(f"Pipeline: {time.perf_counter() - pipeline_start:.2f} s ({args.workers} worker)")
+
+    target = write_artifacts(
+        artifacts,
+        data_version(args.csv, args.parquet),
+        file_fingerprint(args.rules),
+        root=args.out,
+        extra={'source': load_report['source'], 'rows': load_report['rows'],
+               'churn_model': model_version(args.model) if churn_model is not None else None},
+    )
+    for name, frame in artifacts.items():
+        print(f"  {name:<14} {len(frame):>10} baris")
+    print(f"Artefak ditulis ke {target} ({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
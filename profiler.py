@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import resource
+import threading
+import functools
+from datetime import datetime
+from contextlib import contextmanager
+
+# Modul ini hanya memakai pustaka standar (pandas diimpor saat membuat tabel
+# ringkasan) agar dashboard bisa membuat profiler sebelum impor lainnya dan
+# waktu impor modul ikut tercatat
+
+# Log JSONL berisi satu record waktu per rerun; kosongkan variabel lingkungan
+# DASHBOARD_PROFILE_LOG untuk mematikan log
+PROFILE_LOG = os.environ.get("DASHBOARD_PROFILE_LOG", "profile_log.jsonl")
+
+_active = threading.local()
+_log_lock = threading.Lock()
+# Rerun penuh pertama di proses ini: rerun yang membayar impor modul dan
+# render pertama setelah server (atau worker baru) dimulai
+_startup_lock = threading.Lock()
+_startup_claimed = False
+_startup = None
+
+
+def rss_mb():
+    """Resident set size proses saat ini (MB); puncak RSS bila /proc tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        # ru_maxrss dalam KB di Linux (byte di macOS); cukup sebagai perkiraan
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def active_profiler():
+    """Profiler milik rerun yang sedang berjalan di thread ini, atau None."""
+    return getattr(_active, 'profiler', None)
+
+
+class RerunProfiler:
+    """Pencatat waktu dan memori per bagian untuk satu rerun skrip.
+
+    section(name) membungkus satu tahap; step(name) di dalam section membagi
+    tahap itu menjadi langkah berurutan (misalnya satu chart per langkah)
+    tanpa perlu blok with baru. Setiap sesi Streamlit menjalankan skrip di
+    thread sendiri, sehingga profiler aktif disimpan per thread.
+    Selisih RSS per bagian hanya perkiraan: sesi lain di proses yang sama
+    ikut memengaruhinya. fragment berisi nama unit bila yang dijalankan
+    ulang hanya satu fragment, bukan seluruh skrip.
+    """
+
+    def __init__(self, fragment=None):
+        self.fragment = fragment
+        self.started_at = datetime.now()
+        self.sections = []
+        self.cache = {}
+        self._stack = []
+        # Pemegang langkah untuk step() di luar section mana pun
+        self._root = {'step': None}
+        self._start = time.perf_counter()
+        self.total_ms = None
+        # {'import_ms', 'first_render_ms'} bila ini rerun penuh pertama di proses
+        self.startup = None
+
+    def activate(self):
+        global _startup_claimed
+        _active.profiler = self
+        if self.fragment is None:
+            with _startup_lock:
+                if not _startup_claimed:
+                    _startup_claimed = True
+                    self.startup = {}
+        return self
+
+    def _open(self, name, kind):
+        path = "/".join([entry['name'] for entry in self._stack] + [name])
+        entry = {'name': name, 'kind': kind, 'path': path, 'depth': len(self._stack),
+                 'start': time.perf_counter(), 'rss_start': rss_mb(), 'step': None}
+        self.sections.append(entry)
+        self._stack.append(entry)
+        return entry
+
+    def _close(self, entry):
+        if 'ms' in entry:
+            return
+        if entry['step'] is not None:
+            self._close(entry['step'])
+        # Tutup juga section/step yang masih terbuka di dalam entry ini
+        while self._stack and self._stack[-1] is not entry:
+            self._close(self._stack[-1])
+        entry['ms'] = (time.perf_counter() - entry.pop('start')) * 1000
+        entry['rss_delta_mb'] = rss_mb() - entry.pop('rss_start')
+        del entry['step']
+        self._stack.remove(entry)
+
+    @contextmanager
+    def section(self, name):
+        entry = self._open(name, 'section')
+        try:
+            yield self
+        finally:
+            self._close(entry)
+
+    def step(self, name):
+        """Akhiri langkah sebelumnya di section aktif dan mulai langkah baru."""
+        sections = [entry for entry in self._stack if entry['kind'] == 'section']
+        parent = sections[-1] if sections else self._root
+        if parent['step'] is not None:
+            self._close(parent['step'])
+        # Langkah tetap di stack agar section di dalamnya bertingkat benar;
+        # ditutup oleh step() berikutnya atau saat parent ditutup
+        parent['step'] = self._open(name, 'step')
+
+    def cache_event(self, name, hit):
+        counts = self.cache.setdefault(name, {'hits': 0, 'misses': 0})
+        counts['hits' if hit else 'misses'] += 1
+
+    def finish(self):
+        global _startup
+        if self._root['step'] is not None:
+            self._close(self._root['step'])
+        while self._stack:
+            self._close(self._stack[-1])
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+        if self.startup is not None:
+            imports = [entry['ms'] for entry in self.sections if entry['path'] == 'imports']
+            self.startup = {'import_ms': round(sum(imports), 2), 'first_render_ms': round(self.total_ms, 2)}
+            _startup = self.startup
+        if _active.__dict__.get('profiler') is self:
+            del _active.profiler
+        return self
+
+    def summary(self):
+        """DataFrame per bagian: nama bertingkat, waktu (ms), dan selisih RSS (MB)."""
+        import pandas as pd
+        rows = [{'bagian': " " * entry['depth'] + entry['name'],
+                 'ms': round(entry['ms'], 1),
+                 'rss_delta_mb': round(entry['rss_delta_mb'], 1)}
+                for entry in self.sections if 'ms' in entry]
+        return pd.DataFrame(rows, columns=['bagian', 'ms', 'rss_delta_mb'])
+
+    def cache_summary(self):
+        import pandas as pd
+        rows = [{'cache': name, **counts} for name, counts in sorted(self.cache.items())]
+        return pd.DataFrame(rows, columns=['cache', 'hits', 'misses'])
+
+    def record(self):
+        record = {
+            'timestamp': self.started_at.isoformat(timespec='milliseconds'),
+            'pid': os.getpid(),
+            'fragment': self.fragment,
+            'total_ms': round(self.total_ms, 2),
+            'rss_mb': round(rss_mb(), 1),
+            'sections': [{'path': entry['path'], 'ms': round(entry['ms'], 2),
+                          'rss_delta_mb': round(entry['rss_delta_mb'], 2)}
+                         for entry in self.sections if 'ms' in entry],
+            'cache': self.cache,
+        }
+        if self.startup is not None:
+            record['startup'] = self.startup
+        return record
+
+
+def process_startup():
+    """{'import_ms', 'first_render_ms'} dari rerun penuh pertama di proses ini, atau None."""
+    return _startup
+
+
+def append_log(profiler, path=PROFILE_LOG):
+    """Tambahkan record rerun ke log JSONL (satu baris per rerun)."""
+    if not path:
+        return
+    line = json.dumps(profiler.record()) + "\n"
+    with _log_lock:
+        with open(path, "a") as f:
+            f.write(line)
+
+
+@contextmanager
+def fragment_section(name):
+    """Section untuk satu unit fragment.
+
+    Saat skrip dijalankan penuh, unit menjadi section di profiler rerun yang
+    aktif. Saat hanya fragment itu yang dijalankan ulang, tidak ada profiler
+    aktif: profiler baru dibuat untuk unit ini dan dicatat ke log sendiri.
+    """
+    profiler = active_profiler()
+    if profiler is not None:
+        with profiler.section(name):
+            yield profiler
+        return
+    profiler = RerunProfiler(fragment=name).activate()
+    try:
+        with profiler.section(name):
+            yield profiler
+    finally:
+        profiler.finish()
+        append_log(profiler)
+
+
+def profiled_cache(cache_decorator, name=None):
+    """Bungkus dekorator cache (misalnya st.cache_data) agar hit/miss tercatat.
+
+    Badan fungsi hanya dijalankan saat miss, jadi miss dicatat di dalamnya;
+    setiap pemanggilan yang tidak mencatat miss dihitung sebagai hit.
+    """
+    def decorator(fn):
+        key = name or fn.__name__
+
+        @functools.wraps(fn)
+        def on_miss(*args, **kwargs):
+            profiler = active_profiler()
+            if profiler is not None:
+                profiler.cache_event(key, hit=False)
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(on_miss)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            profiler = active_profiler()
+            before = profiler.cache.get(key, {}).get('misses', 0) if profiler is not None else 0
+            result = cached(*args, **kwargs)
+            if profiler is not None and profiler.cache.get(key, {}).get('misses', 0) == before:
+                profiler.cache_event(key, hit=True)
+            return result
+
+        call.clear = cached.clear
+        return call
+    return decorator
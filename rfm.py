@@ -0,0 +1,436 @@
+import os
+import operator
+import numpy as np
+import pandas as pd
+from sketch import KLLSketch, DEFAULT_K, UPDATE_CHUNK
+from data_loader import decode_index
+
+# Tabel aturan segmentasi RFM (urutan baris = prioritas, aturan pertama yang cocok menang).
+# Default memakai skor kuintil; aturan ambang absolut lama tetap tersedia
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SEGMENT_RULES_FILE = os.path.join(_HERE, "rfm_score_segments.csv")
+THRESHOLD_RULES_FILE = os.path.join(_HERE, "rfm_segments.csv")
+DEFAULT_SEGMENT = 'Others'
+RFM_COLUMNS = ['recency', 'frequency', 'monetary']
+
+# Skor kuintil 1-5 per dimensi dan skor gabungan frequency-monetary
+SCORE_COLUMNS = ['r_score', 'f_score', 'm_score', 'fm_score']
+SCORE_QUANTILES = [0.2, 0.4, 0.6, 0.8]
+
+# Batas kuintil dihitung dari sketch per partisi hash customer_id dengan jumlah
+# partisi tetap (bukan jumlah worker) dan seed per partisi, lalu digabung
+# berurutan, sehingga skor sama untuk berapa pun jumlah worker
+SKETCH_PARTITIONS = 32
+
+# Pelanggan lama yang nilainya berubah tetap tercatat di sketch dengan nilai
+# lamanya; sketch dibangun ulang bila porsinya melebihi batas ini
+MAX_STALE_FRACTION = 0.02
+NS_PER_DAY = 86400 * 10 ** 9
+
+# Kolom state RFMStore. Pelanggan baru ditampung di buffer dan baru disisipkan
+# ke state bila buffer melebihi porsi state ini (minimal PENDING_MIN pelanggan)
+STATE_COLUMNS = ['last_purchase', 'frequency', 'monetary']
+PENDING_FRACTION = 0.1
+PENDING_MIN = 10_000
+
+_OPERATORS = {
+    '<=': operator.le,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '>': operator.gt,
+    '==': operator.eq,
+}
+
+
+def _partial_aggregates(df):
+    # observed=True: customer_id categorical dikelompokkan per kode, hanya pelanggan yang ada di df
+    partial = df.groupby('customer_id', observed=True).agg(
+        last_purchase=('order_purchase_timestamp', 'max'),
+        frequency=('order_id', 'count'),
+        monetary=('payment_value', 'sum'),
+    )
+    partial.index = decode_index(partial.index)
+    return partial
+
+
+def compute_rfm(df, max_date=None):
+    """Hitung recency, frequency, dan monetary per pelanggan.
+
+    Hanya memakai reduksi groupby bawaan (max, count, sum); recency lalu
+    diturunkan dengan satu pengurangan tervektorisasi terhadap max_date.
+    """
+    if max_date is None:
+        max_date = df['order_purchase_timestamp'].max() + pd.Timedelta(days=1)
+    rfm = _partial_aggregates(df)
+    rfm.insert(0, 'recency', (max_date - rfm.pop('last_purchase')).dt.days)
+    return rfm
+
+
+class RFMSketch:
+    """Sketch kuantil (KLL) untuk skor kuintil R, F, dan M.
+
+    Bisa di-update per batch dan digabung antar partisi tanpa mengurutkan
+    seluruh tabel pelanggan. Recency disimpan sebagai hari pembelian
+    terakhir t dengan recency = floor(origin - t): dari tabel RFM t = -recency
+    (origin 0), dari RFMStore t = hari sejak epoch (origin = max_date), sehingga
+    sketch RFMStore tetap berlaku saat max_date bergeser.
+
+    Error rank batas kuintil: rank_error_bound(k) ditambah stale_fraction.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.purchase_day = KLLSketch(k, seed)
+        self.frequency = KLLSketch(k, seed + 1)
+        self.monetary = KLLSketch(k, seed + 2)
+        self.stale = 0
+
+    @classmethod
+    def from_rfm(cls, rfm, k=DEFAULT_K, seed=0):
+        sketch = cls(k, seed)
+        sketch.update(-rfm['recency'].to_numpy(dtype='float64'), rfm['frequency'], rfm['monetary'])
+        return sketch
+
+    @classmethod
+    def from_state(cls, state, k=DEFAULT_K):
+        """Sketch gabungan dari state RFMStore (last_purchase, frequency, monetary)."""
+        def build(part, seed):
+            return cls(k, seed).update(_epoch_days(part['last_purchase']), part['frequency'], part['monetary'])
+        return cls.merged(_by_sketch_partition(state, ['last_purchase', 'frequency', 'monetary'], build), k)
+
+    @classmethod
+    def partitioned(cls, rfm, k=DEFAULT_K):
+        """{partisi: sketch} dari tabel rfm, satu sketch per partisi hash customer_id yang tidak kosong."""
+        def build(part, seed):
+            return cls(k, seed).update(-part['recency'].astype('float64'), part['frequency'], part['monetary'])
+        return _by_sketch_partition(rfm, RFM_COLUMNS, build)
+
+    @classmethod
+    def merged(cls, sketches, k=DEFAULT_K):
+        """Gabungan sketch partisi dalam urutan nomor partisi (hasil tidak bergantung urutan selesai)."""
+        sketch = cls(k)
+        for partition in sorted(sketches):
+            sketch.merge(sketches[partition])
+        return sketch
+
+    def update(self, purchase_days, frequency, monetary):
+        self.purchase_day.update(purchase_days)
+        self.frequency.update(np.asarray(frequency, dtype='float64'))
+        self.monetary.update(np.asarray(monetary, dtype='float64'))
+        return self
+
+    def merge(self, other):
+        self.purchase_day.merge(other.purchase_day)
+        self.frequency.merge(other.frequency)
+        self.monetary.merge(other.monetary)
+        self.stale += other.stale
+        return self
+
+    @property
+    def stale_fraction(self):
+        return self.stale / max(len(self.frequency), 1)
+
+    def boundaries(self, origin=0.0):
+        """Empat batas kuintil (naik) untuk recency, frequency, dan monetary."""
+        days = self.purchase_day.quantiles(SCORE_QUANTILES)
+        return {
+            'recency': np.sort(np.floor(origin - days)),
+            'frequency': self.frequency.quantiles(SCORE_QUANTILES),
+            'monetary': self.monetary.quantiles(SCORE_QUANTILES),
+        }
+
+
+def sketch_partitions(customer_ids):
+    """Nomor partisi sketch (0..SKETCH_PARTITIONS-1) per customer_id, dari hash nilainya."""
+    customer_ids = pd.Series(customer_ids)
+    if isinstance(customer_ids.dtype, pd.CategoricalDtype):
+        # Hash nilai kategori sekali lalu ambil per kode (sama dengan hash nilainya langsung)
+        hashes = pd.util.hash_array(customer_ids.cat.categories.to_numpy(), categorize=False)
+        hashes = hashes.take(customer_ids.cat.codes.to_numpy())
+    else:
+        hashes = pd.util.hash_array(customer_ids.to_numpy(), categorize=False)
+    return (hashes % np.uint64(SKETCH_PARTITIONS)).astype('int64')
+
+
+def _by_sketch_partition(table, columns, build):
+    """{partisi: build(array kolom partisi, seed)} untuk partisi sketch yang tidak kosong.
+
+    Partisi sampai UPDATE_CHUNK baris dimasukkan ke sketch dalam satu potongan
+    yang diurutkan, sehingga sketch-nya tidak bergantung pada urutan baris;
+    partisi yang lebih besar diurutkan per customer_id lebih dulu.
+    """
+    labels = sketch_partitions(table.index)
+    order = np.argsort(labels, kind='stable')
+    edges = np.searchsorted(labels[order], np.arange(SKETCH_PARTITIONS + 1), side='left')
+    values = {col: table[col].to_numpy() for col in columns}
+    sketches = {}
+    for partition, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+        if hi > lo:
+            rows = order[lo:hi]
+            if len(rows) > UPDATE_CHUNK:
+                rows = rows[np.argsort(table.index.to_numpy()[rows], kind='stable')]
+            sketches[partition] = build({col: array[rows] for col, array in values.items()}, 3 * partition)
+    return sketches
+
+
+def _epoch_days(timestamps):
+    values = pd.Series(timestamps).to_numpy(dtype='datetime64[ns]')
+    days = values.astype('int64') / NS_PER_DAY
+    return np.where(np.isnat(values), np.nan, days)
+
+
+def _combine(col, current, partial):
+    """Gabungkan agregat lama dan parsial per kolom state: max (abaikan NaT), jumlah, jumlah."""
+    if col == 'last_purchase':
+        return np.fmax(current, partial)
+    return current + partial
+
+
+def exact_boundaries(rfm):
+    """Empat batas kuintil eksak (naik) untuk recency, frequency, dan monetary dari tabel rfm.
+
+    Pembanding untuk batas dari sketch. NaN (recency pelanggan tanpa timestamp
+    order) diabaikan, sama seperti di sketch.
+    """
+    bounds = {}
+    for col in RFM_COLUMNS:
+        values = rfm[col].to_numpy(dtype='float64')
+        values = values[~np.isnan(values)]
+        bounds[col] = np.quantile(values, SCORE_QUANTILES, method='inverted_cdf') if len(values) else np.array([])
+    return bounds
+
+
+def score_rfm(rfm, sketch=None, origin=0.0):
+    """Skor kuintil 1-5: R tinggi = pembelian terbaru, F dan M tinggi = nilai terbesar.
+
+    Batas kuintil dari sketch; tanpa sketch, dari gabungan sketch partisi
+    rfm (RFMSketch.partitioned), sama dengan yang dibangun jalur terpartisi.
+    """
+    if sketch is None:
+        sketch = RFMSketch.merged(RFMSketch.partitioned(rfm))
+    return quintile_scores(rfm, sketch.boundaries(origin))
+
+
+def quintile_scores(rfm, bounds):
+    """Skor kuintil dari empat batas per kolom.
+
+    Nilai yang sama dengan batas kuintil masuk ke kuintil bawahnya; recency
+    NaN mendapat r_score 1. fm_score adalah rata-rata F dan M yang dibulatkan ke atas.
+    """
+    scores = pd.DataFrame({
+        'r_score': 5 - np.searchsorted(bounds['recency'], rfm['recency'].to_numpy(), side='left'),
+        'f_score': 1 + np.searchsorted(bounds['frequency'], rfm['frequency'].to_numpy(), side='left'),
+        'm_score': 1 + np.searchsorted(bounds['monetary'], rfm['monetary'].to_numpy(), side='left'),
+    }, index=rfm.index).astype('int8')
+    scores['fm_score'] = ((scores['f_score'] + scores['m_score'] + 1) // 2).astype('int8')
+    return scores
+
+
+class RFMStore:
+    """Penyimpanan RFM inkremental: last purchase, jumlah order, dan total nilai per pelanggan.
+
+    Batch order baru hanya memperbarui pelanggan yang disentuhnya; recency
+    diturunkan dari max_date saat query sehingga tidak perlu dihitung ulang.
+    Pelanggan lama diperbarui di tempat lewat posisi indeks, pelanggan baru
+    ditampung di buffer lalu disisipkan sekaligus ke state yang indeksnya
+    tetap terurut. Biaya per batch (amortized) sebanding dengan jumlah
+    pelanggan yang disentuh, bukan dengan seluruh tabel pelanggan.
+    """
+
+    def __init__(self, state=None, pending_min=PENDING_MIN):
+        # Sketch skor kuintil dibuat saat pertama dibutuhkan, lalu di-update per batch
+        self._sketch = None
+        if state is None:
+            state = pd.DataFrame({
+                'last_purchase': pd.Series(dtype='datetime64[ns]'),
+                'frequency': pd.Series(dtype='int64'),
+                'monetary': pd.Series(dtype='float64'),
+            }, index=pd.Index([], name='customer_id'))
+        elif not state.index.is_monotonic_increasing:
+            state = state.sort_index()
+        self.state = state
+        self.pending_min = pending_min
+        self._clear_pending()
+
+    @classmethod
+    def from_orders(cls, df):
+        return cls(_partial_aggregates(df))
+
+    def _clear_pending(self):
+        # Buffer pelanggan baru: array kolom dengan kapasitas berlipat dan posisi per customer_id
+        self._pending = {col: np.empty(0, dtype=self.state[col].dtype) for col in STATE_COLUMNS}
+        self._pending_ids = []
+        self._pending_rows = {}
+
+    def _append_pending(self, new):
+        start, end = len(self._pending_ids), len(self._pending_ids) + len(new)
+        if end > len(self._pending['frequency']):
+            capacity = max(end, 2 * start, 1024)
+            for col, values in self._pending.items():
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:start] = values[:start]
+                self._pending[col] = grown
+        for col in STATE_COLUMNS:
+            self._pending[col][start:end] = new[col].to_numpy()
+        self._pending_ids.extend(new.index)
+        self._pending_rows.update(zip(new.index, range(start, end)))
+
+    def flush(self):
+        """Sisipkan buffer pelanggan baru ke state; indeks state tetap terurut."""
+        n = len(self._pending_ids)
+        if n:
+            ids = pd.Index(self._pending_ids)
+            order = np.argsort(ids.to_numpy(), kind='stable')
+            ids = ids[order]
+            # Posisi sisip dihitung pada state lama; buffer terurut sehingga urutan gabungan tetap naik
+            positions = self.state.index.searchsorted(ids)
+            index = pd.Index(np.insert(self.state.index.to_numpy(), positions, ids.to_numpy()),
+                             name=self.state.index.name)
+            self.state = pd.DataFrame({
+                col: np.insert(self.state[col].to_numpy(), positions, self._pending[col][:n][order])
+                for col in STATE_COLUMNS
+            }, index=index)
+            self._clear_pending()
+        return self.state
+
+    def update(self, new_orders):
+        """Gabungkan batch order baru; mengembalikan jumlah pelanggan yang diperbarui."""
+        partial = _partial_aggregates(new_orders)
+
+        # Pelanggan lama: posisi lewat hash table indeks state (dibangun sekali
+        # per flush), lalu gabungkan agregat parsial (max, jumlah, jumlah) di tempat
+        positions = self.state.index.get_indexer(partial.index)
+        in_state = positions >= 0
+        rows = positions[in_state]
+        if len(rows):
+            old = partial[in_state]
+            for col in STATE_COLUMNS:
+                current = self.state[col].to_numpy()[rows]
+                self.state.iloc[rows, self.state.columns.get_loc(col)] = _combine(col, current, old[col].to_numpy())
+
+        # Pelanggan yang masih di buffer diperbarui di buffer; sisanya ditambahkan ke buffer
+        rest = partial[~in_state]
+        slots = np.fromiter((self._pending_rows.get(customer, -1) for customer in rest.index),
+                            dtype='int64', count=len(rest))
+        buffered = slots >= 0
+        if buffered.any():
+            slot_rows, again = slots[buffered], rest[buffered]
+            for col in STATE_COLUMNS:
+                values = self._pending[col]
+                values[slot_rows] = _combine(col, values[slot_rows], again[col].to_numpy())
+        self._append_pending(rest[~buffered])
+
+        if self._sketch is not None:
+            # Nilai baru pelanggan lama ikut dimasukkan; nilai lamanya tidak bisa
+            # dihapus dari sketch sehingga dihitung sebagai stale
+            touched = {col: np.concatenate([self.state[col].to_numpy()[rows], self._pending[col][slots[buffered]]])
+                       for col in STATE_COLUMNS}
+            new = rest[~buffered]
+            self._sketch.update(
+                _epoch_days(np.concatenate([new['last_purchase'].to_numpy(), touched['last_purchase']])),
+                np.concatenate([new['frequency'].to_numpy(), touched['frequency']]),
+                np.concatenate([new['monetary'].to_numpy(), touched['monetary']]),
+            )
+            self._sketch.stale += len(touched['frequency'])
+            if self._sketch.stale_fraction > MAX_STALE_FRACTION:
+                self._sketch = None
+
+        if len(self._pending_ids) > max(self.pending_min, PENDING_FRACTION * len(self.state)):
+            self.flush()
+        return len(partial)
+
+    @property
+    def max_date(self):
+        return self.flush()['last_purchase'].max() + pd.Timedelta(days=1)
+
+    def to_rfm(self, max_date=None):
+        """Tabel RFM dengan bentuk yang sama seperti compute_rfm()."""
+        if max_date is None:
+            max_date = self.max_date
+        rfm = self.flush()
+        return pd.DataFrame({
+            'recency': (max_date - rfm['last_purchase']).dt.days,
+            'frequency': rfm['frequency'],
+            'monetary': rfm['monetary'],
+        })
+
+    @property
+    def sketch(self):
+        if self._sketch is None:
+            self._sketch = RFMSketch.from_state(self.flush())
+        return self._sketch
+
+    def scores(self, max_date=None):
+        """Skor kuintil tabel to_rfm(max_date) dari sketch yang di-update per batch (tanpa membangun ulang)."""
+        if max_date is None:
+            max_date = self.max_date
+        origin = pd.Timestamp(max_date).value / NS_PER_DAY
+        return score_rfm(self.to_rfm(max_date), self.sketch, origin)
+
+    def save(self, path):
+        self.flush().to_parquet(path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(pd.read_parquet(path))
+
+
+def parse_condition(expr):
+    """Ubah teks seperti '<= 30' menjadi pasangan (operator, ambang)."""
+    expr = str(expr).strip()
+    # Operator dua karakter dicek lebih dulu agar '<=' tidak terbaca sebagai '<'
+    for symbol in sorted(_OPERATORS, key=len, reverse=True):
+        if expr.startswith(symbol):
+            return _OPERATORS[symbol], float(expr[len(symbol):])
+    raise ValueError(f"Kondisi RFM tidak valid: {expr!r}")
+
+
+def load_segment_rules(path=SEGMENT_RULES_FILE):
+    """Baca tabel aturan segmen; sel kosong berarti kolom tersebut tidak dibatasi.
+
+    Kolom kondisi boleh berupa nilai RFM mentah maupun skor kuintil.
+    """
+    rules = pd.read_csv(path, dtype=str, keep_default_na=False)
+    conditions = [col for col in rules.columns if col != 'segment']
+    if 'segment' not in rules.columns or not conditions:
+        raise ValueError("Aturan segmen membutuhkan kolom 'segment' dan minimal satu kolom kondisi")
+    unknown = set(conditions) - set(RFM_COLUMNS + SCORE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Kolom aturan segmen tidak dikenal: {sorted(unknown)}")
+    return rules
+
+
+def segment_rfm(rfm, rules=None):
+    """Segmentasi RFM tervektorisasi; mengembalikan Series categorical.
+
+    Skor kuintil yang dipakai aturan tetapi belum ada di rfm dihitung dulu dengan score_rfm().
+    """
+    if rules is None:
+        rules = load_segment_rules()
+    condition_columns = [col for col in rules.columns if col != 'segment']
+    if any(col not in rfm.columns for col in condition_columns):
+        rfm = rfm.join(score_rfm(rfm)[[col for col in SCORE_COLUMNS if col not in rfm.columns]])
+    columns = {col: rfm[col].to_numpy() for col in condition_columns}
+
+    conditions = []
+    for _, rule in rules.iterrows():
+        mask = np.ones(len(rfm), dtype=bool)
+        for col in condition_columns:
+            if rule[col].strip():
+                op, threshold = parse_condition(rule[col])
+                mask &= op(columns[col], threshold)
+        conditions.append(mask)
+
+    # Kode segmen: indeks aturan pertama yang cocok, atau kode DEFAULT_SEGMENT
+    labels = rules['segment'].tolist()
+    codes = np.full(len(rfm), len(labels))
+    if conditions:
+        codes = np.select(conditions, np.arange(len(labels)), default=len(labels))
+    categories = labels + [DEFAULT_SEGMENT]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=rfm.index, name='segment')
+
+
+def segment_table(rfm, rules=None, sketch=None):
+    """Tabel RFM dengan kolom skor kuintil dan segmen (batas kuintil dari sketch bila diberikan)."""
+    rfm = rfm.join(score_rfm(rfm, sketch))
+    rfm['segment'] = segment_rfm(rfm, rules)
+    return rfm
@@ -0,0 +1,321 @@
+import os
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager, nullcontext
+import numpy as np
+import pyarrow as pa
+from data_loader import load_dataset, data_version, file_fingerprint, DASHBOARD_COLUMNS
+from rfm import segment_table, SEGMENT_RULES_FILE
+from order_store import OrderStore
+from spatial import SpatialGrid
+from artifacts import load_artifact, load_manifest
+from parallel import worker_pool, parallel_segmented_rfm, parallel_order_cube
+from churn import ChurnScorer, load_model, model_version, customer_features, feature_frame
+from chart_data import render_correlation_heatmap_png
+from engine import ENGINE, DuckDBEngine
+
+try:
+    import fcntl
+except ImportError:
+    # Tanpa flock (Windows) dua proses bisa menghitung entri yang sama bersamaan
+    fcntl = None
+
+# Cache hasil komputasi bersama antarproses di disk. Setiap proses server
+# Streamlit di belakang load balancer punya st.cache_data sendiri; lewat cache
+# ini hanya proses pertama (atau warm-up) yang memuat data dan menghitung RFM,
+# segmen, dan agregat. Proses lain memetakan file hasilnya ke memori (Arrow
+# IPC / .npy dengan mmap), sehingga kolom numerik dibaca langsung dari page
+# cache OS yang dipakai bersama, tanpa salinan per proses.
+
+# Direktori cache (DASHBOARD_SHARED_CACHE, kosongkan untuk mematikan) dan batas
+# total ukurannya (DASHBOARD_SHARED_CACHE_MB)
+SHARED_CACHE_DIR = os.environ.get("DASHBOARD_SHARED_CACHE", "shared_cache")
+SHARED_CACHE_MB = int(os.environ.get("DASHBOARD_SHARED_CACHE_MB", "2048"))
+
+# Naikkan bila isi atau format entri berubah agar entri lama tidak dipakai lagi
+CACHE_FORMAT = 3
+FRAME_FILE = "frame.arrow"
+
+
+def _entry_bytes(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class SharedCache:
+    """Cache DataFrame (Arrow IPC) dan array NumPy (.npy) di disk, dibagi antarproses.
+
+    Setiap entri adalah satu direktori per (nama komputasi, key); key berisi
+    versi data dan parameter komputasinya. Entri ditulis ke direktori
+    sementara lalu di-rename sehingga pembaca tidak pernah melihat entri
+    setengah jadi. Saat total ukuran melebihi max_bytes, entri yang paling
+    lama tidak dibaca dihapus lebih dulu; entri yang baru ditulis selalu
+    dipertahankan. Proses yang sedang memetakan file yang dihapus tetap bisa
+    membacanya.
+    """
+
+    def __init__(self, directory=SHARED_CACHE_DIR, max_bytes=SHARED_CACHE_MB * 1024 ** 2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def entry_path(self, name, key):
+        digest = hashlib.sha1(repr((CACHE_FORMAT, name) + tuple(key)).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{name}-{digest}")
+
+    def _read(self, path, kind):
+        try:
+            if kind == 'frame':
+                # Buffer Arrow menunjuk langsung ke file yang dipetakan ke memori
+                table = pa.ipc.open_file(pa.memory_map(os.path.join(path, FRAME_FILE))).read_all()
+                value = table.to_pandas(split_blocks=True)
+            else:
+                value = {entry.name[:-len(".npy")]: np.load(entry.path, mmap_mode='r')
+                         for entry in os.scandir(path) if entry.name.endswith(".npy")}
+            # Waktu modifikasi direktori = waktu terakhir dipakai (urutan eviction)
+            os.utime(path)
+        except FileNotFoundError:
+            # Belum ada, atau baru saja dihapus oleh eviction proses lain
+            return None
+        return value
+
+    def _write(self, path, kind, value):
+        tmp_dir = f"{os.path.join(self.directory, '.' + os.path.basename(path))}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_dir)
+        try:
+            if kind == 'frame':
+                table = pa.Table.from_pandas(value)
+                with pa.OSFile(os.path.join(tmp_dir, FRAME_FILE), "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            else:
+                for name, array in value.items():
+                    np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(array))
+            os.rename(tmp_dir, path)
+        except OSError:
+            # Proses lain sudah menulis entri yang sama lebih dulu; pakai yang itu
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+    @contextmanager
+    def _entry_lock(self, path):
+        # Lock antarproses per entri; lock thread untuk sesi lain di proses yang sama
+        with self._lock if fcntl is None else open(path + ".lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def get(self, name, key, kind='frame'):
+        """Nilai entri (DataFrame untuk kind 'frame', dict array untuk 'arrays'), atau None."""
+        return self._read(self.entry_path(name, key), kind)
+
+    def get_or_compute(self, name, key, compute, kind='frame'):
+        """Nilai entri; bila belum ada, compute() dijalankan lalu hasilnya disimpan.
+
+        Proses lain yang meminta entri yang sama menunggu lock entri ini lalu
+        membaca hasilnya, bukan ikut menghitung.
+        """
+        path = self.entry_path(name, key)
+        value = self._read(path, kind)
+        if value is None:
+            with self._entry_lock(path):
+                value = self._read(path, kind)
+                if value is None:
+                    value = compute()
+                    self._write(path, kind, value)
+                    self.misses += 1
+                    self.evict(keep=path)
+                    return value
+        self.hits += 1
+        return value
+
+    def entries(self):
+        """[(path, byte, waktu terakhir dipakai)] semua entri, yang paling lama dipakai lebih dulu."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                entries.append((entry.path, _entry_bytes(entry.path), entry.stat().st_mtime_ns))
+            except FileNotFoundError:
+                continue
+        return sorted(entries, key=lambda entry: entry[2])
+
+    @property
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def __len__(self):
+        return len(self.entries())
+
+    def evict(self, keep=None):
+        """Hapus entri yang paling lama dipakai sampai total ukuran <= max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.remove(path + ".lock")
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def cached(cache, name, key, compute, kind='frame'):
+    """compute() lewat cache bersama, atau langsung bila cache dimatikan (None)."""
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(name, key, compute, kind)
+
+
+# Komputasi startup dashboard. Dipakai oleh dashboard.py dan warm_up() agar
+# nama dan key entri selalu sama. source adalah OrderStore atau DuckDBEngine.
+
+def load_order_store(cache, version):
+    """(OrderStore, report) seperti load_dataset(); source report 'shared cache' bila dari cache."""
+    start = time.perf_counter()
+    reports = []
+
+    def build():
+        df, report = load_dataset(DASHBOARD_COLUMNS)
+        reports.append(report)
+        return OrderStore(df).frame
+
+    store = OrderStore.from_frame(cached(cache, 'orders', (version,), build))
+    if reports:
+        return store, reports[0]
+    report = {
+        'source': 'shared cache',
+        'seconds': time.perf_counter() - start,
+        'memory_mb': store.frame.memory_usage(deep=True).sum() / 1024 ** 2,
+        'rows': len(store.frame),
+    }
+    return store, report
+
+
+def spatial_grid(cache, version, store):
+    arrays = cached(cache, 'spatial_grid', (version,), lambda: SpatialGrid(store.frame).arrays(), kind='arrays')
+    return SpatialGrid.from_arrays(store.frame, arrays)
+
+
+def segmented_rfm(cache, version, rules_version, start_date, end_date, source, workers=1, executor=None):
+    """RFM + skor + segmen; rentang penuh dibaca dari artefak precompute.py bila versinya cocok."""
+    if start_date is None and end_date is None:
+        rfm = load_artifact('rfm', version, rules_version)
+        if rfm is not None:
+            return rfm
+
+    def compute():
+        if isinstance(source, DuckDBEngine):
+            return segment_table(source.rfm(start_date, end_date))
+        return parallel_segmented_rfm(source.window(start_date, end_date), workers, executor=executor)
+
+    return cached(cache, 'rfm', (version, rules_version, start_date, end_date), compute)
+
+
+def order_cube(cache, version, rules_version, source, full_rfm, workers=1, executor=None):
+    """Cube OLAP dengan segmen dari full_rfm() (hanya dipanggil bila cube perlu dihitung)."""
+    cube = load_artifact('cube', version, rules_version)
+    if cube is not None:
+        return cube
+
+    def compute():
+        segments = full_rfm()['segment']
+        if isinstance(source, DuckDBEngine):
+            # Order dengan timestamp valid saja, sama seperti frame.iloc[:n_valid]
+            first, last = source.time_range()
+            return source.cube(segments, start_date=first.date(), end_date=last.date())
+        return parallel_order_cube(source.frame.iloc[:source.n_valid], segments, workers, executor=executor)
+
+    return cached(cache, 'cube', (version, rules_version), compute)
+
+
+def churn_scores(cache, version, rules_version, model_ver, source, scorer):
+    """Series churn_probability seluruh pelanggan; scorer() memberi ChurnScorer bila perlu menskor.
+
+    Skor dibaca dari artefak precompute.py bila artefak itu dibuat dengan model yang sama.
+    """
+    manifest = load_manifest(version, rules_version)
+    if manifest is not None and manifest.get('churn_model') == model_ver:
+        churn = load_artifact('churn', version, rules_version)
+        if churn is not None:
+            return churn['churn_probability']
+
+    def compute():
+        if isinstance(source, DuckDBEngine):
+            features = feature_frame(source.customer_aggregates())
+        else:
+            features = customer_features(source.frame)
+        return scorer().score(features).to_frame()
+
+    return cached(cache, 'churn_scores', (version, model_ver), compute)['churn_probability']
+
+
+def correlation_heatmap(cache, rfm_key, rfm):
+    """PNG heatmap korelasi RFM; worker yang menemukannya di cache tidak perlu memuat seaborn."""
+    arrays = cached(cache, 'corr_heatmap', rfm_key,
+                    lambda: {'png': np.frombuffer(render_correlation_heatmap_png(rfm), dtype=np.uint8)}, kind='arrays')
+    return arrays['png'].tobytes()
+
+
+def warm_up(cache, workers=1):
+    """Isi cache bersama dengan hasil yang dihitung dashboard saat startup.
+
+    Mengembalikan list (nama, detik) per komputasi.
+    """
+    timings = []
+
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append((name, time.perf_counter() - start))
+        return result
+
+    version = data_version()
+    rules_version = file_fingerprint(SEGMENT_RULES_FILE)
+    with worker_pool(workers) if workers > 1 else nullcontext() as executor:
+        if ENGINE == 'duckdb':
+            source = DuckDBEngine()
+        else:
+            source, _ = timed('orders', load_order_store, cache, version)
+            timed('spatial_grid', spatial_grid, cache, version, source)
+        rfm = timed('rfm', segmented_rfm, cache, version, rules_version, None, None, source, workers, executor)
+        timed('corr_heatmap', correlation_heatmap, cache, (version, rules_version, None, None), rfm)
+        timed('cube', order_cube, cache, version, rules_version, source, lambda: rfm, workers, executor)
+        model_ver = model_version()
+        if model_ver is not None:
+            timed('churn_scores', churn_scores, cache, version, rules_version, model_ver, source,
+                  lambda: ChurnScorer(load_model()))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm-up cache bersama sebelum worker dashboard dijalankan.")
+    parser.add_argument("--cache-dir", default=SHARED_CACHE_DIR)
+    parser.add_argument("--max-mb", type=int, default=SHARED_CACHE_MB)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="jumlah proses untuk RFM dan cube terpartisi (1 = serial)")
+    args = parser.parse_args(argv)
+    if not args.cache_dir:
+        parser.error("cache bersama dimatikan (DASHBOARD_SHARED_CACHE kosong); isi --cache-dir")
+
+    cache = SharedCache(args.cache_dir, args.max_mb * 1024 ** 2)
+    start = time.perf_counter()
+    for name, seconds in warm_up(cache, args.workers):
+        print(f"  {name:<14} {seconds:>8.2f} s")
+    print(f"Cache bersama {args.cache_dir}: {len(cache)} entri, {cache.total_bytes / 1024 ** 2:.1f} MB "
+          f"({cache.misses} dihitung, {cache.hits} sudah ada, {time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
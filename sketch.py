@@ -0,0 +1,106 @@
+import numpy as np
+
+# Sketch kuantil KLL (Karnin, Lang, Liberty 2016) dengan NumPy: ringkasan
+# berukuran O(k) yang bisa di-update bertahap dan digabung antar partisi.
+#
+# Batas error: kuantil yang dikembalikan memiliki rank sebenarnya dalam
+# ±epsilon·n dari rank yang diminta, dengan epsilon ≈ rank_error_bound(k)
+# pada tingkat keyakinan 99% (≈1.3% untuk k=200, ≈2.6% untuk k=100).
+# Batas ini diperiksa secara empiris oleh benchmarks/verify_sketch.py.
+
+DEFAULT_K = 200
+
+# Nilai dimasukkan per potongan: yang diurutkan hanya potongan, bukan seluruh data
+UPDATE_CHUNK = 65536
+
+
+def rank_error_bound(k=DEFAULT_K):
+    """Perkiraan error rank ternormalisasi (99% keyakinan) untuk parameter k."""
+    # Rumus empiris dari implementasi referensi KLL (Apache DataSketches)
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    """Sketch kuantil mergeable untuk nilai numerik.
+
+    Level h menyimpan item berbobot 2^h. Level yang melebihi kapasitasnya
+    diurutkan dan dipadatkan: setiap item kedua (dengan offset acak) naik
+    ke level berikutnya dengan bobot dua kali lipat. Total bobot selalu
+    sama dengan jumlah nilai yang dimasukkan. NaN diabaikan.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, level):
+        # Kapasitas menyusut secara geometris (2/3) ke arah level bawah
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Jumlah ganjil: satu item tetap di level ini agar bobot total terjaga
+                kept, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[h] = kept
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        for start in range(0, len(values), UPDATE_CHUNK):
+            chunk = values[start:start + UPDATE_CHUNK]
+            self.levels[0] = np.concatenate([self.levels[0], chunk])
+            self.n += len(chunk)
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Gabungkan sketch lain (misalnya dari partisi lain) ke sketch ini."""
+        self.k = min(self.k, other.k)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype='int64') for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Nilai terkecil x dengan rank(x) >= q·n untuk setiap q di qs."""
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items, cumulative = self._weighted_items()
+        positions = np.searchsorted(cumulative, np.asarray(qs, dtype='float64') * self.n, side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def rank(self, values):
+        """Perkiraan fraksi nilai yang <= setiap nilai di values."""
+        if self.n == 0:
+            return np.full(len(values), np.nan)
+        items, cumulative = self._weighted_items()
+        positions = np.searchsorted(items, np.asarray(values, dtype='float64'), side='right')
+        return np.where(positions > 0, cumulative[np.maximum(positions - 1, 0)], 0) / self.n
+
+    def size(self):
+        """Jumlah item yang benar-benar disimpan."""
+        return sum(len(level) for level in self.levels)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from filter_index import index_dtype
+
+# Level zoom peta -> ukuran sel grid (derajat); makin dekat, makin halus
+ZOOM_RESOLUTIONS = {
+    3: 1.0,
+    4: 0.5,
+    5: 0.25,
+    6: 0.1,
+    7: 0.05,
+    8: 0.02,
+}
+
+
+class SpatialGrid:
+    """Agregasi spasial level-of-detail untuk peta penjualan.
+
+    Setiap baris order dipetakan sekali ke sel grid di semua resolusi.
+    Agregasi untuk baris yang terfilter cukup dengan bincount atas kode sel,
+    sehingga peta hanya menerima satu titik per sel yang berisi order.
+    """
+
+    def __init__(self, frame, resolutions=ZOOM_RESOLUTIONS):
+        lat = frame['customer_lat'].to_numpy(dtype='float64')
+        lng = frame['customer_lng'].to_numpy(dtype='float64')
+        valid = np.isfinite(lat) & np.isfinite(lng)
+        self.revenue = frame['payment_value'].to_numpy(dtype='float64')
+        # Order yang sama bisa muncul di beberapa baris; hitung satu kali per sel
+        dtype = index_dtype(len(frame))
+        self.order_codes = pd.factorize(frame['order_id'])[0].astype(dtype)
+        self.levels = {}
+        for zoom, size in resolutions.items():
+            row = np.floor(lat[valid] / size).astype(np.int64)
+            col = np.floor(lng[valid] / size).astype(np.int64)
+            keys, cell_codes = np.unique(row * 1_000_003 + col, return_inverse=True)
+            codes = np.full(len(frame), -1, dtype=dtype)
+            codes[valid] = cell_codes
+            # Titik tengah setiap sel untuk ditampilkan di peta
+            cell_row = np.zeros(len(keys), dtype=np.int64)
+            cell_col = np.zeros(len(keys), dtype=np.int64)
+            cell_row[cell_codes] = row
+            cell_col[cell_codes] = col
+            self.levels[zoom] = (codes, (cell_row + 0.5) * size, (cell_col + 0.5) * size)
+
+    def arrays(self):
+        """Array NumPy grid (tanpa kolom revenue milik frame), untuk disimpan di cache bersama."""
+        arrays = {'order_codes': self.order_codes}
+        for zoom, (codes, center_lat, center_lng) in self.levels.items():
+            arrays.update({f'codes_{zoom}': codes, f'lat_{zoom}': center_lat, f'lng_{zoom}': center_lng})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, frame, arrays):
+        """Grid dari hasil arrays() untuk frame yang sama, tanpa menghitung ulang sel."""
+        grid = cls.__new__(cls)
+        grid.revenue = frame['payment_value'].to_numpy(dtype='float64')
+        grid.order_codes = arrays['order_codes']
+        zooms = sorted(int(name[len('codes_'):]) for name in arrays if name.startswith('codes_'))
+        grid.levels = {zoom: (arrays[f'codes_{zoom}'], arrays[f'lat_{zoom}'], arrays[f'lng_{zoom}']) for zoom in zooms}
+        return grid
+
+    def aggregate(self, rows, zoom):
+        """Jumlah order unik dan pendapatan per sel untuk row id terpilih."""
+        codes, center_lat, center_lng = self.levels[zoom]
+        rows = np.asarray(rows)
+        rows = rows[codes[rows] >= 0]
+        n_cells = len(center_lat)
+        revenue = np.bincount(codes[rows], weights=self.revenue[rows], minlength=n_cells)
+        _, first = np.unique(self.order_codes[rows], return_index=True)
+        orders = np.bincount(codes[rows[first]], minlength=n_cells)
+        occupied = orders > 0
+        return pd.DataFrame({
+            'lat': center_lat[occupied],
+            'lng': center_lng[occupied],
+            'orders': orders[occupied],
+            'revenue': np.round(revenue[occupied], 2),
+        })
@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+# Mode profiling startup: dashboard dijalankan sekali di proses Python baru
+# (Streamlit AppTest, seperti worker server yang baru dimulai). Dilaporkan
+# waktu impor modul skrip dan waktu render pertama (dari record startup di
+# log profiler), paket yang paling mahal diimpor selama render pertama
+# (python -X importtime), dan pustaka berat yang sudah dimuat sesudahnya.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD = os.path.join(HERE, "dashboard.py")
+
+# Pustaka yang hanya dibutuhkan chart atau tab tertentu; dimuat saat pertama dipakai
+HEAVY_MODULES = ['seaborn', 'matplotlib', 'wordcloud', 'plotly.subplots', 'sklearn', 'scipy', 'duckdb']
+
+# Batas default (ms) untuk --max-import-ms dan --max-first-render-ms
+IMPORT_BUDGET_MS = 1500
+FIRST_RENDER_BUDGET_MS = 10000
+
+MARKER = "startup_profile: render pertama dimulai"
+
+_CHILD = """
+import os, sys, json, time
+from streamlit.testing.v1 import AppTest
+# Seperti streamlit run: direktori skrip ada di sys.path
+sys.path.insert(0, os.path.dirname({script!r}))
+at = AppTest.from_file({script!r}, default_timeout=600)
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+print(json.dumps({{
+    'wall_ms': round((time.perf_counter() - start) * 1000, 2),
+    'exception': [e.value for e in at.exception],
+    'heavy_modules': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def import_costs(stderr, top=10):
+    """[(paket, ms kumulatif)] impor tingkat teratas setelah MARKER, yang termahal lebih dulu."""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    costs = {}
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Impor bertingkat diindentasi dua spasi per level; cukup yang teratas
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        package = name.strip().split(".")[0]
+        costs[package] = costs.get(package, 0) + int(cumulative) / 1000
+    return sorted(((package, round(ms, 1)) for package, ms in costs.items()), key=lambda item: -item[1])[:top]
+
+
+def profile_startup(script=DASHBOARD, cwd=None, env=None):
+    """Jalankan render pertama script di proses baru; dict waktu startup dan impor."""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "profile_log.jsonl")
+        child_env = {**os.environ, **(env or {}), 'DASHBOARD_PROFILE_LOG': log_path, 'PYTHONPROFILEIMPORTTIME': '1'}
+        code = _CHILD.format(script=os.path.abspath(script), marker=MARKER, heavy=HEAVY_MODULES)
+        result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=child_env,
+                                capture_output=True, text=True, check=True)
+        child = json.loads(result.stdout.strip().splitlines()[-1])
+        if child['exception']:
+            raise RuntimeError(f"render pertama gagal: {child['exception']}")
+        with open(log_path) as f:
+            startup = next(record['startup'] for record in map(json.loads, f) if 'startup' in record)
+    return {**startup, 'wall_ms': child['wall_ms'], 'heavy_modules': child['heavy_modules'],
+            'import_costs': import_costs(result.stderr)}
+
+
+def over_budget(profile, max_import_ms=IMPORT_BUDGET_MS, max_first_render_ms=FIRST_RENDER_BUDGET_MS):
+    """Daftar pesan untuk setiap batas waktu startup yang terlampaui (kosong bila semua terpenuhi)."""
+    problems = []
+    if profile['import_ms'] > max_import_ms:
+        problems.append(f"impor {profile['import_ms']:.0f} ms > batas {max_import_ms:.0f} ms")
+    if profile['first_render_ms'] > max_first_render_ms:
+        problems.append(f"render pertama {profile['first_render_ms']:.0f} ms > batas {max_first_render_ms:.0f} ms")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profil startup dashboard: waktu impor dan render pertama di proses baru.")
+    parser.add_argument("--max-import-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--max-first-render-ms", type=float, default=FIRST_RENDER_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    profile = profile_startup()
+    print(f"Impor modul dashboard: {profile['import_ms']:>8.0f} ms")
+    print(f"Render pertama:        {profile['first_render_ms']:>8.0f} ms")
+    print("Impor termahal selama render pertama:")
+    for package, ms in profile['import_costs']:
+        print(f"  {package:<24} {ms:>8.1f} ms")
+    print(f"Pustaka berat yang dimuat: {', '.join(profile['heavy_modules']) or '-'}")
+    problems = over_budget(profile, args.max_import_ms, args.max_first_render_ms)
+    for problem in problems:
+        print(f"MELEBIHI BATAS: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())